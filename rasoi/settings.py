@@ -89,6 +89,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "django_filters",
     "corsheaders",
     "restaurante",
@@ -189,6 +190,18 @@ AWS_DEFAULT_ACL = None
 DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
 MEDIA_URL = f'https://{AWS_STORAGE_BUCKET_NAME}.s3.{AWS_S3_REGION_NAME}.amazonaws.com/'
 
+# Chat history archives (archive_chat_history) hold emails, addresses and phone numbers, so
+# they go to their own private bucket with signed URLs — never the public media bucket above.
+CHAT_ARCHIVE_STORAGE = {
+    "BACKEND": "storages.backends.s3boto3.S3Boto3Storage",
+    "OPTIONS": {
+        "bucket_name": os.getenv("CHAT_ARCHIVE_BUCKET", "rasoi-chat-archives"),
+        "default_acl": "private",
+        "querystring_auth": True,
+        "file_overwrite": False,
+    },
+}
+
 
 
 # MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -241,6 +254,20 @@ REST_FRAMEWORK = {
     },
 }
 
+# Chat endpoint: LLM tokens (prompt + completion) per sliding window, per scope.
+# See restaurante/chatviews/llm_budget.py — enforced atomically in Redis.
+LLM_BUDGET_WINDOW = int(os.getenv("LLM_BUDGET_WINDOW", 60 * 60))
+LLM_TOKEN_BUDGETS = {
+    "guest": {
+        "session": int(os.getenv("LLM_BUDGET_GUEST_SESSION", 20_000)),
+        "ip": int(os.getenv("LLM_BUDGET_GUEST_IP", 60_000)),
+    },
+    "user": {
+        "user": int(os.getenv("LLM_BUDGET_USER", 150_000)),
+        "ip": int(os.getenv("LLM_BUDGET_USER_IP", 400_000)),
+    },
+}
+
 # CACHES = {
 #     "default": {
 #         "BACKEND": "django_redis.cache.RedisCache",
@@ -304,15 +331,38 @@ DJOSER = {
 from datetime import timedelta
 
 SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
+    # short: read endpoints trust the role claims in the access token without a DB check
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=int(os.getenv("ACCESS_TOKEN_MINUTES", 15))),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
     "AUTH_HEADER_TYPES": ("Bearer",),
+    "TOKEN_REFRESH_SERIALIZER": "restaurante.views.CustomTokenRefreshSerializer",
 }
 
 
 
 STRIPE_SECRET_KEY=os.getenv("STRIPE_SECRET_KEY")
+STRIPE_WEBHOOK_SECRET=os.getenv("STRIPE_WEBHOOK_SECRET")
+
+OPENAI_API_KEY=os.getenv("OPENAI_API_KEY")
+
+# In-process background pool (chat summaries etc.). EAGER runs tasks inline — handy for tests.
+BACKGROUND_TASK_WORKERS = int(os.getenv("BACKGROUND_TASK_WORKERS", 2))
+BACKGROUND_TASKS_EAGER = os.getenv("BACKGROUND_TASKS_EAGER", "False") == "True"
+
+# In-process periodic jobs (order cleanup, cart write-back, Stripe events, email outbox,
+# delivery dispatch, slot load re-sync) — see restaurante/scheduler.py. Leave off when the
+# same jobs run from cron / run_scheduler.
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "False") == "True"
+
+# Kitchen capacity per delivery slot (restaurante/slot_capacity.py): full slots are hidden from
+# the available-slot endpoint and the chatbot. Unset item limit = orders only.
+SLOT_MAX_ORDERS = int(os.getenv("SLOT_MAX_ORDERS", 20))
+SLOT_MAX_ITEMS = int(os.getenv("SLOT_MAX_ITEMS")) if os.getenv("SLOT_MAX_ITEMS") else None
 
-OPENAI_API_KEY=os.getenv("OPENAI_API_KEY")
\ No newline at end of file
+# Reverse proxies in front of the app that append to X-Forwarded-For. Client IPs for LLM
+# budgets are read from the hop the last of them appended; 0 = REMOTE_ADDR. Defaults to 1 on
+# Render (which sets RENDER=true): there REMOTE_ADDR is the proxy, and 0 would put every
+# guest into one shared budget.
+TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", 1 if os.getenv("RENDER") else 0))
@@ -1,36 +1,62 @@
 from django.contrib import admin
 from . import models
-from django.http import HttpResponse
-import csv
+from .exports import stream_csv, fmt_datetime, fmt_username
 
 # Register your models here.
 admin.site.register(models.Category)
 admin.site.register(models.CustomerReview)
 admin.site.register(models.MenuItem)
-admin.site.register(models.Booking)
 admin.site.register(models.Cart)
-admin.site.register(models.Order)
 admin.site.register(models.OrderItem)
 admin.site.register(models.UserProfile)
 
 
+CHAT_HISTORY_COLUMNS = [
+    ("User", "user__username", fmt_username),
+    ("Session ID", "session_id", None),
+    ("Role", "role", None),
+    ("Message", "message", None),
+    ("Timestamp", "timestamp", fmt_datetime),
+]
 
-@admin.action(description="Export selected to CSV")
-def export_as_csv(modeladmin, request, queryset):
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename=chat_history.csv'
-    writer = csv.writer(response)
-    writer.writerow(['User', 'Session ID', 'Role', 'Message', 'Timestamp'])
-    for obj in queryset:
-        writer.writerow([
-            obj.user.username if obj.user else 'Anonymous',
-            obj.session_id,
-            obj.role,
-            obj.message,
-            obj.timestamp.strftime("%Y-%m-%d %H:%M")
-        ])
-    return response
+ORDER_COLUMNS = [
+    ("Order ID", "id", None),
+    ("User", "user__username", fmt_username),
+    ("Date", "date", None),
+    ("Total", "total", None),
+    ("Delivery Type", "delivery_type", None),
+    ("Time Slot", "delivery_time_slot", None),
+    ("City", "delivery_city", None),
+    ("PIN", "delivery_pin", None),
+    ("Payment Method", "payment_method", None),
+    ("Payment Status", "payment_status", None),
+    ("Confirmed", "is_confirmed", None),
+    ("Delivered", "status", None),
+    ("Delivery Crew", "delivery_crew__username", lambda v: v or ""),
+]
 
+BOOKING_COLUMNS = [
+    ("Reference", "reference_number", None),
+    ("User", "user__username", fmt_username),
+    ("Email", "email", None),
+    ("Date", "reservation_date", None),
+    ("Time", "reservation_time", None),
+    ("Guests", "no_of_guests", None),
+    ("Occasion", "occasion", None),
+]
+
+
+def csv_export_actions(columns, filename):
+    """Builds a plain and a gzipped streaming CSV admin action for one model."""
+    @admin.action(description="Export selected to CSV")
+    def export_as_csv(modeladmin, request, queryset):
+        return stream_csv(queryset, columns, filename)
+
+    @admin.action(description="Export selected to CSV (gzip)")
+    def export_as_csv_gz(modeladmin, request, queryset):
+        return stream_csv(queryset, columns, filename, gzip=True)
+
+    return [export_as_csv, export_as_csv_gz]
 
 
 @admin.register(models.ChatHistory)
@@ -38,8 +64,41 @@ class ChatHistoryAdmin(admin.ModelAdmin):
     list_display = ('user', 'session_id', 'role', 'short_message', 'timestamp')
     list_filter = ('role', 'timestamp')
     search_fields = ('user__username', 'session_id', 'message')
-    actions = [export_as_csv]
+    list_select_related = ('user',)
+    actions = csv_export_actions(CHAT_HISTORY_COLUMNS, "chat_history")
 
     def short_message(self, obj):
-        return (obj.message[:50] + '...') if len(obj.message) > 50 else obj.message
+        message = obj.message or ""
+        return (message[:50] + '...') if len(message) > 50 else message
     short_message.short_description = 'Message'
+
+
+@admin.register(models.Order)
+class OrderAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'date', 'total', 'delivery_type', 'payment_status', 'is_confirmed')
+    list_filter = ('is_confirmed', 'payment_status', 'delivery_type', 'date')
+    list_select_related = ('user',)
+    actions = csv_export_actions(ORDER_COLUMNS, "orders")
+
+
+@admin.register(models.Booking)
+class BookingAdmin(admin.ModelAdmin):
+    list_display = ('reference_number', 'reservation_date', 'reservation_time', 'no_of_guests', 'email')
+    list_filter = ('reservation_date', 'occasion')
+    actions = csv_export_actions(BOOKING_COLUMNS, "bookings")
+
+
+@admin.register(models.EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('id', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'last_error')
+    readonly_fields = ('created_at', 'sent_at')
+
+
+@admin.register(models.StripeEvent)
+class StripeEventAdmin(admin.ModelAdmin):
+    list_display = ('event_id', 'type', 'object_id', 'status', 'attempts', 'received_at', 'processed_at')
+    list_filter = ('status', 'type')
+    search_fields = ('event_id', 'object_id')
+    readonly_fields = ('received_at', 'processed_at')
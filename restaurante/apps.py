@@ -6,7 +6,12 @@ class RestaurantConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "restaurante"
 
-    # def ready(self):
-    #     import restaurante.signals
+    def ready(self):
+        import restaurante.signals
+
+        from django.conf import settings
+        if settings.SCHEDULER_ENABLED:
+            from .scheduler import start_scheduler
+            start_scheduler()
 
 
@@ -0,0 +1,53 @@
+# restaurante/authentication.py
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .roles import get_roles
+
+
+def add_role_claims(token, user):
+    """Embeds what read endpoints need to know about the user, so they never load it."""
+    token["username"] = user.username
+    token["roles"] = sorted(get_roles(user))
+    token["is_staff"] = user.is_staff
+    token["is_superuser"] = user.is_superuser
+    return token
+
+
+class ClaimsUser(TokenUser):
+    """
+    Lightweight user built from a validated access token. Roles come from the token,
+    so roles.get_roles() and the permission classes need no query either.
+    Use `user.pk` / `user_id=` in filters — this is not a model instance.
+    """
+
+    def __init__(self, token):
+        super().__init__(token)
+        self._roles = frozenset(token.get("roles", ()))
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication without the per-request User (and group) lookup. Tokens minted
+    before role claims existed fall back to the regular DB-backed user.
+    Staleness is bounded by ACCESS_TOKEN_LIFETIME; the refresh endpoint re-reads roles.
+    """
+
+    def get_user(self, validated_token):
+        if "roles" not in validated_token:
+            return super().get_user(validated_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        return ClaimsUser(validated_token)
+
+
+class StatelessReadMixin:
+    """Safe methods authenticate from token claims alone; writes still load the real User."""
+
+    def get_authenticators(self):
+        if self.request.method in SAFE_METHODS:
+            return [StatelessJWTAuthentication()]
+        return super().get_authenticators()
@@ -0,0 +1,88 @@
+# restaurante/autocomplete.py
+import time
+from django.db.models import Sum
+
+from .chatviews.menu_retrieval import get_menu_index, tokenize
+from .menu_cache import get_menu_version
+from .models import OrderItem
+
+MAX_SUGGESTIONS = 10          # kept per trie node, so lookups never sort
+POPULARITY_REFRESH = 60 * 30  # re-rank by order volume every 30 min even without menu edits
+
+
+class SuggestionTrie:
+    """
+    Prefix trie where every node already holds its top suggestions (by popularity),
+    so a lookup is just a walk down len(prefix) nodes.
+    """
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, key, suggestion, score):
+        node = self.root
+        for ch in key:
+            node = node.setdefault(ch, {})
+            top = node.setdefault("_top", [])
+            if any(s is suggestion for _, s in top):
+                continue  # same item reached via another word of its title
+            top.append((score, suggestion))
+            top.sort(key=lambda pair: (-pair[0], pair[1]["title"]))
+            del top[MAX_SUGGESTIONS:]
+
+    def lookup(self, prefix, limit=MAX_SUGGESTIONS):
+        node = self.root
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return []
+        return [s for _, s in node.get("_top", [])[:limit]]
+
+
+def normalize(text):
+    return " ".join(tokenize(text))
+
+
+def build_trie():
+    index = get_menu_index()
+    popularity = dict(
+        OrderItem.objects.values_list("menuitem").annotate(sold=Sum("quantity")).values_list("menuitem", "sold")
+    )
+
+    trie = SuggestionTrie()
+    category_score = {}
+    for item in index.items:
+        score = popularity.get(item["id"], 0)
+        suggestion = {"type": "item", "id": item["id"], "title": item["title"], "category": item["category"]}
+        # full title / alias plus every later word, so "tikki" finds "Aloo Tikki"
+        for name in [item["title"], *item.get("aliases", [])]:
+            words = normalize(name).split()
+            for i in range(len(words)):
+                trie.insert(" ".join(words[i:]), suggestion, score)
+        if item["category"]:
+            category_score[item["category"]] = category_score.get(item["category"], 0) + score
+
+    for title, score in category_score.items():
+        trie.insert(normalize(title), {"type": "category", "title": title}, score)
+    return trie
+
+
+_trie = None
+_trie_version = None
+_trie_built_at = 0
+
+
+def get_suggestion_trie():
+    """Rebuilt when the menu version changes (or popularity goes stale); otherwise no DB access."""
+    global _trie, _trie_version, _trie_built_at
+    version = get_menu_version()
+    if _trie is None or version != _trie_version or time.time() - _trie_built_at > POPULARITY_REFRESH:
+        _trie, _trie_version, _trie_built_at = build_trie(), version, time.time()
+    return _trie
+
+
+def suggest(prefix, limit=MAX_SUGGESTIONS):
+    prefix = normalize(prefix)
+    if not prefix:
+        return []
+    return get_suggestion_trie().lookup(prefix, limit=max(1, min(limit, MAX_SUGGESTIONS)))
@@ -0,0 +1,30 @@
+# restaurante/background.py
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections
+
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "BACKGROUND_TASK_WORKERS", 2),
+    thread_name_prefix="rasoi-bg",
+)
+
+
+def run_in_background(func, *args, **kwargs):
+    """
+    Runs `func(*args, **kwargs)` on a small in-process thread pool so the
+    request can return immediately. Set BACKGROUND_TASKS_EAGER=True to run
+    inline (tests, management commands).
+    """
+    def _job():
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            print(f"❌ Background task {func.__name__} failed: {e}")
+        finally:
+            # worker threads keep their own DB connection; don't leak it
+            close_old_connections()
+
+    if getattr(settings, "BACKGROUND_TASKS_EAGER", False):
+        return func(*args, **kwargs)
+    return _executor.submit(_job)
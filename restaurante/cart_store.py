@@ -0,0 +1,344 @@
+# restaurante/cart_store.py
+import threading
+from decimal import Decimal
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .background import run_in_background
+from .menu_cache import get_menu_version
+from .models import Cart, MenuItem
+from .redis_client import get_redis
+
+# Each user's cart lives in a Redis hash `cart_<user id>`: menuitem id -> "quantity|unit price".
+# Reads, totals and quantity changes never touch the DB; the Cart table is a write-behind copy,
+# refreshed in batches (flush_dirty_carts) and right before checkout.
+CART_TTL = getattr(settings, "CART_TTL", 60 * 60 * 24 * 7)
+CART_WRITEBACK_INTERVAL = getattr(settings, "CART_WRITEBACK_INTERVAL", 30)  # seconds between batch flushes
+CART_FLUSH_BATCH = 200
+CART_CHECKOUT_TIMEOUT = 60  # seconds a checkout may hold off write-backs
+
+DIRTY_CARTS_KEY = "cart_dirty"  # user ids with changes not yet in the Cart table
+WRITEBACK_SCHEDULED_KEY = "cart_writeback_scheduled"
+LOADED_FIELD = "~"  # always present, so an empty cart isn't mistaken for "not loaded yet"
+
+MENU_PRICES_TIMEOUT = 60 * 60
+
+_local_cart_lock = threading.Lock()  # non-Redis fallback: serializes read-modify-writes in this process
+
+
+class MenuItemUnavailable(Exception):
+    """The menu item was deleted (e.g. after the request was validated)."""
+
+    def __init__(self, menuitem_id):
+        super().__init__(f"Menu item {menuitem_id} is no longer available")
+        self.menuitem_id = menuitem_id
+
+
+def cart_key(user_id):
+    return f"cart_{user_id}"
+
+
+def cart_checkout_key(user_id):
+    return f"cart_checkout_{user_id}"
+
+
+def menu_prices():
+    """{menuitem id: price} for the whole menu, one query per menu version."""
+    key = f"menu_prices_{get_menu_version()}"
+    prices = cache.get(key)
+    if prices is None:
+        prices = {pk: str(price) for pk, price in MenuItem.objects.values_list("id", "price")}
+        cache.set(key, prices, timeout=MENU_PRICES_TIMEOUT)
+    return prices
+
+
+class CartLine(NamedTuple):
+    user_id: int
+    menuitem_id: int
+    quantity: int
+    unit_price: Decimal
+
+    @property
+    def id(self):
+        # one line per menu item (Cart.unique_together), so the item id names the line
+        return self.menuitem_id
+
+    @property
+    def price(self):
+        return self.unit_price * self.quantity
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class CartStore:
+    """
+    One user's cart. Uses a real Redis hash (HSET/HDEL are O(1)) when the cache is Redis,
+    otherwise keeps the same mapping as a plain cache entry.
+    The hash is loaded from the Cart table on first use. Checkout marks the cart (write-backs
+    back off while the mark is set) and, once the order commits, discards exactly the lines
+    it ordered and clears the mark.
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.key = cart_key(user_id)
+        self.conn = get_redis()
+
+    # ---- raw hash access
+    def _fields(self):
+        if self.conn is not None:
+            raw = self.conn.hgetall(self.key)
+            return {_decode(k): _decode(v) for k, v in raw.items()}
+        return cache.get(self.key) or {}
+
+    def _write(self, changes=None, removed=()):
+        if self.conn is not None:
+            pipe = self.conn.pipeline()
+            if changes:
+                pipe.hset(self.key, mapping=changes)
+            if removed:
+                pipe.hdel(self.key, *removed)
+            pipe.expire(self.key, CART_TTL)
+            pipe.execute()
+        else:
+            fields = cache.get(self.key) or {}
+            fields.update(changes or {})
+            for field in removed:
+                fields.pop(field, None)
+            cache.set(self.key, fields, timeout=CART_TTL)
+        mark_dirty([self.user_id])
+
+    def _load(self):
+        fields = self._fields()
+        if fields:
+            return fields
+        fields = {
+            str(menuitem_id): f"{quantity}|{unit_price}"
+            for menuitem_id, quantity, unit_price in Cart.objects.filter(user_id=self.user_id)
+            .values_list("menuitem_id", "quantity", "unit_price")
+        }
+        fields[LOADED_FIELD] = "1"
+        if self.conn is not None:
+            pipe = self.conn.pipeline()
+            for field, value in fields.items():
+                pipe.hsetnx(self.key, field, value)  # never overwrite a write that raced us
+            pipe.expire(self.key, CART_TTL)
+            pipe.execute()
+        else:
+            cache.add(self.key, fields, timeout=CART_TTL)
+        return fields
+
+    def _lines(self, fields):
+        lines = []
+        for field, value in fields.items():
+            if field == LOADED_FIELD:
+                continue
+            quantity, unit_price = value.split("|")
+            lines.append(CartLine(self.user_id, int(field), int(quantity), Decimal(unit_price)))
+        return sorted(lines, key=lambda line: line.menuitem_id)
+
+    # ---- cart API
+    def lines(self):
+        return self._lines(self._load())
+
+    def get(self, menuitem_id):
+        return next((line for line in self.lines() if line.menuitem_id == menuitem_id), None)
+
+    def total(self):
+        return sum((line.price for line in self.lines()), Decimal("0"))
+
+    def set(self, menuitem_id, quantity, unit_price=None):
+        """Adds the item or replaces its quantity, at the current menu price."""
+        if unit_price is None:
+            unit_price = menu_prices().get(menuitem_id)
+            if unit_price is None:
+                raise MenuItemUnavailable(menuitem_id)
+        self._load()
+        self._write(changes={str(menuitem_id): f"{int(quantity)}|{unit_price}"})
+        return CartLine(self.user_id, menuitem_id, int(quantity), Decimal(unit_price))
+
+    def apply(self, operations):
+        """
+        Applies a batch of {"op": "add" | "set" | "remove", "menuitem", "quantity"} operations
+        (menu items already validated) with one read and one write. Returns the new lines.
+        """
+        prices = menu_prices()
+        fields = self._load()
+        quantities = {int(f): int(v.split("|")[0]) for f, v in fields.items() if f != LOADED_FIELD}
+        touched = set()
+        for operation in operations:
+            menuitem_id = operation["menuitem"]
+            if operation["op"] == "remove":
+                quantities.pop(menuitem_id, None)
+            elif operation["op"] == "add":
+                quantities[menuitem_id] = quantities.get(menuitem_id, 0) + operation["quantity"]
+            else:
+                quantities[menuitem_id] = operation["quantity"]
+            touched.add(menuitem_id)
+
+        missing = [i for i in touched if quantities.get(i) and i not in prices]
+        if missing:
+            raise MenuItemUnavailable(missing[0])  # nothing written yet
+        changes = {str(i): f"{quantities[i]}|{prices[i]}" for i in touched if quantities.get(i)}
+        removed = [str(i) for i in touched if not quantities.get(i)]
+        self._write(changes=changes, removed=removed)
+        fields.update(changes)
+        for field in removed:
+            fields.pop(field, None)
+        return self._lines(fields)
+
+    def remove(self, menuitem_id):
+        self._load()
+        self._write(removed=[str(menuitem_id)])
+
+    def clear(self):
+        fields = self._load()
+        self._write(removed=[field for field in fields if field != LOADED_FIELD])
+
+    def begin_checkout(self):
+        """Write-backs skip this cart until end_checkout(); the timeout covers a crashed checkout."""
+        cache.set(cart_checkout_key(self.user_id), 1, timeout=CART_CHECKOUT_TIMEOUT)
+
+    def end_checkout(self):
+        cache.delete(cart_checkout_key(self.user_id))
+
+    def checking_out(self):
+        return cache.get(cart_checkout_key(self.user_id)) is not None
+
+    def discard(self, lines):
+        """
+        Removes checked-out lines [(menuitem id, quantity, unit price)] — each only if the cart
+        still holds exactly that line. Items added or changed while checkout ran stay in the
+        cart (and are written back).
+        """
+        ordered = {str(menuitem_id): (int(quantity), Decimal(unit_price)) for menuitem_id, quantity, unit_price in lines}
+
+        def stale(fields):
+            return [
+                field for field, value in fields.items()
+                if field in ordered and (int(value.split("|")[0]), Decimal(value.split("|")[1])) == ordered[field]
+            ]
+
+        if self.conn is not None:
+            from redis.exceptions import WatchError
+            with self.conn.pipeline() as pipe:
+                while True:
+                    try:
+                        pipe.watch(self.key)  # compare-and-delete: retry if the cart changes meanwhile
+                        fields = {_decode(k): _decode(v) for k, v in pipe.hgetall(self.key).items()}
+                        gone = stale(fields)
+                        pipe.multi()
+                        if gone:
+                            pipe.hdel(self.key, *gone)
+                        pipe.execute()
+                        break
+                    except WatchError:
+                        continue
+        else:
+            with _local_cart_lock:
+                fields = cache.get(self.key) or {}
+                gone = stale(fields)
+                for field in gone:
+                    fields.pop(field)
+                if fields:
+                    cache.set(self.key, fields, timeout=CART_TTL)
+        if any(field != LOADED_FIELD and field not in gone for field in fields):
+            mark_dirty([self.user_id])  # what was added during checkout still needs its Cart row
+
+
+def get_cart(user):
+    return CartStore(user.pk)
+
+
+# -------------------------------
+# Write-back to the Cart table
+
+def flush_cart(user_id):
+    """
+    Makes the user's Cart rows match the in-memory cart: one upsert for the current lines and
+    one DELETE for removed items. A no-op when the cart isn't loaded (the table is then current).
+    """
+    store = CartStore(user_id)
+    if not store._fields():
+        return 0
+    prices = menu_prices()
+    with transaction.atomic():
+        # wait for a checkout holding these rows, and read the cart only after that: lines
+        # read earlier may be ordered already — writing them back would resurrect them
+        list(Cart.objects.select_for_update().filter(user_id=user_id).values_list("id", flat=True))
+        if store.checking_out():
+            mark_dirty([user_id])  # the next write-back re-reads the cart
+            return 0
+        lines = [line for line in store.lines() if line.menuitem_id in prices]  # skip deleted menu items
+        Cart.objects.filter(user_id=user_id).exclude(
+            menuitem_id__in=[line.menuitem_id for line in lines]
+        ).delete()
+        if lines:
+            Cart.objects.bulk_create(
+                [
+                    Cart(user_id=user_id, menuitem_id=line.menuitem_id, quantity=line.quantity,
+                         unit_price=line.unit_price, price=line.price)
+                    for line in lines
+                ],
+                update_conflicts=True,
+                unique_fields=["user", "menuitem"],
+                update_fields=["quantity", "unit_price", "price"],
+            )
+    return len(lines)
+
+
+def _add_dirty(user_ids):
+    conn = get_redis()
+    if conn is not None:
+        conn.sadd(DIRTY_CARTS_KEY, *user_ids)
+    else:
+        with _local_cart_lock:
+            cache.set(DIRTY_CARTS_KEY, (cache.get(DIRTY_CARTS_KEY) or set()) | set(user_ids), timeout=None)
+
+
+def mark_dirty(user_ids):
+    """Queues these carts for write-back."""
+    _add_dirty(user_ids)
+    schedule_writeback()
+
+
+def _pop_dirty(count):
+    conn = get_redis()
+    if conn is not None:
+        return [int(_decode(uid)) for uid in conn.spop(DIRTY_CARTS_KEY, count) or []]
+    with _local_cart_lock:
+        dirty = cache.get(DIRTY_CARTS_KEY) or set()
+        popped = set(list(dirty)[:count])
+        cache.set(DIRTY_CARTS_KEY, dirty - popped, timeout=None)
+    return list(popped)
+
+
+def flush_dirty_carts(batch_size=CART_FLUSH_BATCH):
+    """Writes back every cart changed since the last run. Returns the number of carts flushed."""
+    flushed = 0
+    while True:
+        user_ids = _pop_dirty(batch_size)
+        if not user_ids:
+            return flushed
+        failed = []
+        for user_id in user_ids:
+            try:
+                flush_cart(user_id)
+                flushed += 1
+            except Exception as e:
+                print(f"❌ Cart write-back failed for user {user_id}: {e}")
+                failed.append(user_id)
+        if failed:
+            _add_dirty(failed)
+            return flushed  # retried on the next run, not in a tight loop here
+
+
+def schedule_writeback():
+    """At most one background flush per CART_WRITEBACK_INTERVAL, however busy the carts are."""
+    if cache.add(WRITEBACK_SCHEDULED_KEY, 1, timeout=CART_WRITEBACK_INTERVAL):
+        run_in_background(flush_dirty_carts)
@@ -7,6 +7,7 @@ from restaurante.views import BookingViewSet
 from dateutil import parser  # requires `pip install python-dateutil`
 from restaurante.utils import format_slot, friendly_date_string
 from django.core.cache import cache
+from django.db import transaction
 import pytz
 
 IST = pytz.timezone("Asia/Kolkata")
@@ -89,18 +90,19 @@ def create_booking(
     if not email:
         return "I need an email address to confirm your booking. Please provide it."
 
-    # Actually create booking
-    booking = Booking.objects.create(
-        user=user if user and user.is_authenticated else None,
-        reservation_date=date_obj,
-        reservation_time= selected_time,
-        no_of_guests=no_of_guests,
-        occasion=occasion,
-        email=email
-    )
-
-    # Use your existing email formatting exactly
-    BookingViewSet().send_confirmation_email(booking)
+    # Actually create booking (+ queue its confirmation email atomically)
+    with transaction.atomic():
+        booking = Booking.objects.create(
+            user=user if user and user.is_authenticated else None,
+            reservation_date=date_obj,
+            reservation_time= selected_time,
+            no_of_guests=no_of_guests,
+            occasion=occasion,
+            email=email
+        )
+
+        # Use your existing email formatting exactly
+        BookingViewSet().send_confirmation_email(booking)
 
     # Return a nicely formatted confirmation summary
     return f"""
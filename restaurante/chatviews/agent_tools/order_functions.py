@@ -1,10 +1,11 @@
 from restaurante.models import Order, OrderItem, MenuItem
 from restaurante.models import DELIVERY_TIME_SLOTS
+from restaurante.slot_capacity import SLOT_RESYNC_DAYS, in_slot_horizon, open_slots
 # from django.utils import timezone
 from restaurante.utils import clear_order_context
 from django.core.cache import cache
 
-from datetime import datetime
+from datetime import date, datetime
 import pytz
 
 IST = pytz.timezone("Asia/Kolkata")
@@ -14,6 +15,8 @@ def available_delivery_slots(delivery_date: str) -> dict:
     Returns available delivery slots for the given date.
     - For today: filters out past slots.
     - For future: returns all slots.
+    - Either way, slots the kitchen is already full for are left out (see slot_capacity.py).
+    - Dates before today or more than SLOT_RESYNC_DAYS ahead have no slots.
     """
     today_str = datetime.now(IST).date().isoformat()
     
@@ -26,13 +29,21 @@ def available_delivery_slots(delivery_date: str) -> dict:
                 slot_time = now.replace(hour=h, minute=m, second=0, microsecond=0)
                 if slot_time > now:
                     upcoming_slots.append(slot)
-                   
-        return {"delivery_date": delivery_date,
-            "available_slots": upcoming_slots}
     else:
         # All slots valid for future dates
-        return {"delivery_date": delivery_date,
-            "available_slots": [slot for slot, _ in DELIVERY_TIME_SLOTS]}
+        upcoming_slots = [slot for slot, _ in DELIVERY_TIME_SLOTS]
+
+    try:
+        day = date.fromisoformat(delivery_date)
+        if not in_slot_horizon(day):
+            return {"delivery_date": delivery_date, "available_slots": [],
+                    "message": f"We take delivery orders from today up to {SLOT_RESYNC_DAYS} days ahead. Please pick another date."}
+        upcoming_slots = open_slots(day, upcoming_slots)
+    except (TypeError, ValueError):
+        print(f"⚠️ available_delivery_slots: unexpected date {delivery_date!r}, capacity not checked")
+
+    return {"delivery_date": delivery_date,
+        "available_slots": upcoming_slots}
 
 
 
@@ -1,13 +1,15 @@
 # booking_logic.py
 import json
+import time
 from django.core.cache import cache
 from django.http import StreamingHttpResponse
-from restaurante.utils import save_chat_turn, save_to_db_conversation
+from restaurante.utils import save_chat_turn, save_to_db_conversation, save_tool_call_to_db
 from .agent_tools import TOOL_FUNCTION_MAP
 
 
 def handle_booking_logic(response, user, session_id, booking_context,booking_prompt, history_messages, client, message):
     booking_key = f"booking_context_{session_id}"  # reconstructed here
+    in_flight = None  # (func_name, args, started) while a tool is executing
     try:
         choice = response.choices[0]
         assistant_reply = getattr(choice.message, "content", "")
@@ -18,7 +20,8 @@ def handle_booking_logic(response, user, session_id, booking_context,booking_pro
         assistant_with_tools = {"role": "assistant", "content": assistant_reply or ""}
         history_messages.append(assistant_with_tools)
         save_chat_turn(user, session_id, "assistant", assistant_reply or "")
-        save_to_db_conversation(user, session_id, "assistant", assistant_reply or "")
+        # the completion's tokens are recorded once, here — not again on each tool call it requested
+        save_to_db_conversation(user, session_id, "assistant", assistant_reply or "", usage=response.usage)
 
 
         print(f"\n=== 📝 GPT REPLY (text) ===\n{assistant_reply}")
@@ -30,6 +33,7 @@ def handle_booking_logic(response, user, session_id, booking_context,booking_pro
             print(f"⚙️ Handling function call: {func_name} with args: {args}")
 
             func = TOOL_FUNCTION_MAP.get(func_name)
+            in_flight = (func_name, args, time.perf_counter())
 
             if func_name == "get_available_booking_times":
                 # user changed date, so update date and reset time
@@ -138,7 +142,9 @@ def handle_booking_logic(response, user, session_id, booking_context,booking_pro
             history_messages.append(function_message)
 
             save_chat_turn(user, session_id, role="function", message=f"{result}", name=func_name)
-            save_to_db_conversation(user, session_id, role="function", message=f"{func_name}: {result}")
+            save_tool_call_to_db(user, session_id, func_name, args, result,
+                                 latency_ms=(time.perf_counter() - in_flight[2]) * 1000)
+            in_flight = None
 
             # 🚨 Short-circuit if checkout_order — stream iframe message directly
             if func_name == "create_booking":
@@ -162,7 +168,7 @@ def handle_booking_logic(response, user, session_id, booking_context,booking_pro
             followup_reply = followup.choices[0].message.content or "🤖 Summary not available!"
 
             save_chat_turn(user, session_id, "assistant", followup_reply)
-            save_to_db_conversation(user, session_id, "assistant", followup_reply)
+            save_to_db_conversation(user, session_id, "assistant", followup_reply, usage=followup.usage)
 
             return StreamingHttpResponse(iter([followup_reply]), content_type='text/plain')
 
@@ -178,4 +184,8 @@ def handle_booking_logic(response, user, session_id, booking_context,booking_pro
 
     except Exception as e:
         print(f"❌ Exception: {e}")
+        if in_flight:
+            func_name, args, started = in_flight
+            save_tool_call_to_db(user, session_id, func_name, args, {"error": str(e)},
+                                 latency_ms=(time.perf_counter() - started) * 1000, succeeded=False)
         return StreamingHttpResponse(iter([f"⚠️ Error occurred: {str(e)}"]), content_type='text/plain')
@@ -11,6 +11,7 @@ def reset_chat_context(request):
     Clears chat/order/booking/lang/mode context for the normalized session_id.
     Keys cleared:
       - chat_history_{session_id}
+      - chat_summary_{session_id}
       - booking_context_{session_id}
       - order_context_{session_id}
       - lang_pref_{session_id}
@@ -31,6 +32,7 @@ def reset_chat_context(request):
 
     keys = [
         f"chat_history_{session_id}",
+        f"chat_summary_{session_id}",
         f"booking_context_{session_id}",
         f"order_context_{session_id}",
         f"lang_pref_{session_id}",
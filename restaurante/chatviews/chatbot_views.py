@@ -15,12 +15,16 @@ from .agent_tools import (AGENTIC_TOOLS,
                                      ORDER_AGENTIC_TOOLS)
 from django.core.cache import cache
 from restaurante.utils import (
+    chat_session_id,
     get_user_context, 
     get_chat_history, 
+    get_chat_summary,
     save_chat_turn, 
-    save_to_db_conversation)
+    save_to_db_conversation,
+    save_tool_call_to_db)
 
 from .booking_logic import handle_booking_logic
+from .llm_budget import MeteredOpenAI, llm_budgeted
 from .order_logic import handle_order_logic
 from django.conf import settings
 
@@ -37,23 +41,17 @@ frontend_url = settings.FRONTEND_URL or "http://localhost:3000"
 login_link = f'<a href="/login" data-spa="true">login</a>'
 
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+# every completion made while serving a chat request is charged to that request's token budget
+client = MeteredOpenAI(OpenAI(api_key=settings.OPENAI_API_KEY))
 
 @csrf_exempt
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@llm_budgeted(chat_session_id)
 def chaatgpt_view(request):
     user = request.user
     message = request.data.get("message", "").strip()
-    guest_id = request.headers.get("X-Guest-Id")
-    if user.is_authenticated:
-        session_id = f"user_{user.id}"
-    elif guest_id:
-        session_id = f"guest_{guest_id}"
-    else:
-        if not request.session.session_key:
-            request.session.create()
-        session_id = f"session_{request.session.session_key}"
+    session_id = chat_session_id(request)
 
     print(f"🚀 Using session_id: {session_id}")
 
@@ -65,16 +63,17 @@ def chaatgpt_view(request):
 
     # history and user context
     user_context = get_user_context(user)
-    menu_context = build_menu_context()
     # system_prompt = get_base_prompt_context(user_context, menu_context)
     history_messages = get_chat_history(user, session_id)
+    menu_context = build_menu_context(message, history_messages)
+    conversation_summary = get_chat_summary(user, session_id)
     
 
     if current_mode == "booking":
         print("🔁 Continuing existing booking flow")
 
         lang_pref = cache.get(f"lang_pref_{session_id}", None)
-        system_prompt = get_base_prompt_context(user_context, menu_context, lang_pref)
+        system_prompt = get_base_prompt_context(user_context, menu_context, lang_pref, conversation_summary)
     
         booking_context = cache.get(f"booking_context_{session_id}", {})
         dynamic_booking_prompt = get_dynamic_booking_context(booking_context)
@@ -133,7 +132,7 @@ def chaatgpt_view(request):
                 "content": json.dumps({"requires_login": True, "message": block_msg})
             })
             save_chat_turn(user, session_id, "function", block_msg, name="login_required")
-            save_to_db_conversation(user, session_id, "function", f"login_required: {block_msg}")
+            save_tool_call_to_db(user, session_id, "login_required", {}, {"requires_login": True, "message": block_msg})
 
             return StreamingHttpResponse(iter([block_msg]), content_type="text/plain")
         #############
@@ -141,7 +140,7 @@ def chaatgpt_view(request):
 
 
         lang_pref = cache.get(f"lang_pref_{session_id}", None)
-        system_prompt = get_base_prompt_context(user_context, menu_context, lang_pref)
+        system_prompt = get_base_prompt_context(user_context, menu_context, lang_pref, conversation_summary)
     
         order_context = cache.get(f"order_context_{session_id}", {})
         dynamic_order_prompt = get_dynamic_order_context(order_context)
@@ -191,7 +190,7 @@ def chaatgpt_view(request):
         save_to_db_conversation(user, session_id, "assistant", ask)
         return StreamingHttpResponse(iter([ask]), content_type="text/plain")
     
-    system_prompt = get_base_prompt_context(user_context, menu_context, lang_pref)
+    system_prompt = get_base_prompt_context(user_context, menu_context, lang_pref, conversation_summary)
     # else proceed with intent branches; pass lang_pref into base prompt
 
     if intent == "booking":
@@ -265,7 +264,7 @@ def chaatgpt_view(request):
                 "content": json.dumps({"requires_login": True, "message": block_msg})
             })
             save_chat_turn(user, session_id, "function", block_msg, name="login_required")
-            save_to_db_conversation(user, session_id, "function", f"login_required: {block_msg}")
+            save_tool_call_to_db(user, session_id, "login_required", {}, {"requires_login": True, "message": block_msg})
 
             return StreamingHttpResponse(iter([block_msg]), content_type="text/plain")
          ##########
@@ -357,7 +356,7 @@ def chaatgpt_view(request):
             save_chat_turn(user, session_id, "user", message)
             save_chat_turn(user, session_id, "assistant", reply)
             save_to_db_conversation(user, session_id, "user", message)
-            save_to_db_conversation(user, session_id, "assistant", reply)
+            save_to_db_conversation(user, session_id, "assistant", reply, usage=response.usage)
 
             return StreamingHttpResponse(iter([reply]), content_type='text/plain')
     
\ No newline at end of file
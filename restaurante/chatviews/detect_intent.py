@@ -3,7 +3,9 @@ from django.conf import settings
 from typing import Optional, Tuple
 from django.core.cache import cache
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+from .llm_budget import MeteredOpenAI
+
+client = MeteredOpenAI(OpenAI(api_key=settings.OPENAI_API_KEY))
 
 LANG_KEY_FMT = "lang_pref_{session_id}"  # values: "en" or "hn"
 
@@ -0,0 +1,218 @@
+# restaurante/chatviews/llm_budget.py
+import time
+from contextvars import ContextVar
+from functools import wraps
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from ..redis_client import get_redis
+
+LLM_BUDGET_WINDOW = getattr(settings, "LLM_BUDGET_WINDOW", 60 * 60)
+TRUSTED_PROXY_COUNT = getattr(settings, "TRUSTED_PROXY_COUNT", 0)  # reverse proxies in front of the app
+GUEST_IP_BUDGET = 60_000  # guests always have an IP scope: new guest ids don't buy new tokens
+
+# LLM tokens (prompt + completion) per sliding window, per scope
+LLM_TOKEN_BUDGETS = getattr(settings, "LLM_TOKEN_BUDGETS", {
+    "guest": {"session": 20_000, "ip": GUEST_IP_BUDGET},
+    "user": {"user": 150_000, "ip": 400_000},
+})
+
+BUDGET_EXHAUSTED_MSG = (
+    "Arre, aaj ke liye bahut baatein ho gayin! 😅 Thodi der baad phir aaiye — "
+    "or log in for a bigger chat allowance."
+)
+
+# Sliding-window counter: the previous fixed window counts in proportion to how much of it
+# still overlaps the sliding window. One round trip checks (add=0) or charges every scope.
+#   KEYS: cur_1, prev_1, cur_2, prev_2, ...   ARGV: add, prev_weight, ttl, limit_1, limit_2, ...
+SLIDING_WINDOW_LUA = """
+local add = tonumber(ARGV[1])
+local weight = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+local remaining = {}
+for i = 1, #KEYS / 2 do
+  local cur
+  if add > 0 then
+    cur = redis.call('INCRBY', KEYS[2 * i - 1], add)
+    redis.call('EXPIRE', KEYS[2 * i - 1], ttl)
+  else
+    cur = tonumber(redis.call('GET', KEYS[2 * i - 1]) or '0')
+  end
+  local prev = tonumber(redis.call('GET', KEYS[2 * i]) or '0')
+  remaining[i] = tonumber(ARGV[3 + i]) - cur - math.floor(prev * weight)
+end
+return remaining
+"""
+
+_current_budget = ContextVar("llm_budget", default=None)
+
+
+_proxy_warning_logged = False
+
+
+def _warn_untrusted_proxy():
+    global _proxy_warning_logged
+    if not _proxy_warning_logged:
+        _proxy_warning_logged = True
+        print("⚠️ X-Forwarded-For received but TRUSTED_PROXY_COUNT is 0: every client behind the proxy "
+              "shares one LLM budget. Set TRUSTED_PROXY_COUNT to the number of proxies in front of the app.")
+
+
+def client_ip(request):
+    """
+    The address budgets are charged to. X-Forwarded-For is client-controlled except for the
+    hops our own proxies append, so with TRUSTED_PROXY_COUNT = n the client is the n-th entry
+    from the right; with no trusted proxies it's REMOTE_ADDR, whatever the headers say.
+    """
+    remote = request.META.get("REMOTE_ADDR", "unknown")
+    if not TRUSTED_PROXY_COUNT:
+        if "HTTP_X_FORWARDED_FOR" in request.META:
+            _warn_untrusted_proxy()
+        return remote
+    hops = [hop.strip() for hop in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if hop.strip()]
+    if len(hops) < TRUSTED_PROXY_COUNT:
+        return remote  # didn't come through all our proxies
+    return hops[-TRUSTED_PROXY_COUNT]
+
+
+class LLMBudget:
+    """Token budget for one chat request across its scopes (session/user and IP)."""
+
+    def __init__(self, scopes, window=LLM_BUDGET_WINDOW):
+        self.scopes = scopes  # [(name, identifier, limit), ...]
+        self.window = window
+        self.remaining = {}
+
+    def _windows(self):
+        now = time.time()
+        index = int(now // self.window)
+        weight = 1 - (now % self.window) / self.window
+        return index, weight, self.window - now % self.window
+
+    def _keys(self, index):
+        keys = []
+        for name, ident, _ in self.scopes:
+            keys += [f"llm_budget_{name}_{ident}_{index}", f"llm_budget_{name}_{ident}_{index - 1}"]
+        return keys
+
+    def _run(self, add):
+        index, weight, _ = self._windows()
+        keys = self._keys(index)
+        limits = [limit for _, _, limit in self.scopes]
+        conn = get_redis()  # None on a non-Redis cache: non-atomic fallback below
+        if conn is not None:
+            try:
+                result = conn.register_script(SLIDING_WINDOW_LUA)(
+                    keys=keys, args=[add, weight, self.window * 2, *limits]
+                )
+            except Exception as e:
+                print(f"⚠️ LLM budget check skipped (Redis error): {e}")
+                return self.remaining  # fail open: chat keeps working without Redis
+        else:
+            result = []
+            for i, limit in enumerate(limits):
+                cur_key, prev_key = keys[2 * i], keys[2 * i + 1]
+                if add:
+                    cache.add(cur_key, 0, timeout=self.window * 2)
+                    cur = cache.incr(cur_key, add)
+                else:
+                    cur = cache.get(cur_key, 0)
+                result.append(limit - cur - int(cache.get(prev_key, 0) * weight))
+        self.remaining = {name: int(r) for (name, _, _), r in zip(self.scopes, result)}
+        return self.remaining
+
+    def check(self):
+        return self._run(0)
+
+    def charge(self, tokens):
+        if tokens > 0:
+            self._run(int(tokens))
+
+    @property
+    def exhausted(self):
+        return any(r <= 0 for r in self.remaining.values())
+
+    def apply_headers(self, response):
+        if not self.remaining:
+            return response
+        name = min(self.remaining, key=self.remaining.get)
+        limit = next(limit for scope, _, limit in self.scopes if scope == name)
+        response["X-LLM-Budget-Limit"] = str(limit)
+        response["X-LLM-Budget-Remaining"] = str(max(0, self.remaining[name]))
+        response["X-LLM-Budget-Scope"] = name
+        response["X-LLM-Budget-Window"] = str(self.window)
+        if self.exhausted:
+            response["Retry-After"] = str(int(self._windows()[2]) + 1)
+        return response
+
+
+def budget_for(request, session_id):
+    user = request.user
+    if user.is_authenticated:
+        tier = LLM_TOKEN_BUDGETS["user"]
+        idents = {"user": user.id, "ip": client_ip(request)}
+    else:
+        # the session id comes from X-Guest-Id, which a client can rotate at will; the IP scope
+        # is what actually caps a guest
+        tier = {"ip": GUEST_IP_BUDGET, **LLM_TOKEN_BUDGETS["guest"]}
+        idents = {"session": session_id, "ip": client_ip(request)}
+    return LLMBudget([(name, idents[name], limit) for name, limit in tier.items()])
+
+
+def charge_usage(usage):
+    """Charges a completion's usage to the budget of the chat request in progress (if any)."""
+    budget = _current_budget.get()
+    if budget is not None and usage is not None:
+        budget.charge(getattr(usage, "total_tokens", 0) or 0)
+
+
+def llm_budgeted(session_id_func):
+    """
+    View decorator (inside @api_view): rejects with 429 once any scope's budget is spent,
+    charges every completion made while the view runs, and reports the tightest
+    remaining budget in X-LLM-Budget-* headers.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            budget = budget_for(request, session_id_func(request))
+            budget.check()
+            if budget.exhausted:
+                return budget.apply_headers(
+                    HttpResponse(BUDGET_EXHAUSTED_MSG, status=429, content_type="text/plain")
+                )
+            token = _current_budget.set(budget)
+            try:
+                response = view(request, *args, **kwargs)
+            finally:
+                _current_budget.reset(token)
+            return budget.apply_headers(response)
+        return wrapper
+    return decorator
+
+
+class _MeteredCompletions:
+    def __init__(self, completions):
+        self._completions = completions
+
+    def create(self, *args, **kwargs):
+        response = self._completions.create(*args, **kwargs)
+        charge_usage(getattr(response, "usage", None))
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._completions, name)
+
+
+class MeteredOpenAI:
+    """OpenAI client whose chat completions are charged to the current request's LLM budget."""
+
+    def __init__(self, client):
+        self._client = client
+        self.chat = SimpleNamespace(completions=_MeteredCompletions(client.chat.completions))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
@@ -0,0 +1,105 @@
+# menu_retrieval.py
+import difflib
+import math
+import re
+from collections import Counter
+
+from restaurante.models import MenuItem
+from restaurante.menu_cache import get_menu_version
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+TITLE_WEIGHT = 3      # a hit on the title counts more than one in the description
+CATEGORY_WEIGHT = 2
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+
+class MenuIndex:
+    """
+    Small in-process BM25 index over title, description and category of every MenuItem.
+    Built once per menu version; search is pure Python and never touches the DB.
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self.doc_tf = []
+        df = Counter()
+        for item in items:
+            tokens = (
+                tokenize(item["title"]) * TITLE_WEIGHT
+                + tokenize(item["category"]) * CATEGORY_WEIGHT
+                + tokenize(item["description"])
+            )
+            tf = Counter(tokens)
+            self.doc_tf.append((tf, len(tokens)))
+            df.update(tf.keys())
+
+        n = len(items)
+        self.avgdl = (sum(length for _, length in self.doc_tf) / n) if n else 0
+        self.idf = {
+            term: math.log(1 + (n - freq + 0.5) / (freq + 0.5))
+            for term, freq in df.items()
+        }
+        self.categories = sorted({item["category"] for item in items if item["category"]})
+        self.featured = [item for item in items if item["featured"]]
+
+    def search(self, query, k=8, fuzzy=False):
+        terms = set()
+        for token in set(tokenize(query)):
+            if token in self.idf:
+                terms.add(token)
+            elif fuzzy and len(token) > 3:
+                # typo tolerance: "samose" -> "samosa", "panir" -> "paneer"
+                terms.update(difflib.get_close_matches(token, self.idf.keys(), n=2, cutoff=0.75))
+        if not terms:
+            return []
+
+        scored = []
+        for item, (tf, length) in zip(self.items, self.doc_tf):
+            score = 0.0
+            for term in terms:
+                f = tf.get(term)
+                if f:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (self.avgdl or 1))
+                    score += self.idf[term] * f * (BM25_K1 + 1) / (f + norm)
+            if score > 0:
+                scored.append((score, item))
+
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return [item for _, item in scored[:k]]
+
+
+_index = None
+_index_version = None
+
+
+def get_menu_index():
+    """Returns the BM25 index for the current menu version, rebuilding it after menu edits."""
+    global _index, _index_version
+    version = get_menu_version()
+    if _index is None or version != _index_version:
+        items = [
+            {
+                "id": m.id,
+                "title": m.title,
+                "price": m.price,
+                "description": m.description or "",
+                "category": m.category.title if m.category_id else "",
+                "featured": m.featured,
+                "aliases": [a.strip() for a in m.aliases.split(",") if a.strip()],
+            }
+            for m in MenuItem.objects.select_related("category").order_by("id")
+        ]
+        _index, _index_version = MenuIndex(items), version
+        print(f"📚 Rebuilt menu index v{version} ({len(items)} items)")
+    return _index
+
+
+def retrieval_query(message, history=None, turns=3):
+    """Current message plus the last few user turns, so follow-ups like 'make it 3' keep their item."""
+    recent = [m.get("content") or "" for m in (history or []) if m.get("role") == "user"][-turns:]
+    return " ".join(recent + [message or ""])
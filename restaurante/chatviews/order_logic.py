@@ -1,12 +1,14 @@
 # order_logic.py
 import json
 import inspect
+import time
 from django.conf import settings
 from django.core.cache import cache
 from django.http import StreamingHttpResponse
 from restaurante.utils import (
     save_chat_turn, 
     save_to_db_conversation, 
+    save_tool_call_to_db,
     set_order_context, 
     resolve_date_keyword)
 
@@ -29,7 +31,8 @@ def handle_order_logic(response, user, session_id, order_context, order_prompt,
         assistant_with_tools = {"role": "assistant", "content": assistant_reply or ""}
         history_messages.append(assistant_with_tools)
         save_chat_turn(user, session_id, "assistant", assistant_reply or "")
-        save_to_db_conversation(user, session_id, "assistant", assistant_reply or "")
+        # the completion's tokens are recorded once, here — not again on each tool call it requested
+        save_to_db_conversation(user, session_id, "assistant", assistant_reply or "", usage=response.usage)
 
         
         print(f"\n=== 📝 GPT REPLY (text) ===\n{assistant_reply}")
@@ -110,6 +113,7 @@ def handle_order_logic(response, user, session_id, order_context, order_prompt,
                 continue
 
             # Execute the function
+            started = time.perf_counter()
             try:
                 if "user" in inspect.signature(func).parameters:
                     result = func(user=user, **args)
@@ -117,7 +121,10 @@ def handle_order_logic(response, user, session_id, order_context, order_prompt,
                     result = func(**args)
             except Exception as e:
                 print(f"❌ Exception calling {func_name}: {e}")
+                save_tool_call_to_db(user, session_id, func_name, args, {"error": str(e)},
+                                     latency_ms=(time.perf_counter() - started) * 1000, succeeded=False)
                 return StreamingHttpResponse(iter([f"⚠️ Error occurred: {str(e)}"]), content_type='text/plain')
+            latency_ms = (time.perf_counter() - started) * 1000
 
             # Handle context updates
             if isinstance(result, dict):
@@ -200,7 +207,7 @@ def handle_order_logic(response, user, session_id, order_context, order_prompt,
                 function_message = {"role": "function", "name": func_name, "content": json.dumps(result)}
                 history_messages.append(function_message)
                 save_chat_turn(user, session_id, "function", json.dumps(result), name=func_name)
-                save_to_db_conversation(user, session_id, "function", f"{func_name}: {result}")
+                save_tool_call_to_db(user, session_id, func_name, args, result, latency_ms=latency_ms)
 
                 # 🚨 Short-circuit if checkout_order — stream iframe message directly
                 if func_name == "checkout_order":
@@ -225,7 +232,7 @@ def handle_order_logic(response, user, session_id, order_context, order_prompt,
                 followup_reply = followup.choices[0].message.content or "🤖 Summary not available!"
 
                 save_chat_turn(user, session_id, "assistant", followup_reply)
-                save_to_db_conversation(user, session_id, "assistant", followup_reply)
+                save_to_db_conversation(user, session_id, "assistant", followup_reply, usage=followup.usage)
 
                 return StreamingHttpResponse(iter([followup_reply]), content_type='text/plain')
 
@@ -1,5 +1,6 @@
 # from django.core.cache import cache
-from restaurante.models import Category, MenuItem, Order, DELIVERY_TIME_SLOTS
+from restaurante.models import Order, DELIVERY_TIME_SLOTS
+from .menu_retrieval import get_menu_index, retrieval_query
 from datetime import datetime
 from typing import Optional
 
@@ -27,23 +28,63 @@ logger = logging.getLogger(__name__)  # one-time module logger
 # today_date = current_date.strftime("%-d %B")
 
 
-def build_menu_context():
-# prepare static restaurant context
-    categories = Category.objects.all()
-    category_str = ", ".join([c.title for c in categories]) or "No categories."
-    menu_items = MenuItem.objects.all()
-    menu_list = "\n".join([
-        f"{item.title} (₹{item.price}) - {item.description or 'No description'}"
-        for item in menu_items
-    ]) or "No menu data."
-    specials = MenuItem.objects.filter(featured=True)
-    specials_list = "\n".join([
-        f"{item.title} (₹{item.price}) - {item.description or 'No description'}"
-        for item in specials
-    ]) or "No specials."
+MENU_TOP_K = 8  # relevant items injected per turn, on top of the featured specials
+
+
+def _format_menu_line(item):
+    return f"{item['title']} (₹{item['price']}) - {item['description'] or 'No description'}"
+
+
+def _menu_footer():
     delivery_slots = ", ".join([slot[0] for slot in DELIVERY_TIME_SLOTS])
     delivery_types = ", ".join([c[0] for c in Order._meta.get_field('delivery_type').choices])
     payment_methods = ", ".join([c[0] for c in Order._meta.get_field('payment_method').choices])
+    return f"""
+🚚 DELIVERY TIME SLOTS:
+{delivery_slots}
+
+✅ DELIVERY TYPES: {delivery_types}
+✅ PAYMENT METHODS: {payment_methods}
+""".strip()
+
+
+def build_menu_context(message=None, history=None, top_k=MENU_TOP_K, index=None):
+    """
+    Menu block for the system prompt: categories, featured specials and only the
+    top-k items relevant to this turn (BM25 over title/description/category).
+    Size stays roughly constant however big the menu grows.
+    """
+    index = index or get_menu_index()
+    relevant = index.search(retrieval_query(message, history), k=top_k)
+    category_str = ", ".join(index.categories) or "No categories."
+    specials_list = "\n".join([_format_menu_line(item) for item in index.featured]) or "No specials."
+    featured_ids = {item["id"] for item in index.featured}
+    relevant_list = "\n".join([
+        _format_menu_line(item) for item in relevant if item["id"] not in featured_ids
+    ]) or "No other matching items — ask the user which category or dish they want."
+
+    MENU_CONTEXT = f"""
+🍽️ OUR MENU CATEGORIES:
+{category_str}
+
+🌟 FEATURED SPECIALS:
+{specials_list}
+
+🔎 MENU ITEMS RELEVANT TO THIS MESSAGE (not the full menu — if the user asks for something
+not listed here, it may still exist; never say we don't have it, ask them to name the dish or category):
+{relevant_list}
+
+{_menu_footer()}
+""".strip()
+    return MENU_CONTEXT
+
+
+def build_full_menu_context(index=None):
+    # old behaviour: every MenuItem in every prompt (kept for benchmarking)
+    index = index or get_menu_index()
+    category_str = ", ".join(index.categories) or "No categories."
+    specials_list = "\n".join([_format_menu_line(item) for item in index.featured]) or "No specials."
+    menu_list = "\n".join([_format_menu_line(item) for item in index.items]) or "No menu data."
 
     MENU_STATIC_CONTEXT = f"""
 🍽️ OUR MENU CATEGORIES:
@@ -55,11 +96,7 @@ def build_menu_context():
 📜 FULL MENU ITEMS:
 {menu_list}
 
-🚚 DELIVERY TIME SLOTS:
-{delivery_slots}
-
-✅ DELIVERY TYPES: {delivery_types}
-✅ PAYMENT METHODS: {payment_methods}
+{_menu_footer()}
 """.strip()
     return MENU_STATIC_CONTEXT
 
@@ -201,7 +238,8 @@ If they confirm cancellation, use the `cancel_booking` tool immediately with can
 
 """.strip()
 
-def get_base_prompt_context(user_context, menu_context, lang_pref: Optional[str] = None):
+def get_base_prompt_context(user_context, menu_context, lang_pref: Optional[str] = None,
+                            conversation_summary: Optional[str] = None):
     is_en = (lang_pref == "en")
 
     style_block = (
@@ -218,6 +256,12 @@ def get_base_prompt_context(user_context, menu_context, lang_pref: Optional[str]
 
     lang_note = f"🌐 Language Mode:\n- Current mode: {'English' if is_en else 'Hinglish'}. If the user asks to switch later, switch immediately.\n"
 
+    summary_block = (
+        "🧾 EARLIER IN THIS CONVERSATION (summary — treat as facts the user already told you, don't ask again):\n"
+        f"{conversation_summary}\n"
+        if conversation_summary else ""
+    )
+
     return f"""
 You are चाटGPT — a witty Indian street food assistant 🍲😄
 
@@ -252,6 +296,7 @@ If unsure, ask the user a brief clarifying question.
 USER CONTEXT:
 {user_context}
 
+{summary_block}
 {menu_context}
 """.strip()
 
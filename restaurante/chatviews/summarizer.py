@@ -0,0 +1,103 @@
+# summarizer.py
+import json
+from openai import OpenAI
+from django.conf import settings
+from django.core.cache import cache
+from restaurante.background import run_in_background
+from restaurante.redis_client import update_cached
+
+client = OpenAI(api_key=settings.OPENAI_API_KEY)
+
+CHAT_HISTORY_WINDOW = 8      # messages sent verbatim to the model (see get_chat_history)
+SUMMARY_TRIGGER = 16         # fold once the cached history grows past this many messages
+CHAT_CACHE_TIMEOUT = 600     # same lifetime as chat_history_*
+SUMMARY_MODEL = "gpt-4o-mini"
+
+
+def summary_key_for(history_key):
+    # chat_history_user_7 -> chat_summary_user_7 (lives right next to the history)
+    return history_key.replace("chat_history_", "chat_summary_", 1)
+
+
+def get_summary(history_key):
+    return cache.get(summary_key_for(history_key)) or ""
+
+
+def get_summary_prompt():
+    return """
+You maintain a running memory for a restaurant chat assistant.
+Merge the PREVIOUS SUMMARY with the NEW MESSAGES into one compact summary (max 120 words).
+
+Keep only facts that matter later:
+- user's name / how they want to be addressed, language preference
+- booking details: date, time, guests, occasion, email, reference numbers
+- order details: order id, items and quantities, delivery date/time, pickup/delivery, address, payment method
+- preferences, dislikes, allergies, and anything the user asked us to remember
+
+Drop greetings, jokes and tool chatter. Write plain bullet points, no preamble.
+""".strip()
+
+
+def summarize_history(history_key):
+    """
+    Folds everything older than the last CHAT_HISTORY_WINDOW messages into
+    chat_summary_* and trims the cached history down to the window.
+    Runs on the background pool; never call this on the request path.
+    """
+    summary_key = summary_key_for(history_key)
+    lock_key = f"{summary_key}_lock"
+    if not cache.add(lock_key, 1, timeout=60):
+        return  # another worker is already folding this session
+
+    try:
+        history = cache.get(history_key, [])
+        folded = history[:-CHAT_HISTORY_WINDOW]
+        if not folded:
+            return
+
+        previous = cache.get(summary_key) or "None yet."
+        transcript = "\n".join(
+            f"{m.get('role')}{'/' + m['name'] if m.get('name') else ''}: {m.get('content') or ''}"
+            for m in folded
+        )
+
+        resp = client.chat.completions.create(
+            model=SUMMARY_MODEL,
+            messages=[
+                {"role": "system", "content": get_summary_prompt()},
+                {"role": "user", "content": f"PREVIOUS SUMMARY:\n{previous}\n\nNEW MESSAGES:\n{transcript}"},
+            ],
+            temperature=0,
+            max_tokens=300,
+        )
+        summary = (resp.choices[0].message.content or "").strip()
+        if not summary:
+            return
+
+        # Trim as a compare-and-set: turns saved meanwhile are kept, and nothing is trimmed if
+        # the folded prefix is gone (history reset while we were summarizing)
+        trimmed = False
+
+        def trim(current):
+            nonlocal trimmed
+            current = current or []
+            trimmed = json.dumps(current[:len(folded)], sort_keys=True) == json.dumps(folded, sort_keys=True)
+            return current[len(folded):] if trimmed else current
+
+        update_cached(history_key, trim, timeout=CHAT_CACHE_TIMEOUT)
+        if not trimmed:
+            print(f"⚠️ History for {history_key} changed while summarizing; skipping trim.")
+            return
+
+        cache.set(summary_key, summary, timeout=CHAT_CACHE_TIMEOUT)
+        print(f"🧾 Folded {len(folded)} messages into {summary_key}")
+    finally:
+        cache.delete(lock_key)
+
+
+def maybe_schedule_summary(history_key, history):
+    """Called after every save; kicks off a background fold once the threshold is crossed."""
+    # keep the summary alive for as long as the history it belongs to
+    cache.touch(summary_key_for(history_key), CHAT_CACHE_TIMEOUT)
+    if len(history) > SUMMARY_TRIGGER:
+        run_in_background(summarize_history, history_key)
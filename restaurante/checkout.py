@@ -0,0 +1,102 @@
+# restaurante/checkout.py
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Sum
+
+from .cart_store import CartLine, get_cart, flush_cart
+from .email_rendering import render_email
+from .models import Cart, OrderItem, UserProfile
+from .outbox import queue_email
+from .stripe_payment import close_payment_intent, open_payment_intent_id
+
+
+class EmptyCartError(Exception):
+    pass
+
+
+def checkout_cart(user, order_serializer):
+    """
+    Turns the user's cart into an order in one transaction: lock the cart rows, total them in
+    the DB, save the (already validated) order, copy all lines with a single bulk INSERT and
+    empty the cart. A fixed number of queries whatever the cart size; a crash anywhere
+    leaves the cart untouched. The confirmation email is queued in the same transaction.
+    The in-memory cart is written back first; once the order commits, exactly the ordered
+    lines are removed from it (anything added meanwhile stays).
+    """
+    cart = get_cart(user)
+    flush_cart(user.pk)
+    cart.begin_checkout()  # background write-backs leave the cart alone until the ordered lines are gone
+    try:
+        order = _place_order(user, order_serializer, cart)
+    except BaseException:
+        cart.end_checkout()
+        raise
+    return order
+
+
+def _place_order(user, order_serializer, cart):
+    with transaction.atomic():
+        # lock first so a concurrent add-to-cart / second checkout waits for us
+        lines = list(
+            Cart.objects.select_for_update()
+            .filter(user=user)
+            .values_list("menuitem_id", "quantity", "unit_price", "price")
+        )
+        if not lines:
+            raise EmptyCartError("No item in cart")
+
+        total = Cart.objects.filter(user=user).aggregate(total=Sum("price"))["total"]
+        extra = {}
+        if order_serializer.validated_data.get("payment_method") == "stripe":
+            # link the intent the client paid with, only if it was made for this very cart
+            # (raises PaymentIntentMismatch otherwise); released only if the order commits
+            extra["stripe_payment_intent_id"] = open_payment_intent_id(
+                user.pk, [CartLine(user.pk, m, q, u) for m, q, u, _ in lines], total
+            )
+            transaction.on_commit(lambda: close_payment_intent(user.pk))
+        order = order_serializer.save(user=user, total=total, **extra)
+
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, menuitem_id=menuitem_id, quantity=quantity, price=price)
+            for menuitem_id, quantity, _, price in lines
+        )
+        Cart.objects.filter(user=user).delete()
+        ordered = [(menuitem_id, quantity, unit_price) for menuitem_id, quantity, unit_price, _ in lines]
+
+        def release_cart():
+            cart.discard(ordered)
+            cart.end_checkout()
+        transaction.on_commit(release_cart)
+
+        queue_order_confirmation(order)
+    return order
+
+
+def queue_order_confirmation(order):
+    """Renders the order confirmation and writes it to the email outbox."""
+    user = order.user
+    if not user.email:
+        return None
+    if User.profile.is_cached(user):  # caller used select_related("user__profile")
+        user_profile = getattr(user, 'profile', None)
+        gender = getattr(user_profile, 'gender', '') if user_profile else ''
+    else:
+        # one small query, and nothing cached on the (possibly reused) user instance
+        gender = UserProfile.objects.filter(user_id=user.pk).values_list('gender', flat=True).first() or ''
+    address = "Chatoree" if gender.lower() == "f" else "Chatore"
+
+    context = {
+        "user": user,
+        "order": order,
+        "order_items": OrderItem.objects.filter(order=order).select_related("menuitem"),
+        "address": address,
+    }
+
+    html_content, text_content = render_email("order_confirmation", context)
+    return queue_email(
+        subject=f"Order Confirmation - Order #{order.id}",
+        to=[user.email],
+        html=html_content,
+        body=text_content,
+        from_email="Dhanno Banno Ki Rasoi <dhannobannokirasoi@gmail.com>",
+    )
@@ -0,0 +1,39 @@
+# restaurante/cleanup.py
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Order
+
+CLEANUP_BATCH_SIZE = 500
+
+
+def expired_unconfirmed_orders(current_time=None):
+    """
+    Unconfirmed orders whose delivery time has passed: any earlier date, or today with a
+    slot before now. Slots are zero-padded "HH:MM", so string order is time order; "ASAP"
+    orders for today are still valid. Served by the partial order_unconfirmed_idx index.
+    """
+    current_time = timezone.localtime(current_time or timezone.now())
+    today = current_time.date()
+    return Order.objects.filter(is_confirmed=False).filter(
+        Q(date__lt=today)
+        | (Q(date=today, delivery_time_slot__lt=current_time.strftime("%H:%M")) & ~Q(delivery_time_slot="ASAP"))
+    )
+
+
+def delete_expired_orders(batch_size=CLEANUP_BATCH_SIZE, current_time=None):
+    """
+    Deletes expired unconfirmed orders (and their items) in primary-key batches, so no
+    single statement or transaction grows with the backlog. Returns the number of orders deleted.
+    """
+    expired = expired_unconfirmed_orders(current_time)
+    deleted = 0
+    last_pk = 0
+    while True:
+        ids = list(expired.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        last_pk = ids[-1]
+        # re-check the expiry rule in the DELETE itself: an order confirmed since the SELECT stays
+        _, per_model = expired.filter(pk__in=ids).delete()  # items go in one set-based DELETE
+        deleted += per_model.get(Order._meta.label, 0)
@@ -0,0 +1,108 @@
+# restaurante/dispatch.py
+import heapq
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Order, today
+from .order_events import publish_order_updates
+from .roles import DELIVERY_CREW, normalize_group_name
+
+# One "run" = orders for the same zone and slot that one rider takes together.
+DISPATCH_ZONE_DIGITS = getattr(settings, "DISPATCH_ZONE_DIGITS", 6)  # PIN prefix that makes a zone (6 = exact PIN)
+DISPATCH_MAX_RUN = getattr(settings, "DISPATCH_MAX_RUN", 6)          # orders per run
+DISPATCH_UPDATE_BATCH = 500
+
+
+def zone_of(pin):
+    pin = (pin or "").replace(" ", "")
+    return pin[:DISPATCH_ZONE_DIGITS] if pin else "unknown"
+
+
+def delivery_crew_ids():
+    """Active members of the delivery crew group, however the group is spelled."""
+    groups = [g.id for g in Group.objects.all() if normalize_group_name(g.name) == DELIVERY_CREW]
+    return list(
+        User.objects.filter(groups__in=groups, is_active=True).distinct().order_by("id").values_list("id", flat=True)
+    )
+
+
+def plan_dispatch(orders, crew_ids, existing_load=None, max_run=DISPATCH_MAX_RUN):
+    """
+    Groups orders into runs by (slot, zone) — at most `max_run` orders each, neighbouring PINs
+    together — and hands each slot's runs to the crew, largest run first, always to the rider
+    with the lightest load in that slot (ties: lightest day, then lowest id). Greedy LPT with a
+    heap: O(n log n) in orders, O(log c) per run in crew size.
+
+    existing_load: {(crew_id, slot): orders already assigned}. Returns [(crew_id, [orders])].
+    """
+    existing_load = existing_load or {}
+    day_load = Counter()
+    for (crew_id, _), n in existing_load.items():
+        day_load[crew_id] += n
+
+    groups = defaultdict(list)
+    for order in orders:
+        groups[(order.delivery_time_slot, zone_of(order.delivery_pin))].append(order)
+    runs_by_slot = defaultdict(list)
+    for (slot, _), group in groups.items():
+        group.sort(key=lambda o: (o.delivery_pin or "", o.id))
+        for i in range(0, len(group), max_run):
+            runs_by_slot[slot].append(group[i:i + max_run])
+
+    plan = []
+    for slot in sorted(runs_by_slot):
+        heap = [(existing_load.get((crew_id, slot), 0), day_load[crew_id], crew_id) for crew_id in crew_ids]
+        heapq.heapify(heap)
+        for run in sorted(runs_by_slot[slot], key=len, reverse=True):
+            slot_load, _, crew_id = heapq.heappop(heap)
+            day_load[crew_id] += len(run)
+            plan.append((crew_id, run))
+            heapq.heappush(heap, (slot_load + len(run), day_load[crew_id], crew_id))
+    return plan
+
+
+def dispatch_orders(day=None, dry_run=False):
+    """
+    Assigns every confirmed, unassigned delivery order for `day` (default today) to the delivery
+    crew, balanced against what each rider already has that day. One locking SELECT, one
+    grouped load query and one bulk_update, whatever the number of orders.
+    Returns a summary: orders, runs, per-crew counts.
+    """
+    day = day or today()
+    crew_ids = delivery_crew_ids()
+    summary = {"date": day, "orders": 0, "runs": 0, "per_crew": {}, "dry_run": dry_run}
+    if not crew_ids:
+        print("⚠️ Dispatch skipped: nobody is in the delivery crew group")
+        return summary
+
+    with transaction.atomic():
+        orders = list(
+            Order.objects.select_for_update()
+            .filter(date=day, is_confirmed=True, delivery_type="delivery", delivery_crew__isnull=True)
+            .only("id", "user_id", "delivery_pin", "delivery_time_slot", "status", "payment_status",
+                  "is_confirmed", "delivery_crew")
+        )
+        if not orders:
+            return summary
+        existing_load = {
+            (row["delivery_crew_id"], row["delivery_time_slot"]): row["n"]
+            for row in Order.objects.filter(date=day, status=False, delivery_crew_id__in=crew_ids)
+            .values("delivery_crew_id", "delivery_time_slot").annotate(n=Count("id")).order_by()
+        }
+        plan = plan_dispatch(orders, crew_ids, existing_load)
+
+        per_crew = Counter()
+        for crew_id, run in plan:
+            per_crew[crew_id] += len(run)
+            for order in run:
+                order.delivery_crew_id = crew_id
+        if not dry_run:
+            Order.objects.bulk_update(orders, ["delivery_crew"], batch_size=DISPATCH_UPDATE_BATCH)
+            publish_order_updates(orders)
+
+    summary.update(orders=len(orders), runs=len(plan), per_crew=dict(per_crew))
+    return summary
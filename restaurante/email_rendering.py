@@ -0,0 +1,64 @@
+# restaurante/email_rendering.py
+from functools import lru_cache
+
+from django.conf import settings
+from django.template.loader import get_template, render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+# name -> (html template, text template, header photo under /static/img/)
+EMAIL_TEMPLATES = {
+    "booking_confirmation": ("book_confirm.html", "email/book_confirm.txt", "bannocopy.jpg"),
+    "booking_cancellation": ("booking_cancelled.html", "email/booking_cancelled.txt", "bannocopy.jpg"),
+    "order_confirmation": ("order_confirmation_email.html", "email/order_confirmation_email.txt", "banno2.png"),
+}
+
+
+def photo_link(filename):
+    return f"{settings.BACKEND_URL}/static/img/{filename}"
+
+
+@lru_cache(maxsize=None)
+def brand_header(photo):
+    """Logo + title block, identical for every email using the same photo — rendered once."""
+    return mark_safe(render_to_string("email/_brand_header.html", {"photo_link": photo_link(photo)}))
+
+
+@lru_cache(maxsize=None)
+def footer(year):
+    return mark_safe(render_to_string("email/_footer.html", {"year": year}))
+
+
+class CompiledEmail:
+    """An email's HTML and text templates, compiled once, plus its pre-rendered static context."""
+
+    def __init__(self, html_name, text_name, photo):
+        self.html = get_template(html_name)
+        self.text = get_template(text_name)
+        self.photo = photo
+        self.static_context = {
+            "photo_link": photo_link(photo),
+            "brand_header": brand_header(photo),
+        }
+
+    def render(self, context):
+        year = timezone.now().year
+        context = {**self.static_context, "year": year, "footer": footer(year), **context}
+        return self.html.render(context), self.text.render(context)
+
+
+@lru_cache(maxsize=None)
+def get_email(name):
+    return CompiledEmail(*EMAIL_TEMPLATES[name])
+
+
+def render_email(name, context):
+    """Returns (html, text) for one of EMAIL_TEMPLATES."""
+    return get_email(name).render(context)
+
+
+def clear_email_cache():
+    """Drop compiled templates/fragments (after changing BACKEND_URL or editing templates)."""
+    get_email.cache_clear()
+    brand_header.cache_clear()
+    footer.cache_clear()
@@ -0,0 +1,113 @@
+import gzip
+import json
+import tempfile
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.module_loading import import_string
+from django.utils.timezone import now
+
+from restaurante.models import ChatHistory
+
+ARCHIVE_FIELDS = [
+    "id", "user_id", "session_id", "role", "message",
+    "function_name", "function_arguments", "function_result",
+    "succeeded", "latency_ms", "prompt_tokens", "completion_tokens", "timestamp",
+]
+
+
+def archive_storage():
+    """The private storage from settings.CHAT_ARCHIVE_STORAGE (archives contain personal data)."""
+    config = settings.CHAT_ARCHIVE_STORAGE
+    return import_string(config["BACKEND"])(**config.get("OPTIONS", {}))
+
+
+def month_bounds(month_start):
+    if month_start.month == 12:
+        return month_start, month_start.replace(year=month_start.year + 1, month=1)
+    return month_start, month_start.replace(month=month_start.month + 1)
+
+
+class Command(BaseCommand):
+    help = (
+        "Archives ChatHistory older than N days into one gzipped JSONL file per month "
+        "(in the private CHAT_ARCHIVE_STORAGE bucket) and deletes the archived rows in small batches"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=90, help="Keep this many days of chat history")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Rows read/deleted per round trip")
+        parser.add_argument("--sleep", type=float, default=0.05,
+                            help="Pause between delete batches so other writers get the table")
+        parser.add_argument("--prefix", default="archives/chat_history", help="Storage path prefix")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        cutoff = now() - timedelta(days=options["days"])
+        old_rows = ChatHistory.objects.filter(timestamp__lt=cutoff)
+        months = list(old_rows.datetimes("timestamp", "month"))
+
+        if not months:
+            self.stdout.write("ℹ️ No chat history older than the retention window.")
+            return
+
+        for month in months:
+            start, end = month_bounds(month)
+            month_rows = old_rows.filter(timestamp__gte=start, timestamp__lt=end)
+
+            if options["dry_run"]:
+                self.stdout.write(f"📦 {start:%Y-%m}: {month_rows.count()} row(s) would be archived")
+                continue
+
+            archived, first_id, last_id = self.archive_month(month_rows, start, options)
+            if not archived:
+                continue
+            deleted = self.delete_range(month_rows, first_id, last_id, options)
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {start:%Y-%m}: archived {archived} row(s), deleted {deleted}"
+            ))
+
+    def archive_month(self, month_rows, start, options):
+        """Streams the month in keyset batches into a gzip temp file, then uploads it."""
+        count, first_id, last_id = 0, None, 0
+        with tempfile.TemporaryFile() as tmp:
+            with gzip.GzipFile(fileobj=tmp, mode="wb") as gz:
+                while True:
+                    batch = list(
+                        month_rows.filter(id__gt=last_id)
+                        .order_by("id")
+                        .values(*ARCHIVE_FIELDS)[:options["batch_size"]]
+                    )
+                    if not batch:
+                        break
+                    for row in batch:
+                        gz.write((json.dumps(row, default=str, ensure_ascii=False) + "\n").encode("utf-8"))
+                    first_id = first_id if first_id is not None else batch[0]["id"]
+                    last_id = batch[-1]["id"]
+                    count += len(batch)
+
+            if not count:
+                return 0, None, None
+
+            tmp.seek(0)
+            name = f"{options['prefix']}/chat_history_{start:%Y-%m}_{first_id}-{last_id}.jsonl.gz"
+            saved_as = archive_storage().save(name, File(tmp))
+            self.stdout.write(f"📦 Wrote {count} row(s) to {saved_as}")
+        return count, first_id, last_id
+
+    def delete_range(self, month_rows, first_id, last_id, options):
+        """Deletes only rows that made it into the archive, one short transaction per batch."""
+        deleted = 0
+        archived = month_rows.filter(id__gte=first_id, id__lte=last_id)
+        while True:
+            ids = list(archived.order_by("id").values_list("id", flat=True)[:options["batch_size"]])
+            if not ids:
+                break
+            with transaction.atomic():
+                deleted += ChatHistory.objects.filter(id__in=ids).delete()[0]
+            time.sleep(options["sleep"])
+        return deleted
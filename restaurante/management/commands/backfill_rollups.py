@@ -0,0 +1,35 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from restaurante.models import Booking, Order
+from restaurante.rollups import rebuild_bookings, rebuild_sales
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the daily reporting rollups (sales, items sold, bookings per slot) from orders and "
+        "bookings — all history by default, or --start/--end (YYYY-MM-DD)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=date.fromisoformat)
+        parser.add_argument("--end", type=date.fromisoformat)
+
+    def handle(self, *args, **options):
+        orders = Order.objects.aggregate(first=Min("date"), last=Max("date"))
+        bookings = Booking.objects.aggregate(first=Min("reservation_date"), last=Max("reservation_date"))
+        firsts = [d for d in (orders["first"], bookings["first"]) if d]
+        lasts = [d for d in (orders["last"], bookings["last"]) if d]
+        start = options["start"] or (min(firsts) if firsts else None)
+        end = options["end"] or (max(lasts) if lasts else None)
+        if start is None or end is None:
+            self.stdout.write("ℹ️ No orders or bookings to roll up.")
+            return
+        if start > end:
+            raise CommandError("--start must not be after --end")
+
+        rebuild_sales(start=start, end=end)
+        rebuild_bookings(start=start, end=end)
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt rollups for {start} .. {end}"))
@@ -0,0 +1,86 @@
+import random
+import time
+from datetime import date
+
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from restaurante.dispatch import dispatch_orders, plan_dispatch
+from restaurante.models import DELIVERY_TIME_SLOTS, Order
+
+
+class Rollback(Exception):
+    pass
+
+
+def synthetic_orders(n, pins=40, seed=42):
+    """Unsaved orders spread over `pins` PIN codes and every delivery slot."""
+    rng = random.Random(seed)
+    slots = [slot for slot, _ in DELIVERY_TIME_SLOTS]
+    return [
+        Order(id=i + 1, delivery_type="delivery", is_confirmed=True,
+              delivery_pin=f"2730{rng.randrange(pins):02d}", delivery_time_slot=rng.choice(slots))
+        for i in range(n)
+    ]
+
+
+def imbalance(plan, crew_ids):
+    load = {crew_id: 0 for crew_id in crew_ids}
+    for crew_id, run in plan:
+        load[crew_id] += len(run)
+    return max(load.values()) - min(load.values())
+
+
+class Command(BaseCommand):
+    help = (
+        "Dispatch planning time and balance at thousands of orders; with --db also the full "
+        "dispatch (lock, plan, bulk_update) against the database, rolled back afterwards"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, nargs="*", default=[1000, 5000, 20000])
+        parser.add_argument("--crew", type=int, default=25)
+        parser.add_argument("--db", action="store_true", help="Also run dispatch_orders on real rows (rolled back)")
+
+    def handle(self, *args, **options):
+        crew_ids = list(range(1, options["crew"] + 1))
+        for n in options["orders"]:
+            orders = synthetic_orders(n)
+            start = time.perf_counter()
+            plan = plan_dispatch(orders, crew_ids)
+            ms = (time.perf_counter() - start) * 1000
+            self.stdout.write(
+                f"plan {n:>6} orders / {len(crew_ids)} crew: {ms:8.1f}ms  runs={len(plan):>5}  "
+                f"max-min orders per rider={imbalance(plan, crew_ids)}"
+            )
+
+        if options["db"]:
+            for n in options["orders"]:
+                self._bench_db(n, options["crew"])
+
+    def _bench_db(self, n, crew_size):
+        try:
+            with transaction.atomic():
+                customer = User.objects.create_user(username="bench_dispatch_customer")
+                group, _ = Group.objects.get_or_create(name="Delivery Crew")
+                crew = [User.objects.create_user(username=f"bench_dispatch_crew_{i}") for i in range(crew_size)]
+                group.user_set.add(*crew)
+                day = date(2099, 1, 1)
+                orders = synthetic_orders(n)
+                for order in orders:
+                    order.id, order.user, order.date = None, customer, day
+                Order.objects.bulk_create(orders, batch_size=1000)
+
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    summary = dispatch_orders(day)
+                    ms = (time.perf_counter() - start) * 1000
+                self.stdout.write(
+                    f"db   {n:>6} orders / {crew_size} crew: {ms:8.1f}ms  "
+                    f"assigned={summary['orders']}  queries={len(ctx)}"
+                )
+                raise Rollback
+        except Rollback:
+            pass
@@ -0,0 +1,76 @@
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+
+from restaurante.email_rendering import EMAIL_TEMPLATES, clear_email_cache, photo_link, render_email
+from restaurante.models import MenuItem, Order, OrderItem
+
+
+def sample_contexts():
+    """Unsaved objects only — the benchmark never touches the database."""
+    booking = {
+        "reservation_date": date(2025, 6, 14),
+        "reservation_time": "19:30",
+        "no_of_guests": 4,
+        "occasion": "Birthday",
+        "reference_number": "A1B2C3D4E5F6",
+        "manage_link": "https://www.dhannobannokirasoi.com/manage-reservation/A1B2C3D4E5F6",
+    }
+    user = User(username="chatore", first_name="Dhanno", last_name="Banno")
+    order = Order(id=1042, user=user, total=Decimal("540.00"), delivery_type="delivery",
+                  delivery_address="12 Station Road", delivery_city="Gorakhpur", delivery_pin="273001",
+                  delivery_time_slot="19:00", date=date(2025, 6, 14))
+    items = [
+        OrderItem(menuitem=MenuItem(title=f"Chaat {i}", price=Decimal(60 + i)), quantity=2,
+                  price=Decimal(2 * (60 + i)))
+        for i in range(8)
+    ]
+    return {
+        "booking_confirmation": booking,
+        "booking_cancellation": booking,
+        "order_confirmation": {"user": user, "order": order, "order_items": items, "address": "Chatore"},
+    }
+
+
+def legacy_render(name, context):
+    """What each email cost before: fragments rendered per email, text part via strip_tags."""
+    html_name, _, photo = EMAIL_TEMPLATES[name]
+    context = {**context, "photo_link": photo_link(photo)}
+    context["brand_header"] = render_to_string("email/_brand_header.html", context)
+    context["footer"] = render_to_string("email/_footer.html", {"year": date.today().year})
+    html = render_to_string(html_name, context)
+    return html, strip_tags(html)
+
+
+class Command(BaseCommand):
+    help = "Per-email render cost: render_to_string + strip_tags vs the precompiled email renderer"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=500)
+
+    def handle(self, *args, **options):
+        n = options["iterations"]
+        clear_email_cache()
+        for name, context in sample_contexts().items():
+            render_email(name, context)  # warm-up: compile once, like the first email after a deploy
+            legacy_render(name, context)
+
+            start = time.perf_counter()
+            for _ in range(n):
+                legacy_render(name, context)
+            legacy_us = (time.perf_counter() - start) / n * 1e6
+
+            start = time.perf_counter()
+            for _ in range(n):
+                render_email(name, context)
+            compiled_us = (time.perf_counter() - start) / n * 1e6
+
+            self.stdout.write(
+                f"{name:<22} render_to_string+strip_tags={legacy_us:7.0f}µs  "
+                f"precompiled={compiled_us:7.0f}µs  ({legacy_us / compiled_us:.1f}x)"
+            )
@@ -0,0 +1,71 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from restaurante.chatviews.menu_retrieval import MenuIndex, get_menu_index
+from restaurante.chatviews.prompt_context import build_menu_context, build_full_menu_context
+
+SAMPLE_TURNS = [
+    "what's good for a rainy evening?",
+    "do you have samosa?",
+    "2 masala dosa aur ek filter coffee",
+    "something sweet please, maybe gulab jamun",
+    "any paneer dishes?",
+    "what are today's specials?",
+]
+
+WORDS = ["aloo", "paneer", "masala", "chilli", "sweet", "crispy", "tikki", "chaat", "dal",
+         "roti", "spicy", "tangy", "fried", "steamed", "coconut", "mint", "chutney", "curd"]
+
+
+def approx_tokens(text):
+    # ~4 characters per token for mixed English/Hinglish prompts (no tokenizer dependency)
+    return len(text) // 4
+
+
+def synthetic_index(n):
+    rng = random.Random(42)
+    items = [
+        {
+            "id": i,
+            "title": f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}",
+            "price": Decimal(rng.randint(20, 400)),
+            "description": " ".join(rng.choice(WORDS) for _ in range(18)),
+            "category": f"Category {i % 12}",
+            "featured": i < 6,  # specials list stays small in real menus
+        }
+        for i in range(n)
+    ]
+    return MenuIndex(items)
+
+
+class Command(BaseCommand):
+    help = "Compares prompt size of the full-menu context vs retrieval-based menu context per chat turn"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--synthetic", type=int, nargs="*", default=[],
+                            help="Also benchmark synthetic menus of these sizes, e.g. --synthetic 100 1000")
+        parser.add_argument("--top-k", type=int, default=8)
+
+    def handle(self, *args, **options):
+        runs = [("live menu", get_menu_index())]
+        runs += [(f"synthetic {n}", synthetic_index(n)) for n in options["synthetic"]]
+
+        for label, index in runs:
+            full_tokens = approx_tokens(build_full_menu_context(index=index))
+            retrieved, elapsed = [], 0.0
+            for turn in SAMPLE_TURNS:
+                start = time.perf_counter()
+                ctx = build_menu_context(turn, top_k=options["top_k"], index=index)
+                elapsed += time.perf_counter() - start
+                retrieved.append(approx_tokens(ctx))
+
+            avg = sum(retrieved) / len(retrieved)
+            self.stdout.write(
+                f"{label:>16}: {len(index.items):5d} items | full ≈{full_tokens:6d} tok | "
+                f"retrieval ≈{avg:6.0f} tok (max {max(retrieved)}) | "
+                f"saved ≈{full_tokens - avg:6.0f} tok/turn | "
+                f"{1000 * elapsed / len(SAMPLE_TURNS):.2f} ms/turn"
+            )
@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from restaurante.dispatch import dispatch_orders
+
+
+class Command(BaseCommand):
+    help = "Assigns confirmed, unassigned delivery orders to the delivery crew, batched by PIN zone and slot"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", type=date.fromisoformat, help="Delivery date (default: today)")
+        parser.add_argument("--dry-run", action="store_true", help="Plan only; don't save assignments")
+
+    def handle(self, *args, **options):
+        summary = dispatch_orders(options["date"], dry_run=options["dry_run"])
+        if not summary["orders"]:
+            self.stdout.write(f"ℹ️ Nothing to dispatch for {summary['date']}.")
+            return
+        verb = "Would assign" if summary["dry_run"] else "Assigned"
+        self.stdout.write(self.style.SUCCESS(
+            f"🛵 {verb} {summary['orders']} order(s) in {summary['runs']} run(s) for {summary['date']}"
+        ))
+        for crew_id, count in sorted(summary["per_crew"].items()):
+            self.stdout.write(f"   crew #{crew_id}: {count}")
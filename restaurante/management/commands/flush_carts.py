@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from restaurante.cart_store import CART_FLUSH_BATCH, CART_WRITEBACK_INTERVAL, flush_dirty_carts
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes carts changed in Redis back to the Cart table in batches. Run from cron, "
+        "or with --loop as a long-lived worker"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=CART_FLUSH_BATCH)
+        parser.add_argument("--loop", action="store_true", help="Keep flushing instead of exiting")
+        parser.add_argument("--interval", type=float, default=CART_WRITEBACK_INTERVAL,
+                            help="Seconds between flushes with --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            flushed = flush_dirty_carts(batch_size=options["batch_size"])
+            if flushed:
+                self.stdout.write(f"🛒 Flushed {flushed} cart(s) to the database")
+            elif not options["loop"]:
+                self.stdout.write("ℹ️ No cart changes to flush.")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from restaurante.stripe_webhooks import STRIPE_EVENT_BATCH_SIZE, process_stripe_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Applies stored Stripe webhook events (payment status, order confirmation) in batches, "
+        "including retries of events that arrived before their order. Run from cron, or with --loop"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=STRIPE_EVENT_BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Keep polling instead of exiting when drained")
+        parser.add_argument("--interval", type=float, default=10, help="Seconds between polls with --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_stripe_events(batch_size=options["batch_size"])
+            if processed:
+                self.stdout.write(f"💳 Processed {processed} Stripe event(s)")
+            elif not options["loop"]:
+                self.stdout.write("ℹ️ No Stripe events due.")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
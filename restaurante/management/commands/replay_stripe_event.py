@@ -0,0 +1,59 @@
+import json
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from restaurante.stripe_webhooks import sign_payload
+
+FIXTURES_DIR = Path(__file__).resolve().parents[2] / "fixtures" / "stripe_events"
+
+
+class Command(BaseCommand):
+    help = (
+        "Signs a recorded Stripe event with STRIPE_WEBHOOK_SECRET and posts it to the webhook "
+        "endpoint of a running server — local testing without the Stripe CLI. "
+        "e.g. replay_stripe_event payment_intent.succeeded --intent pi_123"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("event", help=f"Fixture name in {FIXTURES_DIR} or a path to an event JSON file")
+        parser.add_argument("--intent", help="PaymentIntent id to put in the event (an order's stripe_payment_intent_id)")
+        parser.add_argument("--url", help="Webhook URL (default: BACKEND_URL + the webhook path)")
+        parser.add_argument("--keep-id", action="store_true",
+                            help="Reuse the recorded event id (tests deduplication) instead of a fresh one")
+
+    def handle(self, *args, **options):
+        path = Path(options["event"])
+        if not path.exists():
+            path = FIXTURES_DIR / f"{options['event']}.json"
+        if not path.exists():
+            raise CommandError(f"No such event fixture: {options['event']}")
+        if not settings.STRIPE_WEBHOOK_SECRET:
+            raise CommandError("STRIPE_WEBHOOK_SECRET is not set")
+
+        event = json.loads(path.read_text())
+        if not options["keep_id"]:
+            event["id"] = f"{event['id']}_{time.time_ns()}"
+        if options["intent"]:
+            obj = event["data"]["object"]
+            obj["payment_intent" if obj.get("object") == "charge" else "id"] = options["intent"]
+
+        payload = json.dumps(event)
+        url = options["url"] or f"{settings.BACKEND_URL}{reverse('restaurante:stripe-webhook')}"
+        request = urllib.request.Request(url, data=payload.encode(), method="POST", headers={
+            "Content-Type": "application/json",
+            "Stripe-Signature": sign_payload(payload, settings.STRIPE_WEBHOOK_SECRET),
+        })
+        try:
+            with urllib.request.urlopen(request) as response:
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except urllib.error.URLError as e:
+            raise CommandError(f"Could not reach {url}: {e.reason}")
+        self.stdout.write(f"📨 {event['type']} ({event['id']}) -> {url}: HTTP {status}")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from restaurante.scheduler import SCHEDULED_JOBS, SCHEDULER_TICK, run_due_jobs, run_forever
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the periodic jobs (expired order cleanup, cart write-back, Stripe events, email outbox, "
+        "delivery dispatch, slot load re-sync) in the foreground — an alternative to SCHEDULER_ENABLED in the web process"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run whatever is due, then exit")
+        parser.add_argument("--tick", type=float, default=SCHEDULER_TICK, help="Seconds between due-checks")
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            ran = run_due_jobs()
+            self.stdout.write(f"⏱️ Ran {len(ran)} of {len(SCHEDULED_JOBS)} job(s): {', '.join(ran) or 'none due'}")
+            return
+        self.stdout.write(f"⏱️ Scheduler running {len(SCHEDULED_JOBS)} job(s); Ctrl+C to stop")
+        run_forever(tick=options["tick"])
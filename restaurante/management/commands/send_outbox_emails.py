@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from restaurante.outbox import OUTBOX_BATCH_SIZE, drain_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Delivers pending transactional emails from the outbox over a reused SMTP connection, "
+        "retrying failures with backoff. Run from cron, or with --loop as a long-lived worker"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=OUTBOX_BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Keep polling instead of exiting when drained")
+        parser.add_argument("--interval", type=float, default=5, help="Seconds between polls with --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = drain_outbox(batch_size=options["batch_size"])
+            if sent or failed:
+                self.stdout.write(f"📧 Outbox: sent {sent}, failed {failed}")
+            elif not options["loop"]:
+                self.stdout.write("ℹ️ Outbox is empty.")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Q, Sum
+from django.utils.timezone import now
+
+from restaurante.models import ChatHistory
+
+
+def latency_percentile(calls, pct):
+    """Percentile via one indexed ORDER BY ... OFFSET 1 (portable across Postgres and SQLite)."""
+    timed = calls.filter(latency_ms__isnull=False)
+    n = timed.count()
+    if not n:
+        return None
+    return timed.order_by("latency_ms").values_list("latency_ms", flat=True)[min(n - 1, int(n * pct))]
+
+
+class Command(BaseCommand):
+    help = "Per-tool call count, failure rate and latency percentiles, plus chat token usage, from ChatHistory"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7)
+        parser.add_argument("--function", help="Only this tool, e.g. create_booking")
+
+    def handle(self, *args, **options):
+        window = ChatHistory.objects.filter(timestamp__gte=now() - timedelta(days=options["days"]))
+        calls = window.filter(function_name__isnull=False)
+        if options["function"]:
+            calls = calls.filter(function_name=options["function"])
+
+        rows = (
+            calls.values("function_name")
+            .annotate(
+                total=Count("id"),
+                failed=Count("id", filter=Q(succeeded=False)),
+                avg_latency=Avg("latency_ms"),
+            )
+            .order_by("-total")
+        )
+
+        if not rows:
+            self.stdout.write("ℹ️ No tool calls in this window.")
+            return
+
+        for row in rows:
+            per_func = calls.filter(function_name=row["function_name"])
+            p50 = latency_percentile(per_func, 0.5)
+            p95 = latency_percentile(per_func, 0.95)
+            self.stdout.write(
+                f"{row['function_name']:<28} calls={row['total']:<6} "
+                f"fail={100 * row['failed'] / row['total']:5.1f}% "
+                f"p50={p50 if p50 is not None else '-'}ms p95={p95 if p95 is not None else '-'}ms "
+                f"avg={row['avg_latency'] or 0:.0f}ms"
+            )
+
+        if options["function"]:
+            return
+        # tokens are stored once per completion (on its assistant row), not per tool call
+        tokens = window.filter(function_name__isnull=True).aggregate(
+            completions=Count("id", filter=Q(prompt_tokens__isnull=False)),
+            prompt=Sum("prompt_tokens"),
+            completion=Sum("completion_tokens"),
+        )
+        self.stdout.write(
+            f"{'(chat completions)':<28} calls={tokens['completions']:<6} "
+            f"tokens={tokens['prompt'] or 0}+{tokens['completion'] or 0}"
+        )
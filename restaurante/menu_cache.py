@@ -0,0 +1,105 @@
+# restaurante/menu_cache.py
+import hashlib
+import time
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+
+# Version stamp for everything derived from the menu (chat retrieval index, API caches).
+# Bumped on every MenuItem/Category write — see signals.py.
+MENU_VERSION_KEY = "menu_version"
+MENU_LAST_MODIFIED_KEY = "menu_last_modified"
+
+
+def _fresh_stamp():
+    # microseconds, so a re-seed after a flush can't land on a version a process already built from
+    return time.time_ns() // 1000
+
+
+def get_menu_version():
+    version = cache.get(MENU_VERSION_KEY)
+    if version is None:
+        # cache was flushed — start from a fresh stamp so stale derived data can't match
+        cache.add(MENU_VERSION_KEY, _fresh_stamp(), timeout=None)
+        version = cache.get(MENU_VERSION_KEY)
+    return version
+
+
+def get_menu_last_modified():
+    return cache.get(MENU_LAST_MODIFIED_KEY)
+
+
+def bump_menu_version():
+    cache.set(MENU_LAST_MODIFIED_KEY, int(time.time()), timeout=None)
+    try:
+        return cache.incr(MENU_VERSION_KEY)
+    except ValueError:
+        cache.set(MENU_VERSION_KEY, _fresh_stamp(), timeout=None)
+        return cache.get(MENU_VERSION_KEY)
+
+
+# -------------------------------
+# Conditional GET + rendered-JSON cache for the public menu endpoints
+
+def _etag_matches(if_none_match, etag):
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+class MenuCacheMixin:
+    """
+    For menu list/detail GETs: strong ETag + Cache-Control, 304 on If-None-Match /
+    If-Modified-Since, and a server-side cache of the rendered JSON keyed on
+    (path, query params, menu version). Repeat traffic skips the DB and serializers.
+    Only JSON is cached — the browsable API page is per-user HTML.
+    """
+    menu_cache_timeout = 60 * 60
+    menu_cache_control = "public, max-age=60, must-revalidate"
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_menu_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_menu_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_menu_response(self, handler, request, *args, **kwargs):
+        if request.accepted_renderer.format != "json":
+            return handler(request, *args, **kwargs)
+
+        params = sorted((k, v) for k, values in request.query_params.lists() for v in values)
+        material = f"{get_menu_version()}|{request.get_host()}|{request.path}|{params}"
+        digest = hashlib.sha1(material.encode("utf-8")).hexdigest()
+        etag = f'"{digest}"'
+        last_modified = get_menu_last_modified()
+
+        if_none_match = request.headers.get("If-None-Match")
+        if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+        if (if_none_match and _etag_matches(if_none_match, etag)) or (
+            not if_none_match and if_modified_since and last_modified and last_modified <= if_modified_since
+        ):
+            return self._with_cache_headers(HttpResponseNotModified(), etag, last_modified)
+
+        cache_key = f"menu_api_{digest}"
+        cached = cache.get(cache_key)
+        if cached:
+            content, content_type = cached
+            return self._with_cache_headers(HttpResponse(content, content_type=content_type), etag, last_modified)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+
+        # render now (normally done after finalize_response) so the bytes can be cached
+        response = self.finalize_response(request, response, *args, **kwargs)
+        response.render()
+        cache.set(cache_key, (response.content, response["Content-Type"]), timeout=self.menu_cache_timeout)
+        return self._with_cache_headers(response, etag, last_modified)
+
+    def _with_cache_headers(self, response, etag, last_modified):
+        response["ETag"] = etag
+        response["Cache-Control"] = self.menu_cache_control
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified)
+        patch_vary_headers(response, ["Accept"])
+        return response
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.23 on 2026-10-19 14:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurante", "0020_order_is_confirmed"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chathistory",
+            index=models.Index(fields=["session_id", "timestamp"], name="chat_session_ts_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="chathistory",
+            index=models.Index(fields=["user", "timestamp"], name="chat_user_ts_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="chathistory",
+            index=models.Index(fields=["timestamp"], name="chat_ts_idx"),
+        ),
+    ]
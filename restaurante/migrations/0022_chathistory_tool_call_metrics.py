@@ -0,0 +1,37 @@
+# Generated by Django 4.2.23 on 2026-10-19 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurante", "0021_chathistory_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chathistory",
+            name="completion_tokens",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="chathistory",
+            name="latency_ms",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="chathistory",
+            name="prompt_tokens",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="chathistory",
+            name="succeeded",
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="chathistory",
+            index=models.Index(fields=["function_name", "timestamp"], name="chat_func_ts_idx"),
+        ),
+    ]
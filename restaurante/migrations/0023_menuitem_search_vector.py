@@ -0,0 +1,53 @@
+# Generated by Django 4.2.23 on 2026-10-19 14:55
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+def create_search_indexes(apps, schema_editor):
+    # GIN / pg_trgm only exist on Postgres; SQLite dev uses the in-process index instead
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS menuitem_search_gin "
+        "ON restaurante_menuitem USING gin (search_vector)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS menuitem_title_trgm "
+        "ON restaurante_menuitem USING gin (title gin_trgm_ops)"
+    )
+    schema_editor.execute(
+        """
+        UPDATE restaurante_menuitem m SET search_vector =
+            setweight(to_tsvector('simple', coalesce(m.title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(c.title, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(m.description, '')), 'C')
+        FROM restaurante_category c
+        WHERE c.id = m.category_id
+        """
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS menuitem_search_gin")
+    schema_editor.execute("DROP INDEX IF EXISTS menuitem_title_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurante", "0022_chathistory_tool_call_metrics"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="menuitem",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
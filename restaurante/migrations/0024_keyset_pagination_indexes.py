@@ -0,0 +1,25 @@
+# Generated by Django 4.2.23 on 2026-10-19 14:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurante", "0023_menuitem_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(fields=["-reservation_date", "-reservation_time", "id"], name="booking_keyset_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="customerreview",
+            index=models.Index(fields=["-created_at", "id"], name="review_keyset_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["-date", "id"], name="order_keyset_idx"),
+        ),
+    ]
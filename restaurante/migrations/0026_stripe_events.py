@@ -0,0 +1,38 @@
+# Generated by Django 4.2.23 on 2026-10-19 15:15
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurante", "0025_email_outbox"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="order",
+            name="stripe_payment_intent_id",
+            field=models.CharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+        migrations.CreateModel(
+            name="StripeEvent",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("event_id", models.CharField(max_length=255, unique=True)),
+                ("type", models.CharField(max_length=100)),
+                ("object_id", models.CharField(blank=True, db_index=True, max_length=255)),
+                ("payload", models.JSONField()),
+                ("status", models.CharField(choices=[("pending", "Pending"), ("processed", "Processed"), ("ignored", "Ignored"), ("failed", "Failed")], default="pending", max_length=10)),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("next_attempt_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("last_error", models.TextField(blank=True)),
+                ("received_at", models.DateTimeField(auto_now_add=True)),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["status", "next_attempt_at"], name="stripe_event_due_idx")],
+            },
+        ),
+    ]
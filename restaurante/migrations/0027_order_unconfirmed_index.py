@@ -0,0 +1,17 @@
+# Generated by Django 4.2.23 on 2026-10-19 15:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurante", "0026_stripe_events"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(condition=models.Q(("is_confirmed", False)), fields=["date", "delivery_time_slot"], name="order_unconfirmed_idx"),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.23 on 2026-10-19 15:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurante", "0027_order_unconfirmed_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailySales",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField(unique=True)),
+                ("orders", models.PositiveIntegerField(default=0)),
+                ("revenue", models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ("pickup_orders", models.PositiveIntegerField(default=0)),
+                ("pickup_revenue", models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ("delivery_orders", models.PositiveIntegerField(default=0)),
+                ("delivery_revenue", models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DailySlotBookings",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("time_slot", models.CharField(choices=[("11:00", "11:00"), ("11:30", "11:30"), ("12:00", "12:00"), ("12:30", "12:30"), ("13:00", "13:00"), ("13:30", "13:30"), ("14:00", "14:00"), ("14:30", "14:30"), ("15:00", "15:00"), ("15:30", "15:30"), ("16:00", "16:00"), ("16:30", "16:30"), ("17:00", "17:00"), ("17:30", "17:30"), ("18:00", "18:00"), ("18:30", "18:30"), ("19:00", "19:00"), ("19:30", "19:30"), ("20:00", "20:00")], max_length=5)),
+                ("bookings", models.PositiveIntegerField(default=0)),
+                ("covers", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "unique_together": {("date", "time_slot")},
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyItemSales",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("quantity", models.PositiveIntegerField(default=0)),
+                ("revenue", models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ("menuitem", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="daily_sales", to="restaurante.menuitem")),
+            ],
+            options={
+                "unique_together": {("date", "menuitem")},
+            },
+        ),
+    ]
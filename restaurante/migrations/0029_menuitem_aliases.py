@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-19 15:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurante", "0028_daily_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="menuitem",
+            name="aliases",
+            field=models.CharField(blank=True, default="", max_length=255),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 from datetime import date
 import uuid
 from django.utils import timezone
@@ -51,6 +52,12 @@ class Booking(models.Model):
 
     def __str__(self):
         return f"{self.reservation_date} at {self.reservation_time} ({self.no_of_guests} guests)"
+
+    class Meta:
+        indexes = [
+            # keyset pagination order (BookingPagination)
+            models.Index(fields=["-reservation_date", "-reservation_time", "id"], name="booking_keyset_idx"),
+        ]
     
 
    
@@ -69,6 +76,10 @@ class MenuItem(models.Model):
     description = models.TextField(blank=True, null=True)
     image = models.ImageField(upload_to='menu_images/', null=True, blank=True)  # ✅ image field
     category = models.ForeignKey(Category, on_delete=models.PROTECT)
+    # other names customers type, comma-separated ("gol gappe, puchka"); used by autocomplete
+    aliases = models.CharField(max_length=255, blank=True, default="")
+    # title (A) + category (B) + description (C); kept fresh by signals, GIN-indexed on Postgres
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return self.title
@@ -121,11 +132,16 @@ class Order(models.Model):
         default='pending'
     )
     is_confirmed = models.BooleanField(default=False)
-    stripe_payment_intent_id = models.CharField(max_length=255, blank=True, null=True)
-
-
-
+    stripe_payment_intent_id = models.CharField(max_length=255, blank=True, null=True, db_index=True)
 
+    class Meta:
+        indexes = [
+            # keyset pagination order (OrderPagination)
+            models.Index(fields=["-date", "id"], name="order_keyset_idx"),
+            # expired unconfirmed orders (cleanup.py) without scanning confirmed history
+            models.Index(fields=["date", "delivery_time_slot"], name="order_unconfirmed_idx",
+                         condition=models.Q(is_confirmed=False)),
+        ]
 
     def __str__(self):
         return str(self.id)
@@ -209,6 +225,12 @@ class CustomerReview(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # keyset pagination order (ReviewPagination)
+            models.Index(fields=["-created_at", "id"], name="review_keyset_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user.username}: {self.feedback[:30]}..."
 
@@ -242,11 +264,123 @@ class ChatHistory(models.Model):
     function_name = models.CharField(max_length=100, blank=True, null=True)
     function_arguments = models.JSONField(blank=True, null=True)
     function_result = models.JSONField(blank=True, null=True)
+    # tool-call / LLM metrics (null for plain chat rows)
+    succeeded = models.BooleanField(null=True, blank=True)
+    latency_ms = models.PositiveIntegerField(null=True, blank=True)
+    prompt_tokens = models.PositiveIntegerField(null=True, blank=True)
+    completion_tokens = models.PositiveIntegerField(null=True, blank=True)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["session_id", "timestamp"], name="chat_session_ts_idx"),
+            models.Index(fields=["user", "timestamp"], name="chat_user_ts_idx"),
+            # retention (archive_chat_history) scans by age
+            models.Index(fields=["timestamp"], name="chat_ts_idx"),
+            # tool-call analytics: per-function latency / failure rate over a time range
+            models.Index(fields=["function_name", "timestamp"], name="chat_func_ts_idx"),
+        ]
+
     def __str__(self):
         user_str = self.user.username if self.user else f"Session {self.session_id}"
         return f"{self.role} - {user_str} - {self.timestamp}"
 
 
+class EmailOutbox(models.Model):
+    """
+    Transactional email written in the same transaction as the booking/order change and
+    delivered later by restaurante.outbox.drain_outbox (send_outbox_emails command).
+    """
+    STATUS_CHOICES = [('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')]
+
+    subject = models.CharField(max_length=255)
+    from_email = models.CharField(max_length=255, blank=True)
+    to = models.JSONField()
+    body = models.TextField(blank=True)
+    html = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # due time for pending rows; pushed forward while a worker holds the row and on retry
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+
+class StripeEvent(models.Model):
+    """
+    A verified Stripe webhook event, stored as received (event id = idempotency key) and
+    applied to orders later by restaurante.stripe_webhooks.process_stripe_events.
+    """
+    STATUS_CHOICES = [('pending', 'Pending'), ('processed', 'Processed'),
+                      ('ignored', 'Ignored'), ('failed', 'Failed')]
+
+    event_id = models.CharField(max_length=255, unique=True)
+    type = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=255, blank=True, db_index=True)  # e.g. the PaymentIntent id
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="stripe_event_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.type} {self.event_id} ({self.status})"
+
+
+# -------------------------------
+# Daily rollups for reporting (restaurante/rollups.py). Rebuilt per day from the source
+# tables, so they are safe to recompute at any time (backfill_rollups command).
+
+class DailySales(models.Model):
+    date = models.DateField(unique=True)
+    orders = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    pickup_orders = models.PositiveIntegerField(default=0)
+    pickup_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    delivery_orders = models.PositiveIntegerField(default=0)
+    delivery_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.date}: {self.orders} orders, {self.revenue}"
+
+
+class DailyItemSales(models.Model):
+    date = models.DateField()
+    menuitem = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name='daily_sales')
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ('date', 'menuitem')
+
+    def __str__(self):
+        return f"{self.date}: {self.menuitem_id} x{self.quantity}"
+
+
+class DailySlotBookings(models.Model):
+    date = models.DateField()
+    time_slot = models.CharField(max_length=5, choices=TIME_SLOTS)
+    bookings = models.PositiveIntegerField(default=0)
+    covers = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('date', 'time_slot')
+
+    def __str__(self):
+        return f"{self.date} {self.time_slot}: {self.covers} covers"
@@ -0,0 +1,301 @@
+# restaurante/order_events.py
+import asyncio
+import json
+import secrets
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .authentication import StatelessJWTAuthentication
+from .models import Order
+from .redis_client import get_redis
+from .roles import is_staff_or_manager
+
+# Order status push: every change to an order is published on Redis pub/sub (one channel per
+# order, one per customer) and relayed to browsers as Server-Sent Events. The SSE views are
+# async and hold one connection each, so they're served from the ASGI app (see Procfile:
+# gunicorn with uvicorn workers, rasoi.asgi:application). Under WSGI each stream would pin a
+# worker for SSE_MAX_AGE, so there they answer 503 unless SSE_ALLOW_WSGI (default: DEBUG,
+# for runserver).
+# Each process keeps a single Redis subscription for all its streams (see _Subscriber).
+SNAPSHOT_FIELDS = ["id", "user_id", "status", "payment_status", "is_confirmed", "delivery_crew_id"]
+SSE_HEARTBEAT = 15                 # seconds; keeps proxies from closing an idle stream
+SSE_MAX_AGE = 10 * 60              # streams end after this; EventSource reconnects by itself
+SSE_RETRY_MS = 3000
+SSE_POLL_INTERVAL = 2              # without Redis: how often to check the cached snapshot
+SSE_QUEUE_SIZE = 16                # per stream; a client this far behind loses its oldest updates
+SSE_TICKET_TIMEOUT = 60            # seconds a stream ticket stays valid
+ORDER_STATUS_TIMEOUT = 60 * 60 * 24
+SSE_ALLOW_WSGI = getattr(settings, "SSE_ALLOW_WSGI", settings.DEBUG)
+
+
+def order_channel(order_id):
+    return f"order_events_{order_id}"
+
+
+def user_channel(user_id):
+    return f"order_events_user_{user_id}"
+
+
+def order_status_key(order_id):
+    return f"order_status_{order_id}"
+
+
+def stream_ticket_key(ticket):
+    return f"sse_ticket_{ticket}"
+
+
+def order_snapshot(order):
+    return {
+        "id": order.id,
+        "status": order.status,
+        "payment_status": order.payment_status,
+        "is_confirmed": order.is_confirmed,
+        "delivery_crew": order.delivery_crew_id,
+    }
+
+
+def publish_order_update(order):
+    """Pushes the order's current state to its subscribers once the surrounding transaction commits."""
+    snapshot = order_snapshot(order)
+    user_id = order.user_id
+    transaction.on_commit(lambda: _publish(snapshot, user_id))
+
+
+def publish_order_updates(orders):
+    """Bulk variant (e.g. after bulk_update): one cache write and one pipelined publish for all orders."""
+    updates = [(order_snapshot(order), order.user_id) for order in orders]
+    if updates:
+        transaction.on_commit(lambda: _publish_many(updates))
+
+
+def _publish(snapshot, user_id):
+    _publish_many([(snapshot, user_id)])
+
+
+def _publish_many(updates):
+    cache.set_many({order_status_key(snapshot["id"]): snapshot for snapshot, _ in updates},
+                   timeout=ORDER_STATUS_TIMEOUT)
+    conn = get_redis()
+    if conn is None:
+        return  # streams fall back to polling the cached snapshot
+    try:
+        pipe = conn.pipeline()
+        for snapshot, user_id in updates:
+            message = json.dumps(snapshot)
+            pipe.publish(order_channel(snapshot["id"]), message)
+            pipe.publish(user_channel(user_id), message)
+        pipe.execute()
+    except Exception as e:
+        print(f"⚠️ Could not publish {len(updates)} order update(s): {e}")
+
+
+# -------------------------------
+# SSE views
+
+def _sse(data, event="order"):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _wsgi_refused(request):
+    """A 503 for streams requested through the WSGI app (see the note at the top), else None."""
+    if isinstance(request, ASGIRequest) or SSE_ALLOW_WSGI:
+        return None
+    print("⚠️ Order event stream requested over WSGI; serve rasoi.asgi:application instead")
+    return HttpResponse("Order event streams need the ASGI server.", status=503, content_type="text/plain")
+
+
+def _stream_response(events):
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: don't buffer the stream
+    return response
+
+
+@api_view(['POST'])
+@authentication_classes([StatelessJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def order_events_ticket(request):
+    """
+    POST orders/events/ticket — a single-use ticket for opening one event stream within
+    SSE_TICKET_TIMEOUT seconds: `new EventSource(url + "?ticket=" + ticket)`. EventSource can't
+    send an Authorization header, and a JWT in the query string would end up in access logs.
+    """
+    ticket = secrets.token_urlsafe(24)
+    cache.set(stream_ticket_key(ticket), str(request.auth), timeout=SSE_TICKET_TIMEOUT)
+    return Response({"ticket": ticket, "expires_in": SSE_TICKET_TIMEOUT})
+
+
+def _redeem_ticket(ticket):
+    """The access token behind a stream ticket, or None. Only the first caller gets it."""
+    key = stream_ticket_key(ticket)
+    raw = cache.get(key)
+    if raw is None or not cache.delete(key):
+        return None
+    return raw
+
+
+async def _authenticate(request):
+    """
+    A ?ticket= from order_events_ticket (EventSource can't set headers) or the Authorization
+    header. Role claims in the token mean no DB lookup; older tokens fall back to one.
+    """
+    auth = StatelessJWTAuthentication()
+    ticket = request.GET.get("ticket")
+    if ticket:
+        raw = await sync_to_async(_redeem_ticket)(ticket)
+    else:
+        header = auth.get_header(request)
+        raw = auth.get_raw_token(header) if header else None
+    if not raw:
+        return None
+    try:
+        validated = auth.get_validated_token(raw)
+        return await sync_to_async(auth.get_user)(validated)
+    except (InvalidToken, TokenError):
+        return None
+
+
+class _Subscriber:
+    """
+    The process's one Redis pub/sub connection. Streams register a queue for their channels;
+    a single reader task subscribes to the union of them and copies each message into every
+    queue listening on its channel. Bound to the event loop it was started on.
+    """
+
+    def __init__(self):
+        import redis.asyncio as aioredis
+        self.loop = asyncio.get_running_loop()
+        self.pubsub = aioredis.from_url(settings.REDIS_URL).pubsub()
+        self.queues = {}  # channel -> set of stream queues
+        self.reader = None
+
+    async def subscribe(self, channels, queue):
+        new = [channel for channel in channels if channel not in self.queues]
+        for channel in channels:
+            self.queues.setdefault(channel, set()).add(queue)
+        if new:
+            await self.pubsub.subscribe(*new)
+        if self.reader is None or self.reader.done():
+            self.reader = asyncio.create_task(self._read())
+
+    async def unsubscribe(self, channels, queue):
+        unused = []
+        for channel in channels:
+            listeners = self.queues.get(channel, set())
+            listeners.discard(queue)
+            if not listeners:
+                self.queues.pop(channel, None)
+                unused.append(channel)
+        if unused:
+            try:
+                await self.pubsub.unsubscribe(*unused)
+            except Exception as e:
+                print(f"⚠️ Could not unsubscribe from {len(unused)} order channel(s): {e}")
+
+    async def _read(self):
+        while self.queues:
+            try:
+                message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=SSE_HEARTBEAT)
+            except Exception as e:
+                print(f"⚠️ Order event subscription failed, reconnecting: {e}")
+                await asyncio.sleep(1)  # the next read reconnects and re-subscribes
+                continue
+            if message is None:
+                continue
+            channel = message["channel"].decode() if isinstance(message["channel"], bytes) else message["channel"]
+            data = json.loads(message["data"])
+            for queue in list(self.queues.get(channel, ())):
+                if queue.full():
+                    queue.get_nowait()  # snapshots are complete states: dropping the oldest is safe
+                queue.put_nowait(data)
+
+
+_subscriber = None
+
+
+def _get_subscriber():
+    global _subscriber
+    if _subscriber is None or _subscriber.loop is not asyncio.get_running_loop():
+        _subscriber = _Subscriber()
+    return _subscriber
+
+
+async def _relay(channels, initial=None, poll_order_id=None):
+    yield f"retry: {SSE_RETRY_MS}\n\n"
+    if initial is not None:
+        yield _sse(initial)
+    deadline = time.monotonic() + SSE_MAX_AGE
+
+    if get_redis() is None:
+        # no Redis (local dev / tests): watch the cached snapshot instead
+        last = initial
+        while time.monotonic() < deadline:
+            await asyncio.sleep(SSE_POLL_INTERVAL)
+            current = await sync_to_async(cache.get)(order_status_key(poll_order_id)) if poll_order_id else None
+            if current and current != last:
+                last = current
+                yield _sse(current)
+            else:
+                yield ": keepalive\n\n"
+        return
+
+    subscriber = _get_subscriber()
+    queue = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+    try:
+        await subscriber.subscribe(channels, queue)
+        while time.monotonic() < deadline:
+            try:
+                data = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+            else:
+                yield _sse(data)
+    finally:
+        await subscriber.unsubscribe(channels, queue)
+
+
+async def order_events(request, order_id):
+    """
+    GET orders/<id>/events — SSE stream of the order's status, payment_status, is_confirmed and
+    delivery_crew. Sends the current state first, then every change. For the customer who
+    placed it, the assigned delivery crew, staff and managers.
+    """
+    refused = _wsgi_refused(request)
+    if refused:
+        return refused
+    user = await _authenticate(request)
+    if user is None:
+        return HttpResponse(status=401)
+    order = await Order.objects.filter(pk=order_id).values(*SNAPSHOT_FIELDS).afirst()
+    if order is None:
+        return HttpResponse(status=404)
+    allowed = user.pk in (order["user_id"], order["delivery_crew_id"]) or await sync_to_async(is_staff_or_manager)(user)
+    if not allowed:
+        return HttpResponse(status=403)
+
+    initial = {
+        "id": order["id"], "status": order["status"], "payment_status": order["payment_status"],
+        "is_confirmed": order["is_confirmed"], "delivery_crew": order["delivery_crew_id"],
+    }  # same shape as order_snapshot()
+    return _stream_response(_relay([order_channel(order_id)], initial, poll_order_id=order_id))
+
+
+async def my_order_events(request):
+    """GET orders/events — one SSE stream with updates to any of the signed-in customer's orders."""
+    refused = _wsgi_refused(request)
+    if refused:
+        return refused
+    user = await _authenticate(request)
+    if user is None:
+        return HttpResponse(status=401)
+    return _stream_response(_relay([user_channel(user.pk)]))
@@ -0,0 +1,123 @@
+# restaurante/outbox.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .background import run_in_background
+from .models import EmailOutbox
+
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 6
+OUTBOX_BACKOFF_BASE = 60        # seconds; 1m, 2m, 4m, ... capped below
+OUTBOX_BACKOFF_MAX = 60 * 60
+OUTBOX_LEASE = 60 * 5           # a claimed row is invisible to other workers this long
+
+
+def queue_email(subject, to, html="", body=None, from_email=None):
+    """
+    Writes the email to the outbox. Call inside the same transaction as the domain change:
+    if that rolls back, so does the email. Once committed, a background drain is kicked so
+    mail still goes out within seconds when no worker process is running.
+    """
+    email = EmailOutbox.objects.create(
+        subject=subject,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+        body=body if body is not None else strip_tags(html),
+        html=html,
+    )
+    transaction.on_commit(lambda: run_in_background(drain_outbox))
+    return email
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1), OUTBOX_BACKOFF_MAX))
+
+
+def claim_batch(batch_size=OUTBOX_BATCH_SIZE):
+    """
+    Leases up to `batch_size` due rows by pushing their next_attempt_at past the lease.
+    The conditional UPDATE makes two workers racing for the same row claim it only once.
+    """
+    now = timezone.now()
+    due_ids = list(
+        EmailOutbox.objects.filter(status='pending', next_attempt_at__lte=now)
+        .order_by('next_attempt_at')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    claimed = []
+    lease_until = now + timedelta(seconds=OUTBOX_LEASE)
+    for email_id in due_ids:
+        if EmailOutbox.objects.filter(
+            id=email_id, status='pending', next_attempt_at__lte=now
+        ).update(next_attempt_at=lease_until):
+            claimed.append(email_id)
+    return list(EmailOutbox.objects.filter(id__in=claimed).order_by('id'))
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email or None,
+        to=email.to,
+        connection=connection,
+    )
+    if email.html:
+        message.attach_alternative(email.html, "text/html")
+    return message
+
+
+def drain_outbox(batch_size=OUTBOX_BATCH_SIZE, max_batches=None):
+    """
+    Sends due outbox rows in batches over one SMTP connection per batch.
+    Failures are retried with exponential backoff, then marked failed.
+    Returns (sent, failed) counts.
+    """
+    sent = failed = batches = 0
+    while max_batches is None or batches < max_batches:
+        batch = claim_batch(batch_size)
+        if not batch:
+            break
+        batches += 1
+
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            # SMTP down: release the whole batch for a later retry
+            for email in batch:
+                _record_failure(email, e)
+            failed += len(batch)
+            print(f"❌ Outbox: could not connect to mail server: {e}")
+            break
+
+        try:
+            for email in batch:
+                try:
+                    build_message(email, connection).send()
+                except Exception as e:
+                    _record_failure(email, e)
+                    failed += 1
+                else:
+                    EmailOutbox.objects.filter(id=email.id).update(
+                        status='sent', sent_at=timezone.now(), attempts=email.attempts + 1, last_error=''
+                    )
+                    sent += 1
+        finally:
+            connection.close()
+    return sent, failed
+
+
+def _record_failure(email, error):
+    attempts = email.attempts + 1
+    if attempts >= OUTBOX_MAX_ATTEMPTS:
+        update = {"status": 'failed'}
+        print(f"❌ Outbox: giving up on email #{email.id} after {attempts} attempts: {error}")
+    else:
+        update = {"next_attempt_at": timezone.now() + backoff(attempts)}
+    EmailOutbox.objects.filter(id=email.id).update(attempts=attempts, last_error=str(error)[:1000], **update)
@@ -0,0 +1,172 @@
+# restaurante/pagination.py
+import base64
+import json
+import operator
+from functools import reduce
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .search import is_postgres
+
+
+def approximate_count(queryset):
+    """
+    Planner row estimate on Postgres (no table scan); exact COUNT(*) elsewhere.
+    Only runs when the client asks for it with ?count=approx.
+    """
+    queryset = queryset.order_by()
+    if not is_postgres():
+        return queryset.count()
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination on a fixed, indexed ordering. The cursor is the sort key of the
+    last (or first) row on the page, so page 500 is the same indexed range scan as page 1 —
+    no OFFSET and no COUNT(*). Every field in `ordering` must be non-null and the last one unique.
+
+    Response: {"next": url, "previous": url, "results": [...]} plus "count" with ?count=approx.
+    """
+
+    ordering = ("-id",)
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    count_query_param = "count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position, self.reverse = self.decode_cursor(request)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) == "approx":
+            self.count = approximate_count(queryset)
+
+        ordering = [self.flip(f) for f in self.ordering] if self.reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.seek(ordering, position))
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound("Invalid cursor")
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+
+        self.has_next = True if self.reverse else has_more
+        self.has_previous = has_more if self.reverse else position is not None
+        self.first = self.key(rows[0]) if rows else position
+        self.last = self.key(rows[-1]) if rows else position
+        return rows
+
+    def get_paginated_response(self, data):
+        payload = {"next": self.get_next_link(), "previous": self.get_previous_link(), "results": data}
+        if self.count is not None:
+            payload = {"count": self.count, **payload}
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "count": {"type": "integer", "description": "Only with ?count=approx; may be an estimate."},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        return self.link(self.last, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first is None:
+            return None
+        return self.link(self.first, reverse=True)
+
+    def link(self, position, reverse):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.count_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position, reverse))
+
+    # --- cursor helpers ---
+
+    @staticmethod
+    def flip(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    def key(self, obj):
+        return [str(getattr(obj, f.lstrip("-"))) for f in self.ordering]
+
+    @staticmethod
+    def seek(ordering, position):
+        """(a, b, c) after (x, y, z) == a>x OR (a=x AND b>y) OR (a=x AND b=y AND c>z), per-field direction."""
+        clauses = []
+        for i, field in enumerate(ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            equal = {f.lstrip("-"): position[j] for j, f in enumerate(ordering[:i])}
+            clauses.append(Q(**equal, **{f"{name}__{lookup}": position[i]}))
+        return reduce(operator.or_, clauses)
+
+    def encode_cursor(self, position, reverse):
+        raw = json.dumps({"p": position, "r": int(reverse)}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+            position, reverse = data["p"], bool(data["r"])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound("Invalid cursor")
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound("Invalid cursor")
+        return position, reverse
+
+
+class OrderPagination(KeysetPagination):
+    ordering = ("-date", "id")
+
+
+class BookingPagination(KeysetPagination):
+    ordering = ("-reservation_date", "-reservation_time", "id")
+
+
+class ReviewPagination(KeysetPagination):
+    ordering = ("-created_at", "id")
+
+
+class UserPagination(KeysetPagination):
+    ordering = ("id",)
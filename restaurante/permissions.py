@@ -1,16 +1,16 @@
 # from rest_framework import permissions
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
+from .roles import is_delivery_crew, is_manager, is_staff_or_manager
+
 
 class IsManager(BasePermission):
     def has_permission(self, request, view):
-       if request.user.groups.filter(name='Managers').exists():
-            return True
+       return is_manager(request.user)
 
 class IsDeliveryCrew(BasePermission):
     def has_permission(self, request, view):
-       if request.user.groups.filter(name='Delivery crew').exists():
-            return True
+       return is_delivery_crew(request.user)
 
 class IsManagerOrAdminForSafe(BasePermission):
     """
@@ -27,6 +27,11 @@ class IsManagerOrAdminForSafe(BasePermission):
         return (
             user and user.is_authenticated and (
                 user.is_staff or
-                user.groups.filter(name='Managers').exists()
+                is_manager(user)
             )
         )
+
+
+class IsStaffOrManager(BasePermission):
+    def has_permission(self, request, view):
+        return is_staff_or_manager(request.user)
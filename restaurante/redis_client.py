@@ -0,0 +1,46 @@
+# restaurante/redis_client.py
+import threading
+
+from django.core.cache import cache
+
+_local_update_lock = threading.Lock()
+
+
+def get_redis():
+    """Raw client behind the default cache, or None when the cache isn't Redis (tests / local dev)."""
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection("default")
+    except (ImportError, NotImplementedError):
+        return None
+
+
+def update_cached(key, update, timeout):
+    """
+    Read-modify-write of a cached value as a compare-and-set: `update(current)` returns the new
+    value (current is None when the key is missing). On Redis the key is WATCHed, so a concurrent
+    write makes us re-read and re-apply instead of overwriting it. Without Redis (locmem: one
+    process) a lock does the same. Returns the value written.
+    """
+    conn = get_redis()
+    if conn is None:
+        with _local_update_lock:
+            value = update(cache.get(key))
+            cache.set(key, value, timeout=timeout)
+            return value
+
+    from redis.exceptions import WatchError
+    client = cache.client  # django-redis: same key prefixing and serialization as cache.get/set
+    raw_key = client.make_key(key)
+    with conn.pipeline() as pipe:
+        while True:
+            try:
+                pipe.watch(raw_key)
+                raw = pipe.get(raw_key)
+                value = update(client.decode(raw) if raw is not None else None)
+                pipe.multi()
+                pipe.set(raw_key, client.encode(value), ex=timeout)
+                pipe.execute()
+                return value
+            except WatchError:
+                continue
@@ -0,0 +1,83 @@
+# restaurante/reports.py
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import Sum
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .authentication import StatelessReadMixin
+from .models import DailyItemSales, DailySales, DailySlotBookings
+from .permissions import IsStaffOrManager
+
+REPORT_DEFAULT_DAYS = 30
+REPORT_MAX_TOP_ITEMS = 100
+
+SALES_FIELDS = ["orders", "revenue", "pickup_orders", "pickup_revenue", "delivery_orders", "delivery_revenue"]
+MONEY_FIELDS = {"revenue", "pickup_revenue", "delivery_revenue"}
+
+
+def _money(value):
+    return str(value if value is not None else Decimal("0.00"))
+
+
+def _formatted(row):
+    return {k: _money(v) if k in MONEY_FIELDS else v for k, v in row.items()}
+
+
+def sales_report(start, end, top=10):
+    """Everything the manager dashboard shows for [start, end], read from the daily rollups only."""
+    days = list(DailySales.objects.filter(date__range=(start, end)).order_by("date").values("date", *SALES_FIELDS))
+    totals = {
+        field: sum((day[field] for day in days), Decimal("0.00") if field in MONEY_FIELDS else 0)
+        for field in SALES_FIELDS
+    }
+
+    top_items = (
+        DailyItemSales.objects.filter(date__range=(start, end))
+        .values("menuitem_id", "menuitem__title")
+        .annotate(quantity=Sum("quantity"), revenue=Sum("revenue"))
+        .order_by("-quantity", "menuitem_id")[:top]
+    )
+    slots = list(
+        DailySlotBookings.objects.filter(date__range=(start, end))
+        .values("time_slot")
+        .annotate(bookings=Sum("bookings"), covers=Sum("covers"))
+        .order_by("time_slot")
+    )
+    totals["bookings"] = sum(slot["bookings"] for slot in slots)
+    totals["covers"] = sum(slot["covers"] for slot in slots)
+
+    return {
+        "start": start,
+        "end": end,
+        "totals": _formatted(totals),
+        "days": [_formatted(day) for day in days],
+        "top_items": [
+            {"menuitem": row["menuitem_id"], "title": row["menuitem__title"],
+             "quantity": row["quantity"], "revenue": _money(row["revenue"])}
+            for row in top_items
+        ],
+        "bookings_by_slot": slots,
+    }
+
+
+class SalesReportView(StatelessReadMixin, APIView):
+    """
+    GET reports/sales?start=YYYY-MM-DD&end=YYYY-MM-DD&top=10 — revenue, orders, pickup/delivery
+    split per day, best-selling items and covers per time slot. Defaults to the last 30 days.
+    """
+    permission_classes = [IsAuthenticated, IsStaffOrManager]
+
+    def get(self, request, *args, **kwargs):
+        try:
+            end = date.fromisoformat(request.query_params["end"]) if "end" in request.query_params else date.today()
+            start = (date.fromisoformat(request.query_params["start"]) if "start" in request.query_params
+                     else end - timedelta(days=REPORT_DEFAULT_DAYS - 1))
+            top = max(1, min(int(request.query_params.get("top", 10)), REPORT_MAX_TOP_ITEMS))
+        except ValueError:
+            return Response({"error": "Use start/end as YYYY-MM-DD and an integer top."}, status=400)
+        if start > end:
+            return Response({"error": "start must not be after end."}, status=400)
+        return Response(sales_report(start, end, top))
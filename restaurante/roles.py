@@ -0,0 +1,58 @@
+# restaurante/roles.py
+from django.core.cache import cache
+
+MANAGER = "manager"
+DELIVERY_CREW = "delivery_crew"
+
+ROLES_CACHE_TIMEOUT = 60 * 60  # also dropped explicitly on any group change (signals.py)
+
+
+def normalize_group_name(name):
+    """'Manager' / 'Managers' / 'manager' -> 'manager'; 'Delivery Crew' / 'Delivery crew' -> 'delivery_crew'."""
+    role = "_".join(name.lower().split())
+    return role[:-1] if role.endswith("s") else role
+
+
+def roles_key(user_id):
+    return f"user_roles_{user_id}"
+
+
+def get_roles(user):
+    """
+    The user's roles (normalized group names) as a frozenset. Memoised on the user object for
+    the rest of the request and cached per user, so permission checks and views share one lookup.
+    An empty set means a plain customer.
+    """
+    if not user or not user.is_authenticated:
+        return frozenset()
+    roles = getattr(user, "_roles", None)
+    if roles is not None:
+        return roles
+
+    key = roles_key(user.pk)
+    names = cache.get(key)
+    if names is None:
+        names = sorted({normalize_group_name(n) for n in user.groups.values_list("name", flat=True)})
+        cache.set(key, names, timeout=ROLES_CACHE_TIMEOUT)
+    user._roles = frozenset(names)
+    return user._roles
+
+
+def is_manager(user):
+    return MANAGER in get_roles(user)
+
+
+def is_delivery_crew(user):
+    return DELIVERY_CREW in get_roles(user)
+
+
+def is_customer(user):
+    return not get_roles(user)
+
+
+def is_staff_or_manager(user):
+    return bool(user and user.is_authenticated and (user.is_staff or user.is_superuser or is_manager(user)))
+
+
+def forget_roles(user_ids):
+    cache.delete_many([roles_key(user_id) for user_id in user_ids])
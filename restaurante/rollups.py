@@ -0,0 +1,101 @@
+# restaurante/rollups.py
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .background import run_in_background
+from .models import Booking, DailyItemSales, DailySales, DailySlotBookings, Order, OrderItem
+
+# Rollups are rebuilt a whole day at a time from the source rows of that day (cheap: Order.date
+# and Booking.reservation_date are indexed), which keeps them exact however often a day is
+# touched — no increments to double-apply or miss. The rebuilt rows are upserted on their
+# unique key and only keys that are gone get deleted, so two rebuilds of the same day running
+# at once can't collide on the unique constraint (the later one simply wins).
+
+
+def _date_filter(prefix, dates=None, start=None, end=None):
+    if dates is not None:
+        return {f"{prefix}__in": list(dates)}
+    return {f"{prefix}__range": (start, end)}
+
+
+def _upsert(model, scope, rows, key):
+    """
+    Inserts or updates `rows` on their unique `key` fields, and deletes the rows in `scope`
+    (the rollup rows of the days being rebuilt) whose key isn't among them any more.
+    """
+    rows = list(rows)
+    attnames = [model._meta.get_field(name).attname for name in key]
+    fresh = {tuple(getattr(row, attname) for attname in attnames) for row in rows}
+    stale = [pk for pk, *row_key in scope.values_list("pk", *attnames) if tuple(row_key) not in fresh]
+    if stale:
+        scope.filter(pk__in=stale).delete()
+    if rows:
+        model.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=key,
+            update_fields=[f.name for f in model._meta.concrete_fields if not f.primary_key and f.name not in key],
+        )
+
+
+def rebuild_sales(dates=None, start=None, end=None):
+    """Recomputes DailySales and DailyItemSales for the given dates (or date range) from confirmed orders."""
+    orders = Order.objects.filter(is_confirmed=True, **_date_filter("date", dates, start, end))
+    per_day = orders.values("date").annotate(
+        n=Count("id"),
+        sales=Sum("total"),
+        pickup=Count("id", filter=Q(delivery_type="pickup")),
+        pickup_sales=Sum("total", filter=Q(delivery_type="pickup")),
+        delivery=Count("id", filter=Q(delivery_type="delivery")),
+        delivery_sales=Sum("total", filter=Q(delivery_type="delivery")),
+    ).order_by()
+    per_item = (
+        OrderItem.objects.filter(order__in=orders)
+        .values("order__date", "menuitem_id")
+        .annotate(quantity=Sum("quantity"), revenue=Sum("price"))
+        .order_by()
+    )
+    zero = Decimal("0")
+    with transaction.atomic():
+        _upsert(DailySales, DailySales.objects.filter(**_date_filter("date", dates, start, end)), (
+            DailySales(
+                date=row["date"], orders=row["n"], revenue=row["sales"] or zero,
+                pickup_orders=row["pickup"], pickup_revenue=row["pickup_sales"] or zero,
+                delivery_orders=row["delivery"], delivery_revenue=row["delivery_sales"] or zero,
+            )
+            for row in per_day
+        ), key=["date"])
+        _upsert(DailyItemSales, DailyItemSales.objects.filter(**_date_filter("date", dates, start, end)), (
+            DailyItemSales(date=row["order__date"], menuitem_id=row["menuitem_id"],
+                           quantity=row["quantity"], revenue=row["revenue"] or zero)
+            for row in per_item
+        ), key=["date", "menuitem"])
+
+
+def rebuild_bookings(dates=None, start=None, end=None):
+    """Recomputes DailySlotBookings (bookings and covers per TIME_SLOT) for the given dates or range."""
+    per_slot = (
+        Booking.objects.filter(**_date_filter("reservation_date", dates, start, end))
+        .values("reservation_date", "reservation_time")
+        .annotate(n=Count("id"), covers=Sum("no_of_guests"))
+        .order_by()
+    )
+    with transaction.atomic():
+        _upsert(DailySlotBookings, DailySlotBookings.objects.filter(**_date_filter("date", dates, start, end)), (
+            DailySlotBookings(date=row["reservation_date"], time_slot=row["reservation_time"],
+                              bookings=row["n"], covers=row["covers"] or 0)
+            for row in per_slot
+        ), key=["date", "time_slot"])
+
+
+def sales_changed(*dates):
+    """Schedules a rebuild of these days' sales rollups once the current transaction commits."""
+    dates = {d for d in dates if d}
+    if dates:
+        transaction.on_commit(lambda: run_in_background(rebuild_sales, dates=dates))
+
+
+def bookings_changed(*dates):
+    dates = {d for d in dates if d}
+    if dates:
+        transaction.on_commit(lambda: run_in_background(rebuild_bookings, dates=dates))
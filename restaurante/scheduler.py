@@ -0,0 +1,72 @@
+# restaurante/scheduler.py
+import os
+import sys
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+# (dotted path, interval in seconds). Everything here can also be run by its own management command.
+SCHEDULED_JOBS = getattr(settings, "SCHEDULED_JOBS", [
+    ("restaurante.cleanup.delete_expired_orders", 5 * 60),
+    ("restaurante.cart_store.flush_dirty_carts", 60),
+    ("restaurante.stripe_webhooks.process_stripe_events", 60),
+    ("restaurante.outbox.drain_outbox", 60),
+    ("restaurante.dispatch.dispatch_orders", 5 * 60),
+    ("restaurante.slot_capacity.resync_slot_loads", 30 * 60),
+])
+SCHEDULER_TICK = 5  # seconds between due-checks
+
+_thread = None
+_stop = threading.Event()
+
+
+def run_due_jobs(jobs=None):
+    """
+    Runs every job whose interval has elapsed. A cache lock per job (held for its interval)
+    means that with several web workers sharing the cache, each job runs once per interval
+    in total, not once per process. Returns the names of the jobs that ran.
+    """
+    ran = []
+    for path, interval in jobs or SCHEDULED_JOBS:
+        if not cache.add(f"scheduler_lock_{path}", 1, timeout=interval):
+            continue
+        try:
+            import_string(path)()
+            ran.append(path)
+        except Exception as e:
+            print(f"❌ Scheduled job {path} failed: {e}")
+        finally:
+            close_old_connections()
+    return ran
+
+
+def run_forever(tick=SCHEDULER_TICK):
+    while not _stop.is_set():
+        run_due_jobs()
+        _stop.wait(tick)
+
+
+def _serving_requests():
+    # not for migrate/shell/etc., nor runserver's autoreloader parent (its child serves)
+    if os.path.basename(sys.argv[0]) == "manage.py":
+        return sys.argv[1:2] == ["runserver"] and os.environ.get("RUN_MAIN") == "true"
+    return True
+
+
+def start_scheduler():
+    """Starts the in-process scheduler thread once per web process (see RestaurantConfig.ready)."""
+    global _thread
+    if _thread is not None or not _serving_requests():
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=run_forever, name="rasoi-scheduler", daemon=True)
+    _thread.start()
+
+
+def stop_scheduler():
+    global _thread
+    _stop.set()
+    _thread = None
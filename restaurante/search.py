@@ -0,0 +1,67 @@
+# restaurante/search.py
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import connection
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+from .chatviews.menu_retrieval import get_menu_index
+
+# 'simple' on purpose: dish names are Hindi/Hinglish, English stemming only hurts them
+SEARCH_CONFIG = "simple"
+TRIGRAM_THRESHOLD = 0.3  # pg_trgm.similarity_threshold, the cut-off of `%` (set per connection below)
+FALLBACK_LIMIT = 100
+
+
+def is_postgres():
+    return connection.vendor == "postgresql"
+
+
+def set_trigram_threshold(sender, connection, **kwargs):
+    """connection_created receiver: one SET per new Postgres connection, not per query."""
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SET pg_trgm.similarity_threshold = %s", [TRIGRAM_THRESHOLD])
+
+
+def menu_search_vector(category_title):
+    return (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector(Value(category_title or ""), weight="B", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="C", config=SEARCH_CONFIG)
+    )
+
+
+def refresh_search_vectors(items, category_title):
+    """Recomputes MenuItem.search_vector for `items` (all in one category). No-op off Postgres."""
+    if is_postgres():
+        items.update(search_vector=menu_search_vector(category_title))
+
+
+def search_menu_items(queryset, q):
+    """
+    Ranked menu search.
+    - Postgres: tsvector match (GIN) OR pg_trgm title similarity for typos, ordered by rank.
+    - Elsewhere (SQLite dev): the in-process BM25 index with fuzzy term matching.
+    """
+    q = (q or "").strip()
+    if not q:
+        return queryset
+
+    if is_postgres():
+        query = SearchQuery(q, config=SEARCH_CONFIG, search_type="websearch")
+        # filter with the `%` operator (title__trigram_similar): unlike a comparison on the
+        # similarity() value it can use menuitem_title_trgm, so both arms of the OR are index
+        # scans. The similarity itself only orders the results.
+        return (
+            queryset.filter(Q(search_vector=query) | Q(title__trigram_similar=q))
+            .annotate(
+                rank=SearchRank(F("search_vector"), query),
+                similarity=TrigramSimilarity("title", q),
+            )
+            .order_by("-rank", "-similarity", "id")
+        )
+
+    ids = [item["id"] for item in get_menu_index().search(q, k=FALLBACK_LIMIT, fuzzy=True)]
+    if not ids:
+        return queryset.none()
+    ranking = Case(*[When(pk=pk, then=Value(pos)) for pos, pk in enumerate(ids)], output_field=IntegerField())
+    return queryset.filter(pk__in=ids).annotate(search_position=ranking).order_by("search_position")
@@ -1,7 +1,9 @@
 
 from rest_framework import serializers
-from .models import Booking, Category, MenuItem, Cart, Order, OrderItem, \
-    UserProfile, hundred_years_ago, CustomerReview
+from .models import Booking, Category, MenuItem, Order, OrderItem, \
+    UserProfile, hundred_years_ago, CustomerReview, today
+from .cart_store import menu_prices
+from .slot_capacity import open_slots
 from django.contrib.auth.models import User
 from django.db import models
 from datetime import date
@@ -64,61 +66,48 @@ class MenuItemSerializer(serializers.ModelSerializer):
     # category = CategorySerializer(read_only=True)
     class Meta:
         model = MenuItem
-        fields = ['id', 'title', 'price', 'featured', 'description', 'image', 'category']
+        fields = ['id', 'title', 'price', 'featured', 'description', 'image', 'category', 'aliases']
 
 
 
-class CartSerializer(serializers.ModelSerializer):
-    user = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.all(),
-        default=serializers.CurrentUserDefault()
-    )
-    menuitem = serializers.PrimaryKeyRelatedField(
-        queryset=MenuItem.objects.all()
-    )
+class CartLineSerializer(serializers.Serializer):
+    """
+    A line of the Redis-backed cart (cart_store.CartLine), in the Cart row shape with `id`
+    being the menu item id. Prices come from the cached menu price map, not the DB.
+    """
+    id = serializers.IntegerField(read_only=True)
+    user = serializers.IntegerField(source="user_id", read_only=True)
+    menuitem = serializers.IntegerField(source="menuitem_id")
+    unit_price = serializers.DecimalField(max_digits=6, decimal_places=2, read_only=True)
+    quantity = serializers.IntegerField(min_value=1, max_value=32767)
+    price = serializers.DecimalField(max_digits=6, decimal_places=2, read_only=True)
 
-    class Meta:
-        model = Cart
-        fields = ['id', 'user', 'menuitem', 'unit_price', 'quantity', 'price']
-        extra_kwargs = {
-            'unit_price': {'read_only': True},
-            'price': {'read_only': True},
-            'user': {'read_only': True},  # Disallow changing user on update
-        }
+    def validate_menuitem(self, value):
+        if value not in menu_prices():
+            raise serializers.ValidationError(f'Invalid pk "{value}" - object does not exist.')
+        return value
 
-    def create(self, validated_data):
-        user = self.context['request'].user  # Always use current authenticated user
-        menuitem = validated_data['menuitem']
-        quantity = int(validated_data['quantity'])
-
-        unit_price = menuitem.price  # Always get price from MenuItem model
-        price = unit_price * quantity
-
-        # Add or update the cart row for this user+menuitem
-        cart_item, created = Cart.objects.update_or_create(
-            user=user,
-            menuitem=menuitem,
-            defaults={
-                'quantity': quantity,
-                'unit_price': unit_price,
-                'price': price,
-            }
-        )
-        return cart_item
 
-    def update(self, instance, validated_data):
-        # Only allow changing quantity, not menuitem or user
-        quantity = int(validated_data.get('quantity', instance.quantity))
-        instance.quantity = quantity
+class CartOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=["add", "set", "remove"], default="add")
+    menuitem = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0, max_value=32767, required=False)
 
-        # Always use the current price from the MenuItem model
-        unit_price = instance.menuitem.price
-        instance.unit_price = unit_price
-        instance.price = unit_price * quantity
+    def validate(self, attrs):
+        if attrs["op"] != "remove" and "quantity" not in attrs:
+            raise serializers.ValidationError({"quantity": "This field is required."})
+        return attrs
 
-        instance.save()
-        return instance
 
+class CartBulkSerializer(serializers.Serializer):
+    operations = CartOperationSerializer(many=True, allow_empty=False, max_length=100)
+
+    def validate_operations(self, operations):
+        # one menu lookup for the whole batch
+        unknown = sorted({operation["menuitem"] for operation in operations} - menu_prices().keys())
+        if unknown:
+            raise serializers.ValidationError(f"Unknown menu items: {unknown}")
+        return operations
 
 
 class MenuItemShortSerializer(serializers.ModelSerializer):
@@ -155,6 +144,54 @@ class OrderSerializer(serializers.ModelSerializer):
             'is_confirmed'
         ]
 
+    def validate(self, attrs):
+        # no new orders into a full slot (see slot_capacity.py); an order moved to another
+        # slot or day is checked the same way, one that stays put isn't
+        slot = attrs.get('delivery_time_slot', getattr(self.instance, 'delivery_time_slot', 'ASAP'))
+        day = attrs.get('date', getattr(self.instance, 'date', None)) or today()
+        moved = self.instance is None or (slot, day) != (self.instance.delivery_time_slot, self.instance.date)
+        if moved and slot not in open_slots(day, [slot]):
+            raise serializers.ValidationError({'delivery_time_slot': f'The {slot} slot on {day} is full.'})
+        return attrs
+
+
+class OrderListSerializer(serializers.ModelSerializer):
+    """
+    Compact order row for list views: line items flattened to title/quantity/price instead
+    of nested serializers. Expects `order` (the OrderItem reverse relation) prefetched with
+    its menuitem — see OrderView.get_queryset.
+    """
+    items = serializers.SerializerMethodField()
+    item_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Order
+        fields = [
+            'id',
+            'user',
+            'delivery_crew',
+            'status',
+            'date',
+            'total',
+            'item_count',
+            'items',
+            'delivery_type',
+            'delivery_time_slot',
+            'payment_method',
+            'payment_status',
+            'is_confirmed'
+        ]
+        read_only_fields = fields
+
+    def get_items(self, obj):
+        return [
+            {"title": item.menuitem.title, "quantity": item.quantity, "price": str(item.price)}
+            for item in obj.order.all()
+        ]
+
+    def get_item_count(self, obj):
+        return sum(item.quantity for item in obj.order.all())
+
 
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True)
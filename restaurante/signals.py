@@ -17,3 +17,125 @@ from .models import UserProfile
 # @receiver(password_reset)
 # def password_reset_email_handler(sender, user, context, **kwargs):
 #     context['frontend_url'] = settings.FRONTEND_URL
+
+
+# -------------------------------
+# Menu changes: bump the version stamp so every derived menu cache rebuilds
+from django.db.models.signals import post_delete
+from .models import MenuItem, Category
+from .menu_cache import bump_menu_version
+
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def menu_changed(sender, **kwargs):
+    bump_menu_version()
+
+
+# -------------------------------
+# Keep MenuItem.search_vector in sync (Postgres only; see search.py)
+from django.db.backends.signals import connection_created
+from .search import is_postgres, refresh_search_vectors, set_trigram_threshold
+
+connection_created.connect(set_trigram_threshold, dispatch_uid="restaurante_trigram_threshold")
+
+@receiver(post_save, sender=MenuItem)
+def refresh_item_search_vector(sender, instance, **kwargs):
+    if is_postgres():
+        refresh_search_vectors(MenuItem.objects.filter(pk=instance.pk), instance.category.title)
+
+@receiver(post_save, sender=Category)
+def refresh_category_search_vectors(sender, instance, **kwargs):
+    if is_postgres():
+        refresh_search_vectors(MenuItem.objects.filter(category=instance), instance.title)
+
+
+# -------------------------------
+# Group membership / group changes: drop cached roles (see roles.py)
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, pre_delete
+from .roles import forget_roles
+
+@receiver(m2m_changed, sender=User.groups.through)
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear", "post_clear"):
+        return
+    if not reverse:
+        forget_roles([instance.pk])  # user.groups.add(...)
+    elif pk_set:
+        forget_roles(pk_set)  # group.user_set.add(...)
+    elif action == "pre_clear":
+        forget_roles(list(instance.user_set.values_list("pk", flat=True)))
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    # renamed or deleted group: every member's normalized roles may change
+    if instance.pk:
+        forget_roles(list(instance.user_set.values_list("pk", flat=True)))
+
+
+# -------------------------------
+# Reporting rollups: rebuild the days an order/booking touches (see rollups.py)
+from django.db.models.signals import post_init
+from .models import Booking, Order
+from .rollups import bookings_changed, sales_changed
+
+@receiver(post_init, sender=Order)
+def remember_order_rollup_date(sender, instance, **kwargs):
+    # the day the order is counted on (None: unconfirmed); deferred fields (.only()) aren't fetched
+    instance._rollup_date = instance.__dict__.get("date") if instance.__dict__.get("is_confirmed", True) else None
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def order_rollup_changed(sender, instance, **kwargs):
+    # only confirmed orders count: rebuild the day it counts on now and the day it was counted on
+    # (an order moved to another date or un-confirmed leaves that day); confirmations via
+    # queryset.update() call sales_changed() themselves
+    counted_on = instance.date if instance.is_confirmed else None
+    sales_changed(counted_on, instance._rollup_date)
+    instance._rollup_date = counted_on
+
+
+# -------------------------------
+# Order status push (SSE, see order_events.py); queryset.update() callers publish themselves
+from .order_events import publish_order_update
+
+@receiver(post_save, sender=Order)
+def order_status_changed(sender, instance, created, **kwargs):
+    if not created:
+        publish_order_update(instance)
+
+
+@receiver(post_init, sender=Booking)
+def remember_booking_date(sender, instance, **kwargs):
+    instance._rollup_date = instance.reservation_date
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def booking_rollup_changed(sender, instance, **kwargs):
+    # a rescheduled booking leaves its old day as well
+    bookings_changed(instance.reservation_date, instance._rollup_date)
+    instance._rollup_date = instance.reservation_date
+
+
+# -------------------------------
+# Kitchen load per delivery slot (see slot_capacity.py); queryset.update() callers report themselves
+from .slot_capacity import slot_loads_changed
+
+@receiver(post_init, sender=Order)
+def remember_order_confirmed(sender, instance, **kwargs):
+    # deferred field (.only()): don't fetch it — assume counted, the sync itself is a diff
+    instance._slot_counted = instance.__dict__.get("is_confirmed", True)
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def order_slot_load_changed(sender, instance, signal, **kwargs):
+    # confirmed now or before: counted, cancelled, deleted or moved to another slot
+    if instance.is_confirmed or instance._slot_counted:
+        slot_loads_changed([instance], deleted=signal is post_delete)
+    instance._slot_counted = instance.is_confirmed
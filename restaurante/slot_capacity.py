@@ -0,0 +1,307 @@
+# restaurante/slot_capacity.py
+import threading
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import DELIVERY_TIME_SLOTS, Order, OrderItem, today
+from .redis_client import get_redis
+
+# Kitchen load per delivery slot: confirmed orders and dishes (item quantity) due in each slot,
+# kept as counters in one Redis hash per day `slot_load_<date>` (field "<slot>|orders" /
+# "<slot>|items"). The same hash holds each counted order's share ("#<order id>" ->
+# "<slot>|<dishes>"), and `slot_load_order_<id>` names the day the order is counted on.
+# Confirmations, cancellations and reschedules move an order's share in one Lua script (read
+# the share, adjust the counters, write the share: atomic), so slot availability is one HMGET,
+# never a DB aggregate. The DB only seeds a day the first time it's asked for (and
+# resync_slot_loads re-seeds the coming days now and then, in case an update was lost); a seed
+# WATCHes the day while it reads the DB and starts over if an update touched it meanwhile, so it
+# can't erase one. Without Redis (locmem: one process) a lock does the same.
+SLOT_MAX_ORDERS = getattr(settings, "SLOT_MAX_ORDERS", 20)    # confirmed orders per slot; None = no limit
+SLOT_MAX_ITEMS = getattr(settings, "SLOT_MAX_ITEMS", None)    # dishes per slot; None = no limit
+SLOT_RESYNC_DAYS = 7
+
+KINDS = ("orders", "items")
+LOADED_FIELD = "~"  # set once a day is seeded, so "no orders yet" isn't mistaken for "not loaded"
+
+_local_slot_lock = threading.Lock()
+
+# KEYS: slot_load_order_<id> per order. ARGV[1]: day hash prefix, then per order: id, day
+# ("" = not counted), share "<slot>|<dishes>" and TTL of the day it's counted on.
+APPLY_SCRIPT = """
+local prefix = ARGV[1]
+local function move(key, share, sign)
+  local slot, n = string.match(share, '^(.*)|(%d+)$')
+  redis.call('HINCRBY', key, slot .. '|orders', sign)
+  redis.call('HINCRBY', key, slot .. '|items', sign * tonumber(n))
+end
+for i, pointer in ipairs(KEYS) do
+  local base = 1 + 4 * (i - 1)
+  local id, day, share, ttl = ARGV[base + 1], ARGV[base + 2], ARGV[base + 3], ARGV[base + 4]
+  local field = '#' .. id
+  local old_day = redis.call('GET', pointer) or ''
+  local old_share = (old_day ~= '' and redis.call('HGET', prefix .. old_day, field)) or ''
+  if old_share == '' then old_day = '' end
+  if old_day ~= day or old_share ~= share then
+    if old_share ~= '' then
+      redis.call('HDEL', prefix .. old_day, field)
+      move(prefix .. old_day, old_share, -1)
+    end
+    if share ~= '' then
+      redis.call('HSET', prefix .. day, field, share)
+      move(prefix .. day, share, 1)
+      redis.call('EXPIRE', prefix .. day, ttl)
+    end
+  end
+  if day ~= '' then
+    redis.call('SET', pointer, day, 'EX', ttl)
+  else
+    redis.call('DEL', pointer)
+  end
+end
+"""
+
+# KEYS[1]: the day's hash. ARGV: day hash prefix, order pointer prefix, day, TTL, number of
+# counter fields, the counter field/value pairs, then id/share pairs of the orders counted.
+SEED_SCRIPT = """
+local key, prefix, pointer_prefix, day, ttl = KEYS[1], ARGV[1], ARGV[2], ARGV[3], ARGV[4]
+local counters_end = 5 + 2 * tonumber(ARGV[5])
+redis.call('DEL', key)
+for i = 6, counters_end, 2 do
+  redis.call('HSET', key, ARGV[i], ARGV[i + 1])
+end
+for i = counters_end + 1, #ARGV, 2 do
+  local id, share = ARGV[i], ARGV[i + 1]
+  local pointer = pointer_prefix .. id
+  local old_day = redis.call('GET', pointer)
+  if old_day and old_day ~= day then
+    -- still counted on the day it was moved from: take it off there
+    local old_share = redis.call('HGET', prefix .. old_day, '#' .. id)
+    if old_share then
+      local slot, n = string.match(old_share, '^(.*)|(%d+)$')
+      redis.call('HDEL', prefix .. old_day, '#' .. id)
+      redis.call('HINCRBY', prefix .. old_day, slot .. '|orders', -1)
+      redis.call('HINCRBY', prefix .. old_day, slot .. '|items', -tonumber(n))
+    end
+  end
+  redis.call('HSET', key, '#' .. id, share)
+  redis.call('SET', pointer, day, 'EX', ttl)
+end
+redis.call('EXPIRE', key, ttl)
+"""
+
+
+def slot_load_key(day):
+    return f"slot_load_{day}"
+
+
+def order_load_key(order_id):
+    return f"slot_load_order_{order_id}"
+
+
+def _field(slot, kind):
+    return f"{slot}|{kind}"
+
+
+def _share_field(order_id):
+    return f"#{order_id}"
+
+
+def _day(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _timeout(day):
+    """Counters are kept until a day after their date."""
+    expires = timezone.make_aware(datetime.combine(_day(day) + timedelta(days=2), time.min))
+    return max(int((expires - timezone.now()).total_seconds()), 60)
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _counter_fields():
+    return [_field(slot, kind) for slot, _ in DELIVERY_TIME_SLOTS for kind in KINDS]
+
+
+# -------------------------------
+# Counters
+
+def _read(day):
+    fields = _counter_fields() + [LOADED_FIELD]
+    conn = get_redis()
+    if conn is not None:
+        values = conn.hmget(slot_load_key(day), fields)
+        return {field: int(value) for field, value in zip(fields, values) if value is not None}
+    stored = cache.get(slot_load_key(day)) or {}
+    return {field: stored[field] for field in fields if field in stored}
+
+
+def _count(day):
+    """The day's counters and the share of every order in them, from the DB."""
+    rows = (
+        Order.objects.filter(date=day, is_confirmed=True)
+        .values("id", "delivery_time_slot")
+        .annotate(dishes=Sum("order__quantity"))
+        .order_by()
+    )
+    counters, shares = {}, {}
+    for row in rows:
+        slot, dishes = row["delivery_time_slot"], row["dishes"] or 0
+        counters[_field(slot, "orders")] = counters.get(_field(slot, "orders"), 0) + 1
+        counters[_field(slot, "items")] = counters.get(_field(slot, "items"), 0) + dishes
+        shares[row["id"]] = f"{slot}|{dishes}"
+    return counters, shares
+
+
+def _move_local(loads, order_id, share, sign):
+    slot, n = share.rsplit("|", 1)
+    for kind, delta in (("orders", sign), ("items", sign * int(n))):
+        loads[_field(slot, kind)] = loads.get(_field(slot, kind), 0) + delta
+    if sign > 0:
+        loads[_share_field(order_id)] = share
+    else:
+        loads.pop(_share_field(order_id), None)
+
+
+def seed_slot_loads(day):
+    """Recounts the day's confirmed orders and dishes per slot from the DB into the counters."""
+    conn = get_redis()
+    if conn is None:
+        with _local_slot_lock:
+            counters, shares = _count(day)
+            loads = {**counters, LOADED_FIELD: 1}
+            for order_id, share in shares.items():
+                old_day = cache.get(order_load_key(order_id))
+                if old_day and old_day != str(day):  # still counted on the day it was moved from
+                    old_loads = cache.get(slot_load_key(old_day)) or {}
+                    if _share_field(order_id) in old_loads:
+                        _move_local(old_loads, order_id, old_loads[_share_field(order_id)], -1)
+                        cache.set(slot_load_key(old_day), old_loads, timeout=_timeout(old_day))
+                loads[_share_field(order_id)] = share
+            cache.set(slot_load_key(day), loads, timeout=_timeout(day))
+            cache.set_many({order_load_key(order_id): str(day) for order_id in shares}, timeout=_timeout(day))
+        return {**counters, LOADED_FIELD: 1}
+
+    from redis.exceptions import WatchError
+    seed = conn.register_script(SEED_SCRIPT)
+    with conn.pipeline() as pipe:
+        while True:
+            try:
+                # an update while we read the DB aborts the write, and we count again
+                pipe.watch(slot_load_key(day))
+                counters, shares = _count(day)
+                counters[LOADED_FIELD] = 1
+                args = [slot_load_key(""), order_load_key(""), str(day), _timeout(day), len(counters)]
+                args += [value for pair in counters.items() for value in pair]
+                args += [value for pair in shares.items() for value in pair]
+                pipe.multi()
+                seed(keys=[slot_load_key(day)], args=args, client=pipe)
+                pipe.execute()
+                return counters
+            except WatchError:
+                continue
+
+
+def resync_slot_loads(days=SLOT_RESYNC_DAYS):
+    """Re-seeds today and the next few days (scheduled job; repairs any drift)."""
+    start = today()
+    for offset in range(days):
+        seed_slot_loads(start + timedelta(days=offset))
+
+
+def slot_loads(day):
+    """{slot: {"orders": n, "items": n}} for every delivery slot on `day`."""
+    raw = _read(day)
+    if LOADED_FIELD not in raw:
+        raw = seed_slot_loads(day)
+    return {slot: {kind: int(raw.get(_field(slot, kind), 0)) for kind in KINDS} for slot, _ in DELIVERY_TIME_SLOTS}
+
+
+def in_slot_horizon(day):
+    """Today through SLOT_RESYNC_DAYS ahead: the only days slot availability is looked up for."""
+    return today() <= day <= today() + timedelta(days=SLOT_RESYNC_DAYS)
+
+
+def is_full(load):
+    return ((SLOT_MAX_ORDERS is not None and load["orders"] >= SLOT_MAX_ORDERS)
+            or (SLOT_MAX_ITEMS is not None and load["items"] >= SLOT_MAX_ITEMS))
+
+
+def open_slots(day, slots=None):
+    """The given slots (default: all delivery slots) that still have kitchen capacity on `day`."""
+    loads = slot_loads(day)
+    slots = slots if slots is not None else [slot for slot, _ in DELIVERY_TIME_SLOTS]
+    return [slot for slot in slots if not is_full(loads.get(slot, {"orders": 0, "items": 0}))]
+
+
+# -------------------------------
+# Keeping the counters in step with orders
+
+def slot_loads_changed(orders, deleted=False):
+    """
+    Schedules a counter update for these orders once the current transaction commits.
+    Each order's counted share (slot, dishes) is kept in its day's hash, so the update is the
+    difference to what was counted before: confirming adds, cancelling
+    or deleting takes it away again, moving it to another slot does both — and repeating it
+    changes nothing.
+    """
+    states = {
+        order.id: (str(order.date), order.delivery_time_slot) if order.is_confirmed and not deleted else None
+        for order in orders
+    }
+    if states:
+        transaction.on_commit(lambda: _apply(states))
+
+
+def _apply(states):
+    confirmed = [order_id for order_id, state in states.items() if state]
+    dishes = dict(
+        OrderItem.objects.filter(order_id__in=confirmed).values("order_id")
+        .annotate(n=Sum("quantity")).order_by().values_list("order_id", "n")
+    ) if confirmed else {}
+    # (day, "<slot>|<dishes>") each order should be counted as now; ("", "") = not counted
+    shares = {
+        order_id: (state[0], f"{state[1]}|{dishes.get(order_id) or 0}") if state else ("", "")
+        for order_id, state in states.items()
+    }
+
+    try:
+        conn = get_redis()
+        if conn is None:
+            _apply_local(shares)
+            return
+        args = [slot_load_key("")]
+        for order_id, (day, share) in shares.items():
+            args += [order_id, day, share, _timeout(day) if day else 60]
+        conn.register_script(APPLY_SCRIPT)(keys=[order_load_key(order_id) for order_id in shares], args=args)
+    except Exception as e:
+        print(f"⚠️ Could not update slot load counters: {e}")
+
+
+def _apply_local(shares):
+    """APPLY_SCRIPT for the locmem cache, under the lock instead of in Redis."""
+    with _local_slot_lock:
+        for order_id, (day, share) in shares.items():
+            old_day = cache.get(order_load_key(order_id)) or ""
+            old_loads = (cache.get(slot_load_key(old_day)) or {}) if old_day else {}
+            old_share = old_loads.get(_share_field(order_id), "")
+            if not old_share:
+                old_day = ""  # no longer in that day's counts (re-seeded since)
+            if (old_day, old_share) != (day, share):
+                if old_share:
+                    _move_local(old_loads, order_id, old_share, -1)
+                    cache.set(slot_load_key(old_day), old_loads, timeout=_timeout(old_day))
+                if share:
+                    loads = cache.get(slot_load_key(day)) or {}
+                    _move_local(loads, order_id, share, 1)
+                    cache.set(slot_load_key(day), loads, timeout=_timeout(day))
+            if day:
+                cache.set(order_load_key(order_id), day, timeout=_timeout(day))
+            else:
+                cache.delete(order_load_key(order_id))
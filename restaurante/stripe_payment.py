@@ -1,37 +1,140 @@
 # restaurante/stripe_payment.py
+import hashlib
+import time
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.conf import settings
+from django.core.cache import cache
 import stripe
 from decimal import Decimal
 
-from .models import Cart
+from .authentication import StatelessJWTAuthentication
+from .cart_store import get_cart
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
+# The user's open PaymentIntent, reused while the cart is unchanged and updated in place when
+# it changes. Dropped (and the generation bumped) once an order claims it at checkout.
+PAYMENT_INTENT_TIMEOUT = 60 * 60 * 24
+PAYMENT_CURRENCY = "usd"
+
+
+def payment_intent_key(user_id):
+    return f"payment_intent_{user_id}"
+
+
+def intent_generation_key(user_id):
+    return f"payment_intent_gen_{user_id}"
+
+
+class PaymentIntentMismatch(Exception):
+    """The open intent was made for a different cart or amount than the one being ordered."""
+
+
+def cart_fingerprint(lines):
+    # order- and format-independent, so the in-memory cart and the Cart rows agree
+    material = "|".join(
+        f"{line.menuitem_id}:{line.quantity}:{Decimal(line.unit_price):.2f}"
+        for line in sorted(lines, key=lambda line: line.menuitem_id)
+    )
+    return hashlib.sha1(material.encode("utf-8")).hexdigest()
+
+
+def intent_amount(total):
+    return int(total * Decimal("1.2"))  # e.g. rs. 100->120c (a str: Decimal(1.2) is 1.1999…)
+
+
+def _generation(user_id):
+    # seeded with a timestamp so idempotency keys never repeat after a cache flush
+    key = intent_generation_key(user_id)
+    cache.add(key, time.time_ns() // 1000, timeout=None)
+    return cache.get(key)
+
+
+def get_or_create_payment_intent(user_id, lines, amount_cents):
+    """
+    Returns {"id", "client_secret", "amount", "fingerprint"} for the user's cart. No Stripe call
+    when the cart hasn't changed since the last one; otherwise the open intent's amount is
+    modified. Every Stripe write carries an idempotency key, so retried clicks can't
+    create duplicate intents.
+    """
+    key = payment_intent_key(user_id)
+    fingerprint = cart_fingerprint(lines)
+    cached = cache.get(key)
+    if cached and cached["fingerprint"] == fingerprint:
+        return cached
+
+    idempotency_key = f"pi-{user_id}-{_generation(user_id)}-{fingerprint}"
+    intent = None
+    if cached:
+        try:
+            intent = stripe.PaymentIntent.modify(
+                cached["id"], amount=amount_cents, idempotency_key=f"{idempotency_key}-update"
+            )
+        except stripe.InvalidRequestError as e:
+            # already paid / cancelled on Stripe's side: start a fresh one
+            print(f"⚠️ Could not update PaymentIntent {cached['id']}: {e}")
+    if intent is None:
+        intent = stripe.PaymentIntent.create(
+            amount=amount_cents,
+            currency=PAYMENT_CURRENCY,
+            automatic_payment_methods={"enabled": True},
+            metadata={"user_id": user_id},
+            idempotency_key=idempotency_key,
+        )
+
+    record = {"id": intent.id, "client_secret": intent.client_secret,
+              "amount": amount_cents, "fingerprint": fingerprint}
+    cache.set(key, record, timeout=PAYMENT_INTENT_TIMEOUT)
+    return record
+
+
+def open_payment_intent_id(user_id, lines, total):
+    """
+    The user's open intent, if it was made for exactly these cart lines and this total.
+    Raises PaymentIntentMismatch when the cart changed after the intent was made (the client
+    has to refresh the intent, i.e. pay the current amount, before ordering).
+    """
+    cached = cache.get(payment_intent_key(user_id))
+    if not cached:
+        return None
+    if cached["fingerprint"] != cart_fingerprint(lines) or cached["amount"] != intent_amount(total):
+        raise PaymentIntentMismatch("Cart changed after the payment was started")
+    return cached["id"]
+
+
+def close_payment_intent(user_id):
+    """
+    Once an order has claimed the intent: forget it, and give later intents new idempotency
+    keys even for an identical cart.
+    """
+    cache.delete(payment_intent_key(user_id))
+    try:
+        cache.incr(intent_generation_key(user_id))
+    except ValueError:
+        pass  # flushed: the next _generation() re-seeds from the clock
+
+
 class CreatePaymentIntent(APIView):
     permission_classes = [IsAuthenticated]
+    authentication_classes = [StatelessJWTAuthentication]
 
     def post(self, request, *args, **kwargs):
         user = request.user
-        cart_items = Cart.objects.filter(user=user)
-        if not cart_items.exists():
+        cart_items = get_cart(user).lines()  # from the in-memory cart, no DB reads
+        if not cart_items:
             return Response({"error": "No items in cart"}, status=400)
-        
+
         # Calculate total in cents
         total_amount = sum(item.price for item in cart_items)
-        amount_cents = int(total_amount * Decimal(1.2))  # e.g. rs. 100->120c
+        amount_cents = intent_amount(total_amount)
 
         try:
-            intent = stripe.PaymentIntent.create(
-                amount=amount_cents,
-                currency="usd",
-                automatic_payment_methods={"enabled": True},
-                metadata={"user_id": user.id}
-            )
+            intent = get_or_create_payment_intent(user.pk, cart_items, amount_cents)
             return Response({
-                "client_secret": intent.client_secret
+                "client_secret": intent["client_secret"]
             })
         except Exception as e:
             return Response({"error": str(e)}, status=500)
@@ -0,0 +1,218 @@
+# restaurante/stripe_webhooks.py
+import hashlib
+import hmac
+import json
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+import stripe
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.http import HttpResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from .background import run_in_background
+from .checkout import queue_order_confirmation
+from .models import Order, StripeEvent
+from .order_events import publish_order_updates
+from .rollups import sales_changed
+from .slot_capacity import slot_loads_changed
+from .stripe_payment import PAYMENT_CURRENCY, intent_amount
+
+STRIPE_EVENT_BATCH_SIZE = 100
+STRIPE_EVENT_MAX_ATTEMPTS = 8
+STRIPE_EVENT_RETRY_BASE = 30        # seconds; an event can arrive before its order is placed
+STRIPE_EVENT_RETRY_MAX = 60 * 60
+STRIPE_EVENT_LEASE = 60 * 5
+
+PAYMENT_SUCCEEDED = "payment_intent.succeeded"
+PAYMENT_FAILED = "payment_intent.payment_failed"
+
+
+# -------------------------------
+# Ingestion: verify, store, return
+
+@csrf_exempt
+@require_POST
+def stripe_webhook(request):
+    """
+    Stripe webhook endpoint. Only verifies the signature and stores the event;
+    process_stripe_events applies it in the background, so Stripe gets its 200 right away.
+    """
+    secret = settings.STRIPE_WEBHOOK_SECRET
+    if not secret:
+        print("⚠️ STRIPE_WEBHOOK_SECRET is not set; rejecting webhook")
+        return HttpResponse(status=503)
+    try:
+        stripe.Webhook.construct_event(request.body, request.headers.get("Stripe-Signature", ""), secret)
+    except (ValueError, stripe.SignatureVerificationError) as e:
+        print(f"⚠️ Rejected Stripe webhook: {e}")
+        return HttpResponse(status=400)
+
+    ingest_event(json.loads(request.body))
+    return HttpResponse(status=200)
+
+
+def ingest_event(event):
+    """Stores a verified event once (Stripe retries deliveries); returns True if it was new."""
+    obj = event.get("data", {}).get("object", {})
+    _, created = StripeEvent.objects.get_or_create(
+        event_id=event["id"],
+        defaults={"type": event.get("type", ""), "object_id": obj.get("id", ""), "payload": event},
+    )
+    if created:
+        transaction.on_commit(lambda: run_in_background(process_stripe_events))
+    return created
+
+
+def sign_payload(payload, secret, timestamp=None):
+    """A Stripe-Signature header for `payload` — for replaying recorded events locally and in tests."""
+    timestamp = int(timestamp or time.time())
+    signature = hmac.new(secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+# -------------------------------
+# Processing: batches of stored events -> orders
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(STRIPE_EVENT_RETRY_BASE * 2 ** (attempts - 1), STRIPE_EVENT_RETRY_MAX))
+
+
+def claim_events(batch_size=STRIPE_EVENT_BATCH_SIZE):
+    """Leases due events the same way outbox.claim_batch leases emails."""
+    now = timezone.now()
+    due_ids = list(
+        StripeEvent.objects.filter(status='pending', next_attempt_at__lte=now)
+        .order_by('id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    claimed = []
+    lease_until = now + timedelta(seconds=STRIPE_EVENT_LEASE)
+    for event_id in due_ids:
+        if StripeEvent.objects.filter(
+            id=event_id, status='pending', next_attempt_at__lte=now
+        ).update(next_attempt_at=lease_until):
+            claimed.append(event_id)
+    return list(StripeEvent.objects.filter(id__in=claimed).order_by('id'))
+
+
+def process_stripe_events(batch_size=STRIPE_EVENT_BATCH_SIZE, max_batches=None):
+    """Applies pending events in batches. Returns the number of events processed."""
+    processed = batches = 0
+    while max_batches is None or batches < max_batches:
+        batch = claim_events(batch_size)
+        if not batch:
+            break
+        batches += 1
+        by_type = defaultdict(list)
+        for event in batch:
+            by_type[event.type].append(event)
+
+        processed += apply_payments(by_type.pop(PAYMENT_SUCCEEDED, []))
+        failed = by_type.pop(PAYMENT_FAILED, [])
+        for event in failed:
+            # the order stays pending; the customer can retry with the same intent
+            print(f"⚠️ Stripe payment failed for intent {event.object_id}")
+        _mark([event.id for event in failed], 'processed')
+        _mark([event.id for events in by_type.values() for event in events], 'ignored')
+        processed += len(failed)
+    return processed
+
+
+def payment_intent_linked(intent_id):
+    """An order now references this intent: apply any event that arrived before it, right away."""
+    if StripeEvent.objects.filter(status='pending', object_id=intent_id).update(next_attempt_at=timezone.now()):
+        run_in_background(process_stripe_events)
+
+
+def payment_mismatch(order, event):
+    """Why the event's payment doesn't cover the order (amount or currency), or None if it does."""
+    intent = event.payload.get("data", {}).get("object", {})
+    expected = intent_amount(order.total)
+    received, currency = intent.get("amount_received"), intent.get("currency")
+    if received != expected or currency != PAYMENT_CURRENCY:
+        return f"Received {received} {currency}, order #{order.id} expects {expected} {PAYMENT_CURRENCY}"
+    return None
+
+
+def apply_payments(events):
+    """
+    Marks the orders paid by these succeeded intents as paid + confirmed with one UPDATE and
+    queues their confirmation emails. Events whose order doesn't exist yet are retried; a
+    payment that doesn't match its order's amount and currency fails the event and leaves
+    the order pending.
+    """
+    if not events:
+        return 0
+    with transaction.atomic():
+        orders = list(
+            Order.objects.select_for_update()
+            .select_related("user", "user__profile")
+            .filter(stripe_payment_intent_id__in={event.object_id for event in events})
+        )
+        by_intent = {order.stripe_payment_intent_id: order for order in orders}
+        paid, mismatched = set(), []
+        for event in events:
+            order = by_intent.get(event.object_id)
+            if order is None:
+                continue
+            error = payment_mismatch(order, event)
+            if error:
+                mismatched.append((event, error))
+            else:
+                paid.add(event.object_id)
+
+        newly_paid = [order for order in orders
+                      if order.stripe_payment_intent_id in paid and order.payment_status != 'paid']
+        Order.objects.filter(id__in=[order.id for order in newly_paid]).update(
+            payment_status='paid', is_confirmed=True
+        )
+        for order in newly_paid:
+            already_confirmed = order.is_confirmed
+            order.payment_status, order.is_confirmed = 'paid', True
+            if not already_confirmed:
+                queue_order_confirmation(order)
+        sales_changed(*{order.date for order in newly_paid})
+        slot_loads_changed(newly_paid)
+        publish_order_updates(newly_paid)
+
+        done = [event for event in events if event.object_id in paid]
+        _mark([event.id for event in done], 'processed')
+        for event, error in mismatched:
+            _fail(event, error)
+
+    cache.delete_many([f"order_context_user_{order.user_id}" for order in newly_paid])
+    for event in events:
+        if event.object_id not in by_intent:
+            _retry_later(event, "No order linked to this PaymentIntent yet")
+    return len(done)
+
+
+def _mark(event_ids, status):
+    if event_ids:
+        StripeEvent.objects.filter(id__in=event_ids).update(
+            status=status, processed_at=timezone.now(), attempts=F('attempts') + 1, last_error=''
+        )
+
+
+def _fail(event, error):
+    print(f"❌ Stripe event {event.event_id} not applied: {error}")
+    StripeEvent.objects.filter(id=event.id).update(
+        status='failed', processed_at=timezone.now(), attempts=F('attempts') + 1, last_error=error
+    )
+
+
+def _retry_later(event, error):
+    attempts = event.attempts + 1
+    if attempts >= STRIPE_EVENT_MAX_ATTEMPTS:
+        update = {"status": 'failed'}
+        print(f"❌ Giving up on Stripe event {event.event_id} after {attempts} attempts: {error}")
+    else:
+        update = {"next_attempt_at": timezone.now() + retry_delay(attempts)}
+    StripeEvent.objects.filter(id=event.id).update(attempts=attempts, last_error=error, **update)
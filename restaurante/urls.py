@@ -3,11 +3,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import index, CategoriesView, CartView, OrderView, SingleOrderView, GroupViewSet, DeliveryCrewViewSet, \
-UserRegistrationView, UserProfileView, MenuItemViewSet, AdminUserViewSet, BookingViewSet, CartItemDetailView, delete_unconfirmed_order
+UserRegistrationView, UserProfileView, MenuItemViewSet, AdminUserViewSet, BookingViewSet, CartItemDetailView, CartBulkView, delete_unconfirmed_order
 from restaurante.views import available_time_slots
 from .views import CustomerReviewViewSet
-from .views import botorder_confirm_email
+from .views import botorder_confirm_email, dispatch_deliveries
 from .stripe_payment import CreatePaymentIntent
+from .stripe_webhooks import stripe_webhook
+from .reports import SalesReportView
+from .order_events import my_order_events, order_events, order_events_ticket
 
 # from restaurante.chaatgpt_views_booking import chaatgpt_view
 # from restaurante.chaatgpt_views_orders import chaatgpt_view
@@ -24,16 +27,23 @@ urlpatterns = [
     path('', index, name='index'),
     path('categories', CategoriesView.as_view()),
     path('cart/menu-items', CartView.as_view(), name='cart-list-create'),
+    path('cart/menu-items/bulk', CartBulkView.as_view(), name='cart-bulk'),
     path('cart/menu-items/<int:pk>', CartItemDetailView.as_view(), name='cart-detail'),
     path('orders', OrderView.as_view()),
     path('orders/available-time-slots/', available_time_slots, name='order-available-time-slots'),
+    path('orders/dispatch', dispatch_deliveries, name='dispatch-deliveries'),
     path('orders/<int:pk>', SingleOrderView.as_view()),
+    path('orders/<int:order_id>/events', order_events, name='order-events'),
+    path('orders/events', my_order_events, name='my-order-events'),
+    path('orders/events/ticket', order_events_ticket, name='order-events-ticket'),
     path('groups/manager/users', GroupViewSet.as_view({'get': 'list', 'post': 'create', 'delete': 'destroy'})),
     path('groups/delivery-crew/users', DeliveryCrewViewSet.as_view({'get': 'list', 'post': 'create', 'delete': 'destroy'})),
     # path('', include(router.urls)),  # ✅ Include the registered menu-items route
     path('register/', UserRegistrationView.as_view(), name='register'),
     path('me/', UserProfileView.as_view(), name='user-profile'),
     path('api/create-payment-intent/', CreatePaymentIntent.as_view(), name='create-payment-intent'),
+    path('api/stripe/webhook/', stripe_webhook, name='stripe-webhook'),
+    path('reports/sales', SalesReportView.as_view(), name='sales-report'),
     path('api/chaatbaat/', chaatgpt_view, name='chaatgpt'),
     path('api/chaatreset/', reset_chat_context, name='reset-chat-context'),
     path("orders/<int:order_id>/confirm/", botorder_confirm_email),
@@ -9,8 +9,11 @@ from restaurante.models import (
     UserProfile
 )
 from datetime import datetime, date, timedelta
+import json
 from dateutil import parser
 import pytz
+from restaurante.chatviews.summarizer import maybe_schedule_summary, get_summary
+from restaurante.redis_client import update_cached
 
 IST = pytz.timezone("Asia/Kolkata")
 
@@ -64,13 +67,33 @@ def clear_order_context(session_id):
     cache.delete(key)
     
 
+def chat_session_id(request):
+    """
+    user_<id> when logged in, else guest_<X-Guest-Id>, else a Django session. Identifies the
+    conversation only — it's client-chosen for guests, so LLM budgets also cap per IP.
+    """
+    user = request.user
+    guest_id = request.headers.get("X-Guest-Id")
+    if user.is_authenticated:
+        return f"user_{user.id}"
+    if guest_id:
+        return f"guest_{guest_id}"
+    if not request.session.session_key:
+        request.session.create()
+    return f"session_{request.session.session_key}"
+
+
+def chat_history_key(user, session_id):
+    return f"chat_history_user_{user.id}" if user and user.is_authenticated else f"chat_history_guest_{session_id}"
+
+
 def get_chat_history(user, session_id, limit=8):
     """
     Retrieves last `limit` messages from cache. Each message is a dict like:
     {"role": "user", "content": "..."} or
     {"role": "function", "name": "...", "content": "..."}
     """
-    key = f"chat_history_user_{user.id}" if user and user.is_authenticated else f"chat_history_guest_{session_id}"
+    key = chat_history_key(user, session_id)
     history = cache.get(key, [])
     # return history[-limit:]
     return [
@@ -81,19 +104,35 @@ def get_chat_history(user, session_id, limit=8):
 
 
 
+def get_chat_summary(user, session_id):
+    """
+    Rolling summary of messages that have scrolled out of the history window
+    (maintained in the background by chatviews/summarizer.py).
+    """
+    return get_summary(chat_history_key(user, session_id))
+
+
 def save_chat_turn(user, session_id, role=None, message=None, full_message=None, name=None):
-    key = f"chat_history_user_{user.id}" if user and user.is_authenticated else f"chat_history_guest_{session_id}"
-    history = cache.get(key, [])
+    key = chat_history_key(user, session_id)
     if full_message:
-        history.append(full_message)
+        msg = full_message
     else:
         msg = {"role": role, "content": message}
         if name:
             msg["name"] = name
-        history.append(msg)
-    cache.set(key, history, timeout=600)
+    # compare-and-set, so a background summary trim running meanwhile can't drop this turn
+    history = update_cached(key, lambda history: (history or []) + [msg], timeout=600)
+    maybe_schedule_summary(key, history)
 
-def save_to_db_conversation(user, session_id, role=None, message=None, full_message=None):
+def _usage_fields(usage):
+    # `usage` is the CompletionUsage object on an OpenAI response (or None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+    }
+
+
+def save_to_db_conversation(user, session_id, role=None, message=None, full_message=None, usage=None):
     if full_message:
         role = full_message.get("role")
         if role == "function":
@@ -112,7 +151,48 @@ def save_to_db_conversation(user, session_id, role=None, message=None, full_mess
         user=user if user and user.is_authenticated else None,
         session_id=session_id,
         role=role,
-        message=message
+        message=message,
+        **_usage_fields(usage)
+    )
+
+
+def tool_call_succeeded(result):
+    """Tools report soft failures in their payload rather than raising."""
+    if isinstance(result, dict):
+        if result.get("error"):
+            return False
+        return not str(result.get("message", "")).startswith("❌")
+    return True
+
+
+def save_tool_call_to_db(user, session_id, func_name, args, result, latency_ms=None, succeeded=None):
+    """
+    Persists one tool call as a structured row (function_name / arguments / result
+    JSON + latency), so analytics can aggregate in SQL instead of parsing `message`.
+    Token usage isn't repeated here: it belongs to the assistant row of the completion
+    that requested the call, whatever the number of calls.
+    """
+    if succeeded is None:
+        succeeded = tool_call_succeeded(result)
+
+    # round-trip through json so Decimals/dates/model reprs don't break the JSONField
+    safe_args = json.loads(json.dumps(args or {}, default=str))
+    safe_result = json.loads(json.dumps(result, default=str))
+
+    message = f"{func_name}: {result}"
+    if len(message) > 500:
+        message = message[:497] + "..."
+
+    ChatHistory.objects.create(
+        user=user if user and user.is_authenticated else None,
+        session_id=session_id,
+        role="function",
+        message=message,
+        function_name=func_name,
+        function_arguments=safe_args,
+        function_result=safe_result,
+        succeeded=succeeded,
+        latency_ms=int(latency_ms) if latency_ms is not None else None,
     )
 
 # -------------------------------
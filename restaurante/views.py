@@ -1,27 +1,43 @@
+from datetime import date
+from decimal import Decimal
+
 from django.shortcuts import render, get_object_or_404
+from django.db import transaction
+from django.db.models import Prefetch
 from django.contrib.auth.models import Group, User
 
 
 from rest_framework.response import Response
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import action, api_view, authentication_classes, permission_classes
 from rest_framework import generics, viewsets, filters, status
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny, IsAuthenticatedOrReadOnly
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 
 
 
-from .models import Category, MenuItem, Cart, Order, OrderItem, Booking, TIME_SLOTS, DELIVERY_TIME_SLOTS
+from .models import Category, MenuItem, Order, OrderItem, Booking, TIME_SLOTS, today
 from .serializers import BookingSerializer, CategorySerializer, MenuItemSerializer, \
-    CartSerializer, OrderSerializer, UserSerializer, UserRegistrationSerializer, UserWithProfileSerializer
-from .permissions import IsManager, IsDeliveryCrew, IsManagerOrAdminForSafe
-
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
-from django.core.mail import EmailMultiAlternatives
-from django.utils.html import strip_tags
+    CartLineSerializer, CartBulkSerializer, OrderSerializer, OrderListSerializer, UserSerializer, UserRegistrationSerializer, \
+    UserWithProfileSerializer
+from .permissions import IsManager, IsDeliveryCrew, IsManagerOrAdminForSafe, IsStaffOrManager
+from .menu_cache import MenuCacheMixin
+from .authentication import StatelessJWTAuthentication, StatelessReadMixin, add_role_claims
+from .search import search_menu_items
+from .autocomplete import suggest
+from .cart_store import MenuItemUnavailable, get_cart
+from .dispatch import dispatch_orders
+from .slot_capacity import SLOT_RESYNC_DAYS, in_slot_horizon, open_slots
+from .redis_client import update_cached
+from .checkout import EmptyCartError, checkout_cart, queue_order_confirmation
+from .email_rendering import render_email
+from .outbox import queue_email
+from .stripe_webhooks import payment_intent_linked
+from .stripe_payment import PaymentIntentMismatch
+from .roles import is_customer, is_delivery_crew, is_manager, is_staff_or_manager
+from .pagination import BookingPagination, OrderPagination, ReviewPagination, UserPagination
 
 from django.conf import settings
 
@@ -37,9 +53,10 @@ def index(request):
 
 
 # @method_decorator(csrf_exempt, name='dispatch')
-class BookingViewSet(viewsets.ModelViewSet):
+class BookingViewSet(StatelessReadMixin, viewsets.ModelViewSet):
     # queryset = Booking.objects.all()
     serializer_class = BookingSerializer
+    pagination_class = BookingPagination
     # permission_classes = [AllowAny]
     
     def get_permissions(self):
@@ -53,9 +70,9 @@ class BookingViewSet(viewsets.ModelViewSet):
         user = self.request.user
         if user.is_authenticated:
             # For normal users, show only their reservations
-            if user.is_staff or user.is_superuser or user.groups.filter(name="manager").exists():
+            if is_staff_or_manager(user):
                 return Booking.objects.all().order_by('-reservation_date', '-reservation_time')
-            return Booking.objects.filter(user=user).order_by('-reservation_date', '-reservation_time')
+            return Booking.objects.filter(user_id=user.pk).order_by('-reservation_date', '-reservation_time')
         # For non-logged-in users, return nothing (or could allow showing NONE)
         return Booking.objects.none()
 
@@ -65,7 +82,7 @@ class BookingViewSet(viewsets.ModelViewSet):
         user = self.request.user
         if self.request.method in ['PATCH', 'PUT', 'DELETE']:
             if user.is_authenticated:
-                if obj.user == user or user.is_staff or user.is_superuser or user.groups.filter(name="manager").exists():
+                if obj.user == user or is_staff_or_manager(user):
                     return obj
                 else:
                     raise PermissionDenied("You do not have permission to modify this booking.")
@@ -92,7 +109,7 @@ class BookingViewSet(viewsets.ModelViewSet):
         return Response({"times": available})
 
     # ------------------------
-    # Send Emails
+    # Send Emails (queued in the outbox; delivered after commit — see outbox.py)
     # ------------------------
     def send_confirmation_email(self, booking):
         subject = "Your Table Reservation at Dhanno Banno Ki Rasoi"
@@ -106,18 +123,10 @@ class BookingViewSet(viewsets.ModelViewSet):
             "occasion": booking.occasion,
             "reference_number": booking.reference_number,
             "manage_link": f"{settings.FRONTEND_URL}/manage-reservation/{booking.reference_number}",
-            "photo_link": f"{settings.BACKEND_URL}/static/img/bannocopy.jpg"
         }
 
-        html_message = render_to_string("book_confirm.html", context)
-        email_message = EmailMultiAlternatives(
-            subject,
-            strip_tags(html_message),
-            from_email,
-            to_email
-        )
-        email_message.attach_alternative(html_message, "text/html")
-        email_message.send(fail_silently=False)
+        html_message, text_message = render_email("booking_confirmation", context)
+        queue_email(subject, to_email, html=html_message, body=text_message, from_email=from_email)
 
     def send_cancellation_email(self, booking):
         subject = "Your Reservation Has Been Cancelled"
@@ -132,10 +141,8 @@ class BookingViewSet(viewsets.ModelViewSet):
             "reference_number": booking.reference_number,
         }
 
-        html_message = render_to_string("booking_cancelled.html", context)
-        email_message = EmailMultiAlternatives(subject, strip_tags(html_message), from_email, to_email)
-        email_message.attach_alternative(html_message, "text/html")
-        email_message.send(fail_silently=False)
+        html_message, text_message = render_email("booking_cancellation", context)
+        queue_email(subject, to_email, html=html_message, body=text_message, from_email=from_email)
 
     # ------------------------
     # On Create: attach user if logged in
@@ -144,11 +151,12 @@ class BookingViewSet(viewsets.ModelViewSet):
         email = self.request.data.get('email') or (
             self.request.user.email if self.request.user.is_authenticated else None
         )
-        booking = serializer.save(
-            user=self.request.user if self.request.user.is_authenticated else None,
-            email=email
-        )
-        self.send_confirmation_email(booking)
+        with transaction.atomic():
+            booking = serializer.save(
+                user=self.request.user if self.request.user.is_authenticated else None,
+                email=email
+            )
+            self.send_confirmation_email(booking)
 
     # ------------------------
     # Manage Booking by Reference Number
@@ -167,25 +175,27 @@ class BookingViewSet(viewsets.ModelViewSet):
         elif request.method == "PATCH":
             serializer = self.get_serializer(booking, data=request.data, partial=True)
             if serializer.is_valid():
-                updated_booking = serializer.save()
-                self.send_confirmation_email(updated_booking)
+                with transaction.atomic():
+                    updated_booking = serializer.save()
+                    self.send_confirmation_email(updated_booking)
                 return Response(serializer.data)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         elif request.method == "DELETE":
-            self.send_cancellation_email(booking)
-            booking.delete()
+            with transaction.atomic():
+                self.send_cancellation_email(booking)
+                booking.delete()
             return Response({"message": "Booking cancelled successfully and email sent."}, status=status.HTTP_204_NO_CONTENT)
 
     
 
-class CategoriesView(generics.ListCreateAPIView):
+class CategoriesView(StatelessReadMixin, MenuCacheMixin, generics.ListCreateAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsManagerOrAdminForSafe]
 
     
-class MenuItemViewSet(viewsets.ModelViewSet):
+class MenuItemViewSet(StatelessReadMixin, MenuCacheMixin, viewsets.ModelViewSet):
     queryset = MenuItem.objects.all()
     serializer_class = MenuItemSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -195,6 +205,24 @@ class MenuItemViewSet(viewsets.ModelViewSet):
     # permission_classes = [IsManagerOrAdminForSafe]
     permission_classes = []
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # ?q= ranked search (tsvector + trigram on Postgres); ?search= stays the plain icontains filter
+        q = self.request.query_params.get("q")
+        if q and self.action == "list":
+            queryset = search_menu_items(queryset, q)
+        return queryset
+
+    @action(detail=False, methods=["get"], url_path="suggest")
+    def suggest(self, request):
+        # autocomplete from the in-memory prefix trie — no DB hit per keystroke
+        prefix = request.query_params.get("prefix", "")
+        try:
+            limit = int(request.query_params.get("limit", 8))
+        except ValueError:
+            limit = 8
+        return Response({"prefix": prefix, "suggestions": suggest(prefix, limit=limit)})
+
     
 
 
@@ -207,62 +235,116 @@ class SingleMenuItemView(generics.RetrieveUpdateDestroyAPIView):
 # CART VIEW, ORDERITEM VIEW, AND ORDER VIEW
 
 class CartView(generics.ListCreateAPIView):
-    queryset = Cart.objects.all()
-    serializer_class = CartSerializer
+    """
+    The user's cart, served from the Redis-backed cart store (cart_store.py): listing,
+    adding and clearing never touch the DB. Token claims are enough to know whose cart it is.
+    """
+    serializer_class = CartLineSerializer
     permission_classes = [IsAuthenticated]
+    authentication_classes = [StatelessJWTAuthentication]
 
     def get_queryset(self):
-        # if self.request.user.is_superuser:
-        #     return Cart.objects.all()
-        return Cart.objects.all().filter(user=self.request.user)
+        return get_cart(self.request.user).lines()
+
+    def perform_create(self, serializer):
+        # adding an item already in the cart replaces its quantity (one line per item)
+        try:
+            serializer.instance = get_cart(self.request.user).set(
+                serializer.validated_data["menuitem_id"], serializer.validated_data["quantity"]
+            )
+        except MenuItemUnavailable as e:
+            raise ValidationError({"menuitem": str(e)})
 
     def delete(self, request, *args, **kwargs):
-        Cart.objects.all().filter(user=self.request.user).delete()
+        get_cart(request.user).clear()
         return Response("ok")
 
 
 class CartItemDetailView(generics.RetrieveUpdateDestroyAPIView):
-    serializer_class = CartSerializer
+    """A single cart line, addressed by its menu item id."""
+    serializer_class = CartLineSerializer
     permission_classes = [IsAuthenticated]
+    authentication_classes = [StatelessJWTAuthentication]
 
-    def get_queryset(self):
-        # Only allow the logged-in user to access their cart items
-        # if self.request.user.is_superuser:
-        #     return Cart.objects.all()
-        return Cart.objects.filter(user=self.request.user)
+    def get_object(self):
+        line = get_cart(self.request.user).get(self.kwargs["pk"])
+        if line is None:
+            raise NotFound("No such item in cart.")
+        return line
 
+    def update(self, request, *args, **kwargs):
+        line = self.get_object()
+        serializer = self.get_serializer(line, data=request.data, partial=kwargs.get("partial", False))
+        serializer.is_valid(raise_exception=True)
+        quantity = serializer.validated_data.get("quantity", line.quantity)
+        # only the quantity can change; the price is re-read from the menu
+        try:
+            line = get_cart(request.user).set(line.menuitem_id, quantity)
+        except MenuItemUnavailable as e:
+            raise ValidationError({"menuitem": str(e)})
+        return Response(self.get_serializer(line).data)
+
+    def perform_destroy(self, instance):
+        get_cart(self.request.user).remove(instance.menuitem_id)
+
+class CartBulkView(generics.GenericAPIView):
+    """
+    Several cart changes in one request (adding a combo, re-ordering a past order):
+    {"operations": [{"op": "add" | "set" | "remove", "menuitem": 3, "quantity": 2}, ...]}.
+    Validated against one menu lookup and applied to the cart store in a single write;
+    returns the resulting cart and its total.
+    """
+    serializer_class = CartBulkSerializer
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [StatelessJWTAuthentication]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            lines = get_cart(request.user).apply(serializer.validated_data["operations"])
+        except MenuItemUnavailable as e:
+            raise ValidationError({"operations": str(e)})
+        return Response({
+            "items": CartLineSerializer(lines, many=True).data,
+            "total": str(sum((line.price for line in lines), Decimal("0"))),
+        })
+
+
+
+ORDER_ITEMS_PREFETCH = Prefetch("order", queryset=OrderItem.objects.select_related("menuitem"))
 
-    
 
-class OrderView(generics.ListCreateAPIView):
+class OrderView(StatelessReadMixin, generics.ListCreateAPIView):
 
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = OrderPagination
         
+    def get_serializer_class(self):
+        if self.request.method == "GET":
+            return OrderListSerializer
+        return OrderSerializer
+
     def get_queryset(self):
         user = self.request.user
         qs = Order.objects.filter(is_confirmed=True)  # ✅ Default: confirmed only
 
         if user.is_superuser:
-            return Order.objects.all().order_by('-date')  # superuser sees all
-        elif user.groups.count() == 0:
-            return qs.filter(user=user).order_by('-date')  # customer sees only their confirmed orders
-        elif user.groups.filter(name='Delivery Crew').exists():
-            return qs.filter(delivery_crew=user).order_by('-date')  # delivery crew sees confirmed assigned orders
-        else:
-            return qs.order_by('-date')  # e.g., manager sees all confirmed orders
+            qs = Order.objects.all()  # superuser sees all
+        elif is_customer(user):
+            qs = qs.filter(user_id=user.pk)  # customer sees only their confirmed orders
+        elif is_delivery_crew(user):
+            qs = qs.filter(delivery_crew_id=user.pk)  # delivery crew sees confirmed assigned orders
+        # else: e.g., manager sees all confirmed orders
+
+        # one extra query for every order's items + menu titles, however many orders are on the page
+        return qs.prefetch_related(ORDER_ITEMS_PREFETCH).order_by('-date')
 
     def create(self, request, *args, **kwargs):
         user = request.user
-        cart_items = Cart.objects.filter(user=user)
-        menuitem_count = cart_items.count()
-        if menuitem_count == 0:
-            return Response({"message": "No item in cart"}, status=400)
-
         data = request.data.copy()
-        total = self.get_total_price(user)
-        data['total'] = total
         data['user'] = user.id
 
         # Accept delivery fields, defaulting to "ASAP" for time_slot if not given
@@ -277,69 +359,59 @@ class OrderView(generics.ListCreateAPIView):
                 data[field] = "ASAP"  # fallback default
 
         order_serializer = OrderSerializer(data=data)
-        if order_serializer.is_valid():
-            order = order_serializer.save()
+        if not order_serializer.is_valid():
+            return Response(order_serializer.errors, status=400)
 
-            # Transfer cart items to order
-            for item in cart_items:
-                OrderItem.objects.create(
-                    order=order,
-                    menuitem=item.menuitem,
-                    price=item.price,
-                    quantity=item.quantity,
-                )
+        # lock cart -> total -> order + bulk items -> empty cart, all in one transaction;
+        # confirmation email is sent after commit (see checkout.py)
+        try:
+            order = checkout_cart(user, order_serializer)
+        except EmptyCartError:
+            return Response({"message": "No item in cart"}, status=400)
+        except PaymentIntentMismatch:
+            # the client paid (or is paying) for a different cart: refresh the intent first
+            return Response({"message": "Cart changed since the payment was started; please confirm the payment again"},
+                            status=409)
 
-            cart_items.delete()  # Empty the cart
+        if order.stripe_payment_intent_id:
+            # the payment webhook may have come in before the order existed
+            payment_intent_linked(order.stripe_payment_intent_id)
+
+        order = Order.objects.prefetch_related(ORDER_ITEMS_PREFETCH).get(pk=order.pk)
+        return Response(OrderSerializer(order).data)
 
-            # ---- SEND CONFIRMATION EMAIL ----
-        
-            user_email = user.email
-            if user_email:
-                subject = f"Order Confirmation - Order #{order.id}"
-                # Query all order items for this order
-                order_items = OrderItem.objects.filter(order=order)
-                user_profile = getattr(request.user, 'profile', None)
-                gender = getattr(user_profile, 'gender', '').lower() if user_profile else ''
-                address = "Chatoree" if gender == "f" else "Chatore"
-
-
-                context = {
-                    "user": request.user,
-                    "order": order,
-                    "order_items": order_items,
-                    "address": address,  # Pass it in!
-                    # "photo_link" :f"{settings.BACKEND_URL}/restaurante/static/img/banno2.png"
-                    "photo_link" :f"{settings.BACKEND_URL}/static/img/banno2.png"
-                }
-            
-
-                html_content = render_to_string('order_confirmation_email.html', context)
-                msg = EmailMultiAlternatives(
-                    subject=subject,
-                    body="Thank you for your order!",
-                    from_email="Dhanno Banno Ki Rasoi <dhannobannokirasoi@gmail.com>",
-                    to=[user_email],
-                )
-                msg.attach_alternative(html_content, "text/html")
-                msg.send()
-
-            # Return order data
-            return Response(order_serializer.data)
-        else:
-            return Response(order_serializer.errors, status=400)
 
-    def get_total_price(self, user):
-        return sum(item.price for item in Cart.objects.filter(user=user))
-    
 @api_view(['GET'])
+@authentication_classes([StatelessJWTAuthentication])
 @permission_classes([AllowAny])
 def available_time_slots(request):
-    slots = [slot for slot, _ in DELIVERY_TIME_SLOTS]
-    return Response({"time_slots": slots})
+    """
+    Delivery slots on ?date=YYYY-MM-DD (default today) that the kitchen can still take orders for.
+    Only today through SLOT_RESYNC_DAYS ahead: any other date would make an anonymous request seed it.
+    """
+    try:
+        day = date.fromisoformat(request.query_params["date"]) if request.query_params.get("date") else today()
+    except ValueError:
+        return Response({"error": "date must be YYYY-MM-DD"}, status=400)
+    if not in_slot_horizon(day):
+        return Response({"error": f"date must be between today and {SLOT_RESYNC_DAYS} days ahead"}, status=400)
+    return Response({"date": day, "time_slots": open_slots(day)})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsStaffOrManager])
+def dispatch_deliveries(request):
+    """Assigns the day's unassigned delivery orders to the delivery crew (see dispatch.py). `dry_run` previews."""
+    try:
+        day = date.fromisoformat(request.data["date"]) if request.data.get("date") else None
+    except (TypeError, ValueError):
+        return Response({"error": "date must be YYYY-MM-DD"}, status=400)
+    dry_run = str(request.data.get("dry_run", "")).lower() in ("1", "true", "yes")
+    return Response(dispatch_orders(day, dry_run=dry_run))
 
 
 class SingleOrderView(generics.RetrieveUpdateAPIView):
-    queryset = Order.objects.all()
+    queryset = Order.objects.prefetch_related(ORDER_ITEMS_PREFETCH)
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
 
@@ -351,7 +423,7 @@ class SingleOrderView(generics.RetrieveUpdateAPIView):
             return Response({"error": "Unauthorized"}, status=403)
 
         # If normal customer (no group)
-        if request.user.groups.count() == 0:
+        if is_customer(request.user):
             # Allow PATCH for address fields only
             address_fields = ['delivery_address', 'delivery_city', 'delivery_pin']
             updated = False
@@ -398,6 +470,7 @@ class AdminUserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all().order_by('id')
     serializer_class = UserWithProfileSerializer
     permission_classes = [IsAdminUser]
+    pagination_class = UserPagination
     
 #####################
 # GROUP PERMISSIONS BY MANAGERS AND ADMINISTRATORS
@@ -431,7 +504,7 @@ class DeliveryCrewViewSet(viewsets.ViewSet):
     def create(self, request):
         #only for super admin and managers
         if self.request.user.is_superuser == False:
-            if self.request.user.groups.filter(name='Manager').exists() == False:
+            if not is_manager(self.request.user):
                 return Response({"message":"forbidden"}, status.HTTP_403_FORBIDDEN)
         
         user = get_object_or_404(User, username=request.data['username'])
@@ -442,7 +515,7 @@ class DeliveryCrewViewSet(viewsets.ViewSet):
     def destroy(self, request):
         #only for super admin and managers
         if self.request.user.is_superuser == False:
-            if self.request.user.groups.filter(name='Manager').exists() == False:
+            if not is_manager(self.request.user):
                 return Response({"message":"forbidden"}, status.HTTP_403_FORBIDDEN)
         user = get_object_or_404(User, username=request.data['username'])
         dc = Group.objects.get(name="Delivery Crew")
@@ -451,17 +524,18 @@ class DeliveryCrewViewSet(viewsets.ViewSet):
     
 
 
-class CustomerReviewViewSet(viewsets.ModelViewSet):
+class CustomerReviewViewSet(StatelessReadMixin, viewsets.ModelViewSet):
     queryset = CustomerReview.objects.select_related('user').order_by('-created_at')
     serializer_class = CustomerReviewSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = ReviewPagination
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
     @action(detail=False, methods=['get'], url_path='my')
     def my_reviews(self, request):
-        user_reviews = CustomerReview.objects.filter(user=request.user).order_by('-created_at')
+        user_reviews = CustomerReview.objects.filter(user_id=request.user.pk).order_by('-created_at')
         page = self.paginate_queryset(user_reviews)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -483,38 +557,19 @@ def botorder_confirm_email(request, order_id):
     try:
         order = Order.objects.get(id=order_id, user=request.user)
 
-        order.is_confirmed = True  # ✅ Mark as confirmed
-        order.save()
+        # Stripe orders are confirmed by the payment webhook (stripe_webhooks.py), and a
+        # confirmed order already has its email — just report the current state.
+        if order.payment_method != 'stripe' and not order.is_confirmed:
+            with transaction.atomic():
+                order.is_confirmed = True  # ✅ Mark as confirmed
+                order.save()
+                queue_order_confirmation(order)
 
         # ✅ Clear related cache keys
         session_id = f"user_{request.user.id}"
         cache.delete(f"order_context_{session_id}")
         cache.delete(f"chat_history_{session_id}")
-
-
-        order_items = OrderItem.objects.filter(order=order)
-
-        user_profile = getattr(request.user, 'profile', None)
-        gender = getattr(user_profile, 'gender', '').lower() if user_profile else ''
-        address = "Chatoree" if gender == "f" else "Chatore"
-
-        context = {
-            "user": request.user,
-            "order": order,
-            "order_items": order_items,
-            "address": address,
-            "photo_link": f"{settings.BACKEND_URL}/static/img/banno2.png"
-        }
-
-        html_content = render_to_string('order_confirmation_email.html', context)
-        msg = EmailMultiAlternatives(
-            subject=f"Order Confirmation - Order #{order.id}",
-            body="Thank you for your order!",
-            from_email="Dhanno Banno Ki Rasoi <dhannobannokirasoi@gmail.com>",
-            to=[request.user.email],
-        )
-        msg.attach_alternative(html_content, "text/html")
-        msg.send()
+        cache.delete(f"chat_summary_{session_id}")
 
         # return Response({"message": "Confirmation email sent."})
         serializer = OrderSerializer(order)
@@ -547,23 +602,22 @@ def delete_unconfirmed_order(request, order_id):
 
         # Cache key
         chat_key = f"chat_history_user_{request.user.id}"
-        history = cache.get(chat_key, [])
-
-        # Append tool-style function message
-        history.append({
-            "role": "function",
-            "name": "delete_order",
-            "content": json.dumps({"message": f"❌ Order #{order_id} has been cancelled."})
-        })
-
-        # Append assistant follow-up message
-        history.append({
-            "role": "assistant",
-            "content": f"✅ Aapka order #{order_id} cancel ho gaya bhaiya. Naya order shuru karna ho toh bataiye!"
-        })
+        turns = [
+            # tool-style function message
+            {
+                "role": "function",
+                "name": "delete_order",
+                "content": json.dumps({"message": f"❌ Order #{order_id} has been cancelled."})
+            },
+            # assistant follow-up message
+            {
+                "role": "assistant",
+                "content": f"✅ Aapka order #{order_id} cancel ho gaya bhaiya. Naya order shuru karna ho toh bataiye!"
+            },
+        ]
 
-        # Save updated history
-        cache.set(chat_key, history, timeout=600)
+        # Append to the history (compare-and-set, see redis_client.update_cached)
+        update_cached(chat_key, lambda history: (history or []) + turns, timeout=600)
 
 
         return Response({"message": f"Order #{order_id} deleted."})
@@ -580,10 +634,18 @@ def delete_unconfirmed_order(request, order_id):
 # views.py
 
 from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework.exceptions import AuthenticationFailed
 from django.core.cache import cache
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        # id/username/roles as claims -> read endpoints authenticate without a DB hit
+        return add_role_claims(super().get_token(user), user)
+
     def validate(self, attrs):
         data = super().validate(attrs)
 
@@ -597,7 +659,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
                 guest_session_id = f"guest_{guest_id}"
                 user_session_id = f"user_{user.id}"
 
-                for key in ["chat_mode", "order_context", "booking_context", "lang_pref", "chat_history"]:
+                for key in ["chat_mode", "order_context", "booking_context", "lang_pref", "chat_history", "chat_summary"]:
                     guest_key = f"{key}_{guest_session_id}"
                     user_key = f"{key}_{user_session_id}"
 
@@ -610,3 +672,15 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """Re-reads roles on every refresh, so claims are at most one access lifetime stale."""
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data["access"])
+        user = User.objects.filter(pk=access[jwt_settings.USER_ID_CLAIM], is_active=True).first()
+        if user is None:
+            raise AuthenticationFailed("User is inactive or deleted.")
+        data["access"] = str(add_role_claims(access, user))
+        return data
@@ -0,0 +1,22 @@
+from django.core.cache import cache
+from django.test import override_settings
+
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class LocmemCacheMixin:
+    """
+    Runs the test case on an in-process cache (no Redis: the Redis-only code paths take their
+    locmem fallbacks), emptied before every test.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        locmem = override_settings(CACHES=LOCMEM)
+        locmem.enable()
+        cls.addClassCleanup(locmem.disable)
+        super().setUpClass()
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
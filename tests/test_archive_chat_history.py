@@ -0,0 +1,43 @@
+import gzip
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils.timezone import now
+
+from restaurante.models import ChatHistory
+
+TMP_MEDIA = tempfile.mkdtemp()
+PUBLIC_MEDIA = tempfile.mkdtemp()
+
+
+@override_settings(CHAT_ARCHIVE_STORAGE={"BACKEND": "django.core.files.storage.FileSystemStorage",
+                                         "OPTIONS": {"location": TMP_MEDIA}},
+                   DEFAULT_FILE_STORAGE="django.core.files.storage.FileSystemStorage", MEDIA_ROOT=PUBLIC_MEDIA)
+class ArchiveChatHistoryTest(TestCase):
+    def setUp(self):
+        for i in range(5):
+            ChatHistory.objects.create(session_id="guest_old", role="user", message=f"old {i}")
+        ChatHistory.objects.all().update(timestamp=now() - timedelta(days=200))
+        ChatHistory.objects.create(session_id="guest_new", role="user", message="fresh")
+
+    def test_old_rows_are_archived_and_deleted_in_batches(self):
+        call_command("archive_chat_history", days=90, batch_size=2, sleep=0, stdout=StringIO())
+
+        self.assertEqual(list(ChatHistory.objects.values_list("message", flat=True)), ["fresh"])
+
+        archive_dir = os.path.join(TMP_MEDIA, "archives", "chat_history")
+        files = os.listdir(archive_dir)
+        self.assertEqual(len(files), 1)
+        with gzip.open(os.path.join(archive_dir, files[0]), "rt") as fh:
+            rows = [json.loads(line) for line in fh]
+        self.assertEqual([r["message"] for r in rows], [f"old {i}" for i in range(5)])
+        self.assertEqual(os.listdir(PUBLIC_MEDIA), [])  # never the public media bucket
+
+    def test_dry_run_keeps_rows(self):
+        call_command("archive_chat_history", days=90, dry_run=True, stdout=StringIO())
+        self.assertEqual(ChatHistory.objects.count(), 6)
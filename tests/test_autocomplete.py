@@ -0,0 +1,56 @@
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+
+from restaurante.models import Category, MenuItem, Order, OrderItem
+from tests import LocmemCacheMixin
+
+
+class MenuSuggestTest(LocmemCacheMixin, APITestCase):
+    url = "/restaurante/menu-items/suggest/"
+
+    def setUp(self):
+        super().setUp()
+        snacks = Category.objects.create(slug="snacks", title="Snacks")
+        sweets = Category.objects.create(slug="sweets", title="Sweets")
+        self.samosa = MenuItem.objects.create(title="Samosa", price=20, featured=False, category=snacks)
+        self.sabudana = MenuItem.objects.create(title="Sabudana Vada", price=25, featured=False, category=snacks)
+        MenuItem.objects.create(title="Aloo Tikki", price=30, featured=False, category=snacks)
+        MenuItem.objects.create(title="Pani Puri", price=30, featured=False, category=snacks,
+                                aliases="Gol Gappe, Puchka")
+        MenuItem.objects.create(title="Gulab Jamun", price=40, featured=True, category=sweets)
+
+        user = User.objects.create_user(username="buyer", password="x")
+        order = Order.objects.create(user=user)
+        OrderItem.objects.create(order=order, menuitem=self.sabudana, quantity=5, price=125)
+        OrderItem.objects.create(order=order, menuitem=self.samosa, quantity=2, price=40)
+
+    def suggest(self, prefix):
+        response = self.client.get(self.url, {"prefix": prefix}, HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, 200)
+        return [s["title"] for s in response.data["suggestions"]]
+
+    def test_ranked_by_popularity(self):
+        self.assertEqual(self.suggest("sa"), ["Sabudana Vada", "Samosa"])
+
+    def test_matches_later_words_and_categories(self):
+        self.assertEqual(self.suggest("tik"), ["Aloo Tikki"])
+        self.assertEqual(self.suggest("swe"), ["Sweets"])
+
+    def test_no_db_access_once_built(self):
+        self.suggest("sa")
+        with self.assertNumQueries(0):
+            self.suggest("gul")
+
+    def test_menu_change_rebuilds(self):
+        self.suggest("sa")
+        MenuItem.objects.create(title="Sandwich", price=50, featured=False, category=self.samosa.category)
+        self.assertIn("Sandwich", self.suggest("san"))
+
+    def test_aliases_are_suggested(self):
+        self.assertEqual(self.suggest("gol"), ["Pani Puri"])
+        self.assertEqual(self.suggest("gappe"), ["Pani Puri"])
+
+    def test_limit_is_clamped(self):
+        for limit, expected in [(-1, 1), (0, 1), (1000, 2)]:
+            response = self.client.get(self.url, {"prefix": "sa", "limit": limit}, HTTP_ACCEPT="application/json")
+            self.assertEqual(len(response.data["suggestions"]), expected, limit)
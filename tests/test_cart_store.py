@@ -0,0 +1,155 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from restaurante.cart_store import (
+    DIRTY_CARTS_KEY, WRITEBACK_SCHEDULED_KEY, cart_key, flush_cart, flush_dirty_carts, get_cart,
+)
+from restaurante.models import Cart, Category, MenuItem
+from tests import LocmemCacheMixin
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class CartStoreTest(LocmemCacheMixin, APITestCase):
+    url = "/restaurante/cart/menu-items"
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="customer", password="x")
+        self.client.force_authenticate(self.user)
+        category = Category.objects.create(slug="snacks", title="Snacks")
+        self.samosa = MenuItem.objects.create(title="Samosa", price=10, featured=False, category=category)
+        self.lassi = MenuItem.objects.create(title="Lassi", price=25, featured=False, category=category)
+
+    def test_add_list_update_remove(self):
+        response = self.client.post(self.url, {"menuitem": self.samosa.id, "quantity": 2})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["price"], "20.00")
+        self.client.post(self.url, {"menuitem": self.lassi.id, "quantity": 1})
+
+        response = self.client.get(self.url)
+        self.assertEqual([(r["menuitem"], r["quantity"]) for r in response.data["results"]],
+                         [(self.samosa.id, 2), (self.lassi.id, 1)])
+
+        response = self.client.patch(f"{self.url}/{self.samosa.id}", {"quantity": 5})
+        self.assertEqual(response.data["price"], "50.00")
+        self.assertEqual(self.client.delete(f"{self.url}/{self.lassi.id}").status_code, 204)
+        self.assertEqual(get_cart(self.user).total(), 50)
+
+    def test_unknown_menu_item_rejected(self):
+        response = self.client.post(self.url, {"menuitem": 999, "quantity": 1})
+        self.assertEqual(response.status_code, 400)
+
+    def test_busy_cart_updates_skip_the_db(self):
+        self.client.post(self.url, {"menuitem": self.samosa.id, "quantity": 1})  # loads cart + schedules write-back
+        with self.assertNumQueries(0):
+            for quantity in range(2, 12):
+                self.client.patch(f"{self.url}/{self.samosa.id}", {"quantity": quantity})
+            self.client.get(self.url)
+
+    def test_write_back_and_reload(self):
+        self.client.post(self.url, {"menuitem": self.samosa.id, "quantity": 3})
+        self.client.post(self.url, {"menuitem": self.lassi.id, "quantity": 1})
+        self.client.delete(f"{self.url}/{self.samosa.id}")
+        self.assertEqual(flush_dirty_carts(), 1)
+        self.assertEqual(list(Cart.objects.filter(user=self.user).values_list("menuitem_id", "quantity")),
+                         [(self.lassi.id, 1)])
+
+        cache.delete(cart_key(self.user.id))  # evicted from memory
+        self.assertEqual([line.menuitem_id for line in get_cart(self.user).lines()], [self.lassi.id])
+
+    def test_checkout_uses_unflushed_cart(self):
+        self.client.post(self.url, {"menuitem": self.samosa.id, "quantity": 1})
+        self.client.patch(f"{self.url}/{self.samosa.id}", {"quantity": 4})  # still only in the store
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/restaurante/orders", {"delivery_type": "pickup"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total"], "40.00")
+        self.assertEqual(get_cart(self.user).lines(), [])
+
+    def test_bulk_operations_in_one_request(self):
+        self.client.post(self.url, {"menuitem": self.samosa.id, "quantity": 1})
+        response = self.client.post(f"{self.url}/bulk", {"operations": [
+            {"op": "add", "menuitem": self.samosa.id, "quantity": 2},
+            {"menuitem": self.lassi.id, "quantity": 2},
+            {"op": "set", "menuitem": self.lassi.id, "quantity": 1},
+        ]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(i["menuitem"], i["quantity"]) for i in response.data["items"]],
+                         [(self.samosa.id, 3), (self.lassi.id, 1)])
+        self.assertEqual(response.data["total"], "55.00")
+
+        response = self.client.post(f"{self.url}/bulk", {"operations": [
+            {"op": "remove", "menuitem": self.samosa.id},
+        ]}, format="json")
+        self.assertEqual(response.data["total"], "25.00")
+
+    def test_bulk_rejects_unknown_items_without_changes(self):
+        response = self.client.post(f"{self.url}/bulk", {"operations": [
+            {"menuitem": self.samosa.id, "quantity": 1},
+            {"menuitem": 999, "quantity": 1},
+        ]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(get_cart(self.user).lines(), [])
+
+    def test_item_deleted_after_validation_is_a_400(self):
+        self.client.post(self.url, {"menuitem": self.samosa.id, "quantity": 1})
+        with mock.patch("restaurante.cart_store.menu_prices", return_value={}):  # gone after the serializer checked it
+            self.assertEqual(self.client.post(self.url, {"menuitem": self.lassi.id, "quantity": 1}).status_code, 400)
+            self.assertEqual(self.client.patch(f"{self.url}/{self.samosa.id}", {"quantity": 2}).status_code, 400)
+            response = self.client.post(f"{self.url}/bulk", {"operations": [
+                {"menuitem": self.lassi.id, "quantity": 1},
+            ]}, format="json")
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual([(line.menuitem_id, line.quantity) for line in get_cart(self.user).lines()],
+                         [(self.samosa.id, 1)])
+
+    def test_checkout_keeps_lines_added_meanwhile(self):
+        cart = get_cart(self.user)
+        cart.set(self.samosa.id, 2)
+        cart.set(self.lassi.id, 1)
+        cart.set(self.samosa.id, 3)  # changed after checkout read it
+        cart.discard([(self.samosa.id, 2, Decimal("10")), (self.lassi.id, 1, Decimal("25"))])
+        self.assertEqual([(line.menuitem_id, line.quantity) for line in cart.lines()], [(self.samosa.id, 3)])
+
+    def test_write_back_during_checkout_backs_off(self):
+        cache.set(WRITEBACK_SCHEDULED_KEY, 1)  # no inline write-back on set()
+        get_cart(self.user).set(self.samosa.id, 2)
+        flushed = []
+
+        def flush_mid_checkout(order):
+            # a background write-back gets the rows after checkout deleted them, before it commits
+            flushed.append(flush_cart(self.user.id))
+
+        with mock.patch("restaurante.checkout.queue_order_confirmation", side_effect=flush_mid_checkout):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post("/restaurante/orders", {"delivery_type": "pickup"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(flushed, [0])
+        self.assertFalse(Cart.objects.filter(user=self.user).exists())
+        self.assertIn(self.user.id, cache.get(DIRTY_CARTS_KEY))
+        self.assertEqual(get_cart(self.user).lines(), [])
+        self.assertEqual(flush_cart(self.user.id), 0)  # checkout finished: the re-queued write-back has nothing to restore
+        self.assertFalse(Cart.objects.filter(user=self.user).exists())
+
+    def test_failed_checkout_lets_write_backs_resume(self):
+        cache.set(WRITEBACK_SCHEDULED_KEY, 1)  # no inline write-back on set()
+        cart = get_cart(self.user)
+        cart.set(self.samosa.id, 2)
+        with mock.patch("restaurante.checkout.queue_order_confirmation", side_effect=RuntimeError("outbox down")):
+            with self.assertRaises(RuntimeError):
+                self.client.post("/restaurante/orders", {"delivery_type": "pickup"})
+        self.assertFalse(cart.checking_out())
+        self.assertEqual(flush_cart(self.user.id), 1)
+
+    def test_failed_write_back_is_requeued(self):
+        cache.set(WRITEBACK_SCHEDULED_KEY, 1)  # no inline write-back on set()
+        get_cart(self.user).set(self.samosa.id, 2)
+        with mock.patch("restaurante.cart_store.flush_cart", side_effect=RuntimeError("db down")):
+            self.assertEqual(flush_dirty_carts(), 0)
+        self.assertEqual(cache.get(DIRTY_CARTS_KEY), {self.user.id})
+        self.assertEqual(flush_dirty_carts(), 1)
@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from restaurante.models import Cart, Category, MenuItem, Order, OrderItem, today
+from restaurante.slot_capacity import slot_loads
+from tests import LocmemCacheMixin
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True,
+                   EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class CheckoutTest(LocmemCacheMixin, APITestCase):
+    url = "/restaurante/orders"
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="customer", password="x", email="c@example.com")
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(slug="snacks", title="Snacks")
+        slot_loads(today())  # the day's slot counters are seeded once a day, not per checkout
+
+    def fill_cart(self, n):
+        for i in range(n):
+            item = MenuItem.objects.create(title=f"Item {i}", price=10, featured=False, category=self.category)
+            Cart.objects.create(user=self.user, menuitem=item, quantity=2, unit_price=10, price=20)
+
+    def checkout(self):
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {"delivery_type": "pickup"})
+        return response, len(ctx)
+
+    def test_copies_cart_into_order_and_empties_it(self):
+        self.fill_cart(3)
+        response, _ = self.checkout()
+        self.assertEqual(response.status_code, 200)
+        order = Order.objects.get()
+        self.assertEqual(order.total, 60)
+        self.assertEqual(OrderItem.objects.filter(order=order).count(), 3)
+        self.assertFalse(Cart.objects.filter(user=self.user).exists())
+        self.assertEqual(len(response.data["orderitem"]), 3)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(f"#{order.id}", mail.outbox[0].subject)
+
+    def test_query_count_independent_of_cart_size(self):
+        self.fill_cart(2)
+        _, small = self.checkout()
+        self.fill_cart(20)
+        _, large = self.checkout()
+        self.assertEqual(small, large)
+
+    def test_failure_midway_leaves_cart_untouched(self):
+        self.fill_cart(3)
+        with mock.patch("restaurante.checkout.OrderItem.objects.bulk_create", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                self.checkout()
+        self.assertEqual(Cart.objects.filter(user=self.user).count(), 3)
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_empty_cart(self):
+        response, _ = self.checkout()
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from restaurante.cleanup import delete_expired_orders, expired_unconfirmed_orders
+from restaurante.models import Category, MenuItem, Order, OrderItem
+from restaurante.scheduler import run_due_jobs
+from tests import LocmemCacheMixin
+
+
+class CleanupTest(LocmemCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="customer", password="x")
+        self.now = timezone.make_aware(datetime(2026, 3, 10, 14, 0))
+        self.today = self.now.date()
+        category = Category.objects.create(slug="snacks", title="Snacks")
+        self.item = MenuItem.objects.create(title="Samosa", price=10, featured=False, category=category)
+
+    def order(self, date, slot="ASAP", confirmed=False):
+        order = Order.objects.create(user=self.user, date=date, delivery_time_slot=slot, is_confirmed=confirmed)
+        OrderItem.objects.create(order=order, menuitem=self.item, quantity=1, price=10)
+        return order
+
+    def test_expiry_rule(self):
+        yesterday = self.order(self.today - timedelta(days=1), "19:00")
+        earlier_today = self.order(self.today, "11:30")
+        self.order(self.today, "ASAP")
+        self.order(self.today, "14:30")
+        self.order(self.today + timedelta(days=1), "11:00")
+        self.order(self.today - timedelta(days=1), "11:00", confirmed=True)
+        self.assertEqual(set(expired_unconfirmed_orders(self.now)), {yesterday, earlier_today})
+
+    def test_deletes_in_batches_with_items(self):
+        for _ in range(5):
+            self.order(self.today - timedelta(days=2))
+        keep = self.order(self.today, "ASAP")
+        self.assertEqual(delete_expired_orders(batch_size=2, current_time=self.now), 5)
+        self.assertEqual(list(Order.objects.all()), [keep])
+        self.assertEqual(OrderItem.objects.count(), 1)
+
+    def test_command(self):
+        self.order(timezone.localdate() - timedelta(days=3))
+        call_command("cleanup_unconfirmed_orders", stdout=StringIO())
+        self.assertFalse(Order.objects.exists())
+
+    def test_scheduler_runs_each_job_once_per_interval(self):
+        self.order(timezone.localdate() - timedelta(days=3))
+        jobs = [("restaurante.cleanup.delete_expired_orders", 300)]
+        self.assertEqual(run_due_jobs(jobs), ["restaurante.cleanup.delete_expired_orders"])
+        self.assertEqual(run_due_jobs(jobs), [])
+        self.assertFalse(Order.objects.exists())
@@ -0,0 +1,83 @@
+from collections import Counter
+from datetime import date
+
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from restaurante.dispatch import dispatch_orders, plan_dispatch
+from restaurante.models import Order
+from tests import LocmemCacheMixin
+
+DAY = date(2026, 3, 10)
+
+
+class DispatchTest(LocmemCacheMixin, APITestCase):
+    url = "/restaurante/orders/dispatch"
+
+    def setUp(self):
+        super().setUp()
+        self.customer = User.objects.create_user(username="customer", password="x")
+        crew_group = Group.objects.create(name="Delivery Crew")
+        self.crew = [User.objects.create_user(username=f"rider{i}", password="x") for i in range(3)]
+        crew_group.user_set.add(*self.crew)
+        self.manager = User.objects.create_user(username="manager", password="x")
+        self.manager.groups.add(Group.objects.create(name="Manager"))
+
+    def orders(self, n, pin="273001", slot="19:00", **kwargs):
+        fields = {"user": self.customer, "date": DAY, "delivery_type": "delivery", "is_confirmed": True,
+                  "delivery_pin": pin, "delivery_time_slot": slot, **kwargs}
+        return Order.objects.bulk_create(Order(**fields) for _ in range(n))
+
+    def test_plan_keeps_a_pin_together_and_balances_riders(self):
+        orders = [Order(id=i, delivery_pin=f"27300{i % 2}", delivery_time_slot="19:00") for i in range(8)]
+        plan = plan_dispatch(orders, crew_ids=[1, 2], max_run=6)
+        self.assertEqual(len(plan), 2)
+        for _, run in plan:
+            self.assertEqual(len({o.delivery_pin for o in run}), 1)
+        self.assertEqual(sorted(crew for crew, _ in plan), [1, 2])
+
+    def test_plan_counts_existing_load(self):
+        orders = [Order(id=i, delivery_pin="273001", delivery_time_slot="19:00") for i in range(3)]
+        plan = plan_dispatch(orders, crew_ids=[1, 2], existing_load={(1, "19:00"): 5})
+        self.assertEqual([crew for crew, _ in plan], [2])
+
+    def test_dispatch_assigns_everything_in_one_bulk_update(self):
+        self.orders(7, pin="273001")
+        self.orders(4, pin="273002", slot="20:00")
+        self.orders(2, delivery_type="pickup")
+        self.orders(2, is_confirmed=False)
+
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+            summary = dispatch_orders(DAY)
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual((summary["orders"], summary["runs"]), (11, 3))
+
+        assigned = Order.objects.filter(delivery_crew__isnull=False)
+        self.assertEqual(assigned.count(), 11)
+        per_rider = Counter(assigned.values_list("delivery_crew_id", flat=True))
+        self.assertLessEqual(max(per_rider.values()), 6)
+        self.assertEqual(cache.get(f"order_status_{assigned.first().id}")["delivery_crew"],
+                         assigned.first().delivery_crew_id)
+
+        self.assertEqual(dispatch_orders(DAY)["orders"], 0)  # nothing left unassigned
+
+    def test_dry_run_saves_nothing(self):
+        self.orders(3)
+        summary = dispatch_orders(DAY, dry_run=True)
+        self.assertEqual(summary["orders"], 3)
+        self.assertFalse(Order.objects.filter(delivery_crew__isnull=False).exists())
+
+    def test_endpoint_is_for_managers(self):
+        self.orders(2)
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(self.client.post(self.url, {"date": "2026-03-10"}).status_code, 403)
+
+        self.client.force_authenticate(self.manager)
+        response = self.client.post(self.url, {"date": "2026-03-10"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["orders"], 2)
+        self.assertEqual(self.client.post(self.url, {"date": "10/03/2026"}).status_code, 400)
@@ -0,0 +1,40 @@
+from datetime import date
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from restaurante import email_rendering
+from restaurante.email_rendering import clear_email_cache, render_email
+
+BOOKING = {
+    "reservation_date": date(2025, 6, 14),
+    "reservation_time": "19:30",
+    "no_of_guests": 4,
+    "occasion": "Birthday",
+    "reference_number": "A1B2C3D4E5F6",
+    "manage_link": "https://example.com/manage-reservation/A1B2C3D4E5F6?a=1&b=2",
+}
+
+
+class EmailRenderingTest(SimpleTestCase):
+    def setUp(self):
+        clear_email_cache()
+
+    def test_html_includes_prerendered_fragments(self):
+        html, _ = render_email("booking_confirmation", BOOKING)
+        self.assertIn("/static/img/bannocopy.jpg", html)
+        self.assertIn(f"&copy; {timezone.now().year} Dhanno Banno Ki Rasoi", html)
+        self.assertIn("A1B2C3D4E5F6", html)
+
+    def test_text_part_comes_from_its_own_template(self):
+        _, text = render_email("booking_confirmation", BOOKING)
+        self.assertNotIn("<", text)
+        self.assertIn("Reference #: A1B2C3D4E5F6", text)
+        self.assertIn("?a=1&b=2", text)  # not HTML-escaped
+
+    def test_templates_compiled_once_per_process(self):
+        with mock.patch.object(email_rendering, "get_template", wraps=email_rendering.get_template) as get_template:
+            for _ in range(5):
+                render_email("booking_cancellation", BOOKING)
+        self.assertEqual(get_template.call_count, 2)  # html + text, first render only
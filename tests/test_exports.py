@@ -0,0 +1,35 @@
+import csv
+import gzip
+import io
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from restaurante.admin import CHAT_HISTORY_COLUMNS
+from restaurante.exports import stream_csv
+from restaurante.models import ChatHistory
+
+
+class StreamingCsvExportTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="dhanno", password="x")
+        for i in range(20):
+            ChatHistory.objects.create(user=user if i % 2 else None, session_id="s1", role="user", message=f"m{i}")
+
+    def read(self, response):
+        body = b"".join(chunk if isinstance(chunk, bytes) else chunk.encode() for chunk in response.streaming_content)
+        return list(csv.reader(io.StringIO(body.decode())))
+
+    def test_streams_rows_with_one_query(self):
+        with self.assertNumQueries(1):
+            rows = self.read(stream_csv(ChatHistory.objects.all(), CHAT_HISTORY_COLUMNS, "chat_history"))
+        self.assertEqual(rows[0], ["User", "Session ID", "Role", "Message", "Timestamp"])
+        self.assertEqual(len(rows), 21)
+        self.assertEqual(rows[1][0], "Anonymous")
+        self.assertEqual(rows[2][0], "dhanno")
+
+    def test_gzip_export_decompresses_to_same_csv(self):
+        response = stream_csv(ChatHistory.objects.all(), CHAT_HISTORY_COLUMNS, "chat_history", gzip=True)
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        body = gzip.decompress(b"".join(response.streaming_content)).decode()
+        self.assertEqual(len(list(csv.reader(io.StringIO(body)))), 21)
@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from restaurante.chatviews import llm_budget
+from restaurante.chatviews.llm_budget import LLMBudget, MeteredOpenAI, llm_budgeted
+from tests import LocmemCacheMixin
+
+BUDGETS = {"guest": {"session": 100, "ip": 1000}, "user": {"user": 500, "ip": 1000}}
+
+
+class FakeCompletions:
+    """Stands in for the OpenAI endpoint: returns a completion with fixed usage."""
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def create(self, **kwargs):
+        return SimpleNamespace(usage=SimpleNamespace(total_tokens=self.tokens))
+
+
+client = MeteredOpenAI(SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(60))))
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+@llm_budgeted(lambda request: request.headers.get("X-Guest-Id", "anon"))
+def chat(request):
+    client.chat.completions.create(model="gpt-4o", messages=[])
+    return Response({"reply": "ok"})
+
+
+class LLMBudgetTest(LocmemCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.factory = APIRequestFactory()
+        self._budgets = llm_budget.LLM_TOKEN_BUDGETS
+        llm_budget.LLM_TOKEN_BUDGETS = BUDGETS
+
+    def tearDown(self):
+        llm_budget.LLM_TOKEN_BUDGETS = self._budgets
+
+    def post(self, guest="g1", ip="10.0.0.1", user=None, **extra):
+        request = self.factory.post("/chat", {"message": "hi"}, format="json",
+                                    HTTP_X_GUEST_ID=guest, REMOTE_ADDR=ip, **extra)
+        if user:
+            force_authenticate(request, user)
+        return chat(request)
+
+    def test_guest_session_budget_counts_tokens_not_requests(self):
+        first = self.post()
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first["X-LLM-Budget-Remaining"], "40")
+        self.assertEqual(first["X-LLM-Budget-Scope"], "session")
+        self.assertEqual(self.post().status_code, 200)  # allowed: 40 left before the call
+        blocked = self.post()
+        self.assertEqual(blocked.status_code, 429)
+        self.assertEqual(blocked["X-LLM-Budget-Remaining"], "0")
+        self.assertIn("Retry-After", blocked)
+
+    def test_scopes_are_independent_per_session_but_share_ip(self):
+        self.post(guest="a")
+        self.post(guest="a")
+        self.assertEqual(self.post(guest="b").status_code, 200)
+        response = self.post(guest="c", ip="10.0.0.2")
+        self.assertEqual(response["X-LLM-Budget-Remaining"], "40")
+
+    def test_logged_in_users_get_the_user_tier(self):
+        user = User.objects.create_user(username="chatore", password="x")
+        response = self.post(user=user)
+        self.assertEqual(response["X-LLM-Budget-Limit"], "500")
+        self.assertEqual(response["X-LLM-Budget-Remaining"], "440")
+
+    def test_previous_window_is_weighted(self):
+        budget = LLMBudget([("session", "w", 100)], window=60)
+        index, weight, _ = budget._windows()
+        cache.set(f"llm_budget_session_w_{index - 1}", 50)
+        self.assertEqual(budget.check()["session"], 100 - int(50 * weight))
+
+    def test_spoofed_forwarded_for_and_guest_ids_share_the_ip_cap(self):
+        llm_budget.LLM_TOKEN_BUDGETS = {"guest": {"session": 100, "ip": 150}, "user": BUDGETS["user"]}
+        statuses = [
+            self.post(guest=f"fresh-{i}", HTTP_X_FORWARDED_FOR=f"203.0.113.{i}").status_code
+            for i in range(4)
+        ]
+        self.assertEqual(statuses, [200, 200, 200, 429])
+
+    def test_trusted_proxy_hop_is_used(self):
+        request = self.factory.post("/chat", REMOTE_ADDR="10.0.0.9",
+                                    HTTP_X_FORWARDED_FOR="6.6.6.6, 198.51.100.7")
+        self.assertEqual(llm_budget.client_ip(request), "10.0.0.9")
+        with mock.patch.object(llm_budget, "TRUSTED_PROXY_COUNT", 1):
+            self.assertEqual(llm_budget.client_ip(request), "198.51.100.7")  # not the spoofable left-most
+        with mock.patch.object(llm_budget, "TRUSTED_PROXY_COUNT", 3):
+            self.assertEqual(llm_budget.client_ip(request), "10.0.0.9")
+
+    def test_forwarded_for_without_trusted_proxies_warns_once(self):
+        request = self.factory.post("/chat", REMOTE_ADDR="10.0.0.9", HTTP_X_FORWARDED_FOR="198.51.100.7")
+        with mock.patch.object(llm_budget, "_proxy_warning_logged", False), mock.patch("builtins.print") as log:
+            llm_budget.client_ip(request)
+            llm_budget.client_ip(request)
+        self.assertEqual(log.call_count, 1)
+        self.assertIn("TRUSTED_PROXY_COUNT", log.call_args.args[0])
@@ -0,0 +1,45 @@
+from rest_framework.test import APITestCase
+
+from restaurante.models import Category, MenuItem
+from tests import LocmemCacheMixin
+
+
+class MenuConditionalCacheTest(LocmemCacheMixin, APITestCase):
+    url = "/restaurante/menu-items/"
+
+    def setUp(self):
+        super().setUp()
+        self.snacks = Category.objects.create(slug="snacks", title="Snacks")
+        MenuItem.objects.create(title="Samosa", price=20, featured=True, category=self.snacks)
+
+    def get(self, url=None, **headers):
+        return self.client.get(url or self.url, HTTP_ACCEPT="application/json", **headers)
+
+    def test_list_sets_etag_and_cache_control(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertIn("max-age", response["Cache-Control"])
+
+    def test_if_none_match_returns_304_without_queries(self):
+        etag = self.get()["ETag"]
+        with self.assertNumQueries(0):
+            response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_repeat_get_is_served_from_cache(self):
+        first = self.get()
+        with self.assertNumQueries(0):
+            second = self.get()
+        self.assertEqual(first.content, second.content)
+
+    def test_menu_write_changes_etag(self):
+        etag = self.get()["ETag"]
+        MenuItem.objects.create(title="Jalebi", price=30, featured=False, category=self.snacks)
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertContains(response, "Jalebi")
+
+    def test_query_params_are_part_of_the_key(self):
+        self.assertNotEqual(self.get()["ETag"], self.get(self.url + "?featured=true")["ETag"])
@@ -0,0 +1,42 @@
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from restaurante.chatviews.menu_retrieval import MenuIndex, retrieval_query
+from restaurante.chatviews.prompt_context import build_menu_context
+
+
+def item(id, title, category, description="", featured=False):
+    return {"id": id, "title": title, "price": Decimal("50.00"), "description": description,
+            "category": category, "featured": featured}
+
+
+class MenuIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.index = MenuIndex([
+            item(1, "Samosa", "Snacks", "Crispy pastry stuffed with spiced aloo"),
+            item(2, "Masala Dosa", "South Indian", "Rice crepe with potato masala"),
+            item(3, "Gulab Jamun", "Sweets", "Milk dumplings in sugar syrup", featured=True),
+            item(4, "Aloo Tikki", "Snacks", "Potato patties with chutney"),
+        ])
+
+    def test_title_match_ranks_first(self):
+        results = self.index.search("ek samosa dena", k=2)
+        self.assertEqual(results[0]["title"], "Samosa")
+
+    def test_category_and_description_terms_match(self):
+        titles = [i["title"] for i in self.index.search("snacks with aloo", k=3)]
+        self.assertEqual(set(titles[:2]), {"Samosa", "Aloo Tikki"})
+
+    def test_unknown_terms_return_nothing(self):
+        self.assertEqual(self.index.search("pizza"), [])
+
+    def test_query_includes_recent_user_turns(self):
+        history = [{"role": "user", "content": "2 masala dosa"}, {"role": "assistant", "content": "ok"}]
+        self.assertIn("masala dosa", retrieval_query("make it 3", history))
+
+    def test_context_has_featured_and_relevant_only(self):
+        ctx = build_menu_context("samosa please", index=self.index)
+        self.assertIn("Samosa", ctx)
+        self.assertIn("Gulab Jamun", ctx)  # featured is always included
+        self.assertNotIn("Masala Dosa", ctx)
@@ -0,0 +1,34 @@
+from rest_framework.test import APITestCase
+
+from restaurante.models import Category, MenuItem
+from tests import LocmemCacheMixin
+
+
+class MenuSearchTest(LocmemCacheMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        snacks = Category.objects.create(slug="snacks", title="Snacks")
+        sweets = Category.objects.create(slug="sweets", title="Sweets")
+        MenuItem.objects.create(title="Samosa", price=20, featured=False, category=snacks,
+                                description="Crispy pastry with spiced potato")
+        MenuItem.objects.create(title="Aloo Tikki", price=30, featured=False, category=snacks,
+                                description="Potato patties, served with samosa chutney")
+        MenuItem.objects.create(title="Gulab Jamun", price=40, featured=True, category=sweets,
+                                description="Milk dumplings in syrup")
+
+    def search(self, q):
+        response = self.client.get("/restaurante/menu-items/", {"q": q}, HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, 200)
+        return [item["title"] for item in response.data["results"]]
+
+    def test_ranked_results_title_match_first(self):
+        self.assertEqual(self.search("samosa"), ["Samosa", "Aloo Tikki"])
+
+    def test_typo_tolerance(self):
+        self.assertEqual(self.search("gulab jamon")[0], "Gulab Jamun")
+
+    def test_category_terms_match(self):
+        self.assertEqual(self.search("sweets"), ["Gulab Jamun"])
+
+    def test_no_match_is_empty(self):
+        self.assertEqual(self.search("pizza"), [])
@@ -0,0 +1,115 @@
+import asyncio
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import Client, TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from restaurante.authentication import add_role_claims
+from restaurante.models import Order
+from restaurante.order_events import _Subscriber
+from tests import LocmemCacheMixin
+
+
+def token_for(user):
+    return str(add_role_claims(AccessToken.for_user(user), user))
+
+
+def ticket_for(user):
+    response = Client().post("/restaurante/orders/events/ticket", HTTP_AUTHORIZATION=f"Bearer {token_for(user)}")
+    return response.json()["ticket"]
+
+
+async def next_event(response):
+    """The next `data:` payload on the stream, skipping retry hints and keepalives."""
+    async for chunk in response.streaming_content:
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if chunk.startswith("event:"):
+            return chunk
+
+
+@mock.patch("restaurante.order_events.SSE_POLL_INTERVAL", 0.01)
+class OrderEventsTest(LocmemCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.customer = User.objects.create_user(username="customer", password="x")
+        self.crew = User.objects.create_user(username="crew", password="x")
+        self.order = Order.objects.create(user=self.customer, total=20)
+        self.url = f"/restaurante/orders/{self.order.id}/events"
+
+    async def test_requires_ticket_and_ownership(self):
+        self.assertEqual((await self.async_client.get(self.url)).status_code, 401)
+        other = await sync_to_async(ticket_for)(self.crew)
+        self.assertEqual((await self.async_client.get(self.url, {"ticket": other})).status_code, 403)
+
+    async def test_ticket_is_single_use(self):
+        ticket = await sync_to_async(ticket_for)(self.customer)
+        self.assertEqual((await self.async_client.get(self.url, {"ticket": ticket})).status_code, 200)
+        self.assertEqual((await self.async_client.get(self.url, {"ticket": ticket})).status_code, 401)
+
+    async def test_token_not_accepted_in_query(self):
+        token = await sync_to_async(token_for)(self.customer)
+        self.assertEqual((await self.async_client.get(self.url, {"token": token})).status_code, 401)
+        response = await self.async_client.get(self.url, headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(response.status_code, 200)
+
+    async def test_streams_current_state_then_changes(self):
+        ticket = await sync_to_async(ticket_for)(self.customer)
+        response = await self.async_client.get(self.url, {"ticket": ticket})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertIn('"payment_status": "pending"', await next_event(response))
+
+        def assign_crew():
+            with self.captureOnCommitCallbacks(execute=True):
+                self.order.delivery_crew = self.crew
+                self.order.save()
+        await sync_to_async(assign_crew)()
+        self.assertIn(f'"delivery_crew": {self.crew.id}', await next_event(response))
+
+    def test_refused_over_wsgi(self):
+        ticket = ticket_for(self.customer)
+        with mock.patch("restaurante.order_events.SSE_ALLOW_WSGI", False):
+            self.assertEqual(self.client.get(self.url, {"ticket": ticket}).status_code, 503)
+
+
+class FakePubSub:
+    def __init__(self):
+        self.channels = set()
+        self.inbox = asyncio.Queue()
+
+    async def subscribe(self, *channels):
+        self.channels.update(channels)
+
+    async def unsubscribe(self, *channels):
+        self.channels.difference_update(channels)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=None):
+        try:
+            return await asyncio.wait_for(self.inbox.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class SubscriberTest(TestCase):
+    async def test_streams_share_one_subscription(self):
+        pubsub = FakePubSub()
+        with mock.patch("redis.asyncio.from_url") as from_url:
+            from_url.return_value.pubsub.return_value = pubsub
+            subscriber = _Subscriber()
+        first, second = asyncio.Queue(), asyncio.Queue()
+        await subscriber.subscribe(["order_events_1"], first)
+        await subscriber.subscribe(["order_events_1", "order_events_user_7"], second)
+        self.assertEqual(from_url.call_count, 1)
+        self.assertEqual(pubsub.channels, {"order_events_1", "order_events_user_7"})
+
+        await pubsub.inbox.put({"channel": b"order_events_1", "data": json.dumps({"id": 1})})
+        self.assertEqual(await asyncio.wait_for(first.get(), 1), {"id": 1})
+        self.assertEqual(await asyncio.wait_for(second.get(), 1), {"id": 1})
+
+        await subscriber.unsubscribe(["order_events_1", "order_events_user_7"], second)
+        self.assertEqual(pubsub.channels, {"order_events_1"})  # still wanted by the first stream
+        await subscriber.unsubscribe(["order_events_1"], first)
+        self.assertEqual(pubsub.channels, set())
+        subscriber.reader.cancel()
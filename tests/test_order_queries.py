@@ -0,0 +1,68 @@
+from django.contrib.auth.models import Group, User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from restaurante.models import Category, MenuItem, Order, OrderItem
+from tests import LocmemCacheMixin
+
+
+# user lookup + role resolution (first request only) + orders + prefetched items (with menuitem)
+ORDER_LIST_QUERY_BUDGET = 4
+
+
+class OrderListQueryBudgetTest(LocmemCacheMixin, APITestCase):
+    url = "/restaurante/orders"
+
+    def setUp(self):
+        super().setUp()
+        self.customer = User.objects.create_user(username="customer", password="x")
+        self.manager = User.objects.create_user(username="manager", password="x")
+        self.manager.groups.add(Group.objects.create(name="Manager"))
+        category = Category.objects.create(slug="snacks", title="Snacks")
+        self.items = [
+            MenuItem.objects.create(title=f"Item {i}", price=10 + i, featured=False, category=category)
+            for i in range(4)
+        ]
+
+    def make_orders(self, n):
+        for _ in range(n):
+            order = Order.objects.create(user=self.customer, is_confirmed=True, total=0)
+            for item in self.items[:3]:
+                OrderItem.objects.create(order=order, menuitem=item, quantity=2, price=item.price * 2)
+
+    def get(self, user, url=None):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url or self.url)
+        self.assertEqual(response.status_code, 200)
+        sql = "\n".join(q["sql"] for q in ctx.captured_queries)
+        self.assertLessEqual(len(ctx), ORDER_LIST_QUERY_BUDGET, sql)
+        return len(ctx), response
+
+    def test_query_count_does_not_grow_with_orders(self):
+        self.make_orders(2)
+        self.get(self.manager)  # roles resolved once, then cached
+        few, _ = self.get(self.manager)
+        self.make_orders(25)
+        many, response = self.get(self.manager)
+        self.assertEqual(few, many)
+        self.assertEqual(len(response.data["results"]), 27)
+
+    def test_customer_list_within_budget(self):
+        self.make_orders(10)
+        self.get(self.customer)
+
+    def test_list_rows_are_compact(self):
+        self.make_orders(1)
+        _, response = self.get(self.customer)
+        row = response.data["results"][0]
+        self.assertNotIn("orderitem", row)
+        self.assertEqual(row["item_count"], 6)
+        self.assertEqual(row["items"][0], {"title": "Item 0", "quantity": 2, "price": "20.00"})
+
+    def test_detail_keeps_nested_items(self):
+        self.make_orders(1)
+        order = Order.objects.get()
+        _, response = self.get(self.customer, f"{self.url}/{order.id}")
+        self.assertEqual([i["menuitem"]["title"] for i in response.data["orderitem"]], ["Item 0", "Item 1", "Item 2"])
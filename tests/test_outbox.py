@@ -0,0 +1,84 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from restaurante.models import Cart, Category, EmailOutbox, MenuItem
+from restaurante.outbox import OUTBOX_MAX_ATTEMPTS, drain_outbox, queue_email
+from tests import LocmemCacheMixin
+
+LOCMEM_MAIL = "django.core.mail.backends.locmem.EmailBackend"
+
+
+@override_settings(EMAIL_BACKEND=LOCMEM_MAIL, BACKGROUND_TASKS_EAGER=True)
+class EmailOutboxTest(TestCase):
+    def test_rolled_back_transaction_drops_the_email(self):
+        from django.db import transaction
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                queue_email("Hi", ["a@example.com"], html="<p>x</p>")
+                raise RuntimeError("domain write failed")
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    def test_commit_kicks_a_drain(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_email("Hi", ["a@example.com"], html="<p>Hello <b>there</b></p>")
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].body, "Hello there")
+        self.assertEqual(EmailOutbox.objects.get().status, "sent")
+
+    def test_batch_reuses_one_connection(self):
+        for i in range(5):
+            queue_email(f"m{i}", ["a@example.com"])
+        with mock.patch("restaurante.outbox.get_connection", wraps=mail.get_connection) as get_connection:
+            self.assertEqual(drain_outbox(batch_size=10), (5, 0))
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_failure_backs_off_then_gives_up(self):
+        email = queue_email("Hi", ["a@example.com"])
+        with mock.patch("restaurante.outbox.EmailMultiAlternatives.send", side_effect=OSError("smtp down")):
+            self.assertEqual(drain_outbox(), (0, 1))
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), ("pending", 1))
+            self.assertGreater(email.next_attempt_at, timezone.now())
+            self.assertEqual(drain_outbox(), (0, 0))  # not due yet
+
+            for _ in range(OUTBOX_MAX_ATTEMPTS - 1):
+                EmailOutbox.objects.filter(id=email.id).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+                drain_outbox()
+        email.refresh_from_db()
+        self.assertEqual(email.status, "failed")
+        self.assertIn("smtp down", email.last_error)
+
+
+@override_settings(EMAIL_BACKEND=LOCMEM_MAIL, BACKGROUND_TASKS_EAGER=True)
+class CheckoutOutboxTest(LocmemCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="customer", password="x", email="c@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        item = MenuItem.objects.create(title="Samosa", price=10, featured=False,
+                                       category=Category.objects.create(slug="snacks", title="Snacks"))
+        Cart.objects.create(user=self.user, menuitem=item, quantity=2, unit_price=10, price=20)
+
+    def checkout(self):
+        return self.client.post("/restaurante/orders", {"delivery_type": "pickup"})
+
+    def test_checkout_queues_confirmation_in_the_outbox(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            order_id = self.checkout().data["id"]
+        email = EmailOutbox.objects.get()
+        self.assertEqual((email.status, email.to), ("sent", ["c@example.com"]))
+        self.assertIn(f"#{order_id}", email.subject)
+
+    def test_failed_checkout_queues_nothing(self):
+        with mock.patch("restaurante.checkout.OrderItem.objects.bulk_create", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                self.checkout()
+        self.assertFalse(EmailOutbox.objects.exists())
@@ -0,0 +1,69 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from restaurante.models import CustomerReview, Order
+from tests import LocmemCacheMixin
+
+
+class KeysetPaginationTest(LocmemCacheMixin, APITestCase):
+    url = "/restaurante/orders"
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_superuser(username="boss", password="x", email="b@example.com")
+        self.client.force_authenticate(self.admin)
+        start = date(2025, 1, 1)
+        # three orders per day so ties on date are broken by id
+        for i in range(9):
+            Order.objects.create(user=self.admin, date=start + timedelta(days=i // 3), is_confirmed=True)
+        self.expected = list(Order.objects.order_by("-date", "id").values_list("id", flat=True))
+
+    def walk(self, url):
+        ids, pages = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [row["id"] for row in response.data["results"]]
+            pages.append(response.data)
+            url = response.data["next"]
+        return ids, pages
+
+    def test_walks_every_row_once_in_keyset_order(self):
+        ids, pages = self.walk(self.url + "?page_size=2")
+        self.assertEqual(ids, self.expected)
+        self.assertEqual(len(pages), 5)
+        self.assertIsNone(pages[0]["previous"])
+        self.assertNotIn("count", pages[0])
+
+    def test_previous_link_returns_the_page_before(self):
+        first = self.client.get(self.url + "?page_size=4").data
+        second = self.client.get(first["next"]).data
+        back = self.client.get(second["previous"]).data
+        self.assertEqual([r["id"] for r in back["results"]], [r["id"] for r in first["results"]])
+        self.assertIsNone(back["previous"])
+
+    def test_deep_page_has_no_count_or_offset(self):
+        _, pages = self.walk(self.url + "?page_size=2")
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(pages[-2]["next"])
+        sql = " ".join(q["sql"] for q in ctx.captured_queries).upper()
+        self.assertNotIn("COUNT(", sql)
+        self.assertNotIn("OFFSET", sql)
+
+    def test_count_is_opt_in(self):
+        response = self.client.get(self.url + "?count=approx")
+        self.assertEqual(response.data["count"], 9)
+        self.assertNotIn("count=", response.data["next"] or "")
+
+    def test_invalid_cursor_is_404(self):
+        self.assertEqual(self.client.get(self.url + "?cursor=garbage").status_code, 404)
+
+    def test_reviews_use_created_at_keyset(self):
+        for i in range(3):
+            CustomerReview.objects.create(user=self.admin, feedback=f"r{i}")
+        ids, _ = self.walk("/restaurante/customer-reviews/?page_size=2")
+        self.assertEqual(ids, list(CustomerReview.objects.order_by("-created_at", "id").values_list("id", flat=True)))
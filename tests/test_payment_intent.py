@@ -0,0 +1,77 @@
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from restaurante.cart_store import get_cart
+from restaurante.models import Category, MenuItem, Order
+from tests import LocmemCacheMixin
+
+
+def fake_intent(intent_id, amount):
+    return SimpleNamespace(id=intent_id, client_secret=f"{intent_id}_secret", amount=amount)
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class PaymentIntentTest(LocmemCacheMixin, APITestCase):
+    url = "/restaurante/api/create-payment-intent/"
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="customer", password="x")
+        self.client.force_authenticate(self.user)
+        category = Category.objects.create(slug="snacks", title="Snacks")
+        self.samosa = MenuItem.objects.create(title="Samosa", price=10, featured=False, category=category)
+        get_cart(self.user).set(self.samosa.id, 2)
+
+        patcher = mock.patch("restaurante.stripe_payment.stripe.PaymentIntent")
+        self.stripe = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.stripe.create.side_effect = lambda **kw: fake_intent("pi_1", kw["amount"])
+        self.stripe.modify.side_effect = lambda pk, **kw: fake_intent(pk, kw["amount"])
+
+    def test_unchanged_cart_reuses_intent(self):
+        first = self.client.post(self.url)
+        second = self.client.post(self.url)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(self.stripe.create.call_count, 1)
+        self.assertIn("idempotency_key", self.stripe.create.call_args.kwargs)
+
+    def test_changed_cart_updates_existing_intent(self):
+        self.client.post(self.url)
+        get_cart(self.user).set(self.samosa.id, 5)
+        response = self.client.post(self.url)
+        self.assertEqual(response.data["client_secret"], "pi_1_secret")
+        self.stripe.modify.assert_called_once()
+        self.assertEqual(self.stripe.modify.call_args.kwargs["amount"], int(Decimal(50) * Decimal("1.2")))
+        self.assertEqual(self.stripe.create.call_count, 1)
+
+    def test_order_links_intent_and_releases_it(self):
+        self.client.post(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/restaurante/orders", {"delivery_type": "pickup", "payment_method": "stripe"})
+        self.assertEqual(Order.objects.get().stripe_payment_intent_id, "pi_1")
+
+        # same cart again later: a new intent with a different idempotency key
+        first_key = self.stripe.create.call_args.kwargs["idempotency_key"]
+        get_cart(self.user).set(self.samosa.id, 2)
+        self.client.post(self.url)
+        self.assertEqual(self.stripe.create.call_count, 2)
+        self.assertNotEqual(self.stripe.create.call_args.kwargs["idempotency_key"], first_key)
+
+    def test_order_rejected_when_cart_changed_after_intent(self):
+        self.client.post(self.url)  # intent for 2 samosas
+        get_cart(self.user).set(self.samosa.id, 3)
+        response = self.client.post("/restaurante/orders", {"delivery_type": "pickup", "payment_method": "stripe"})
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(get_cart(self.user).get(self.samosa.id).quantity, 3)
+
+        self.client.post(self.url)  # refreshed for the current cart
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/restaurante/orders", {"delivery_type": "pickup", "payment_method": "stripe"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Order.objects.get().stripe_payment_intent_id, "pi_1")
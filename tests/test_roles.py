@@ -0,0 +1,44 @@
+from django.contrib.auth.models import Group, User
+from django.test import TestCase
+
+from restaurante.roles import get_roles, is_customer, is_delivery_crew, is_manager, normalize_group_name
+from tests import LocmemCacheMixin
+
+
+class RoleResolverTest(LocmemCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="sumit", password="x")
+
+    def fresh(self):
+        # new object per "request", as DRF authentication would give us
+        return User.objects.get(pk=self.user.pk)
+
+    def test_group_spellings_normalize(self):
+        for name in ["Manager", "Managers", "manager"]:
+            self.assertEqual(normalize_group_name(name), "manager")
+        for name in ["Delivery Crew", "Delivery crew"]:
+            self.assertEqual(normalize_group_name(name), "delivery_crew")
+
+    def test_roles_cached_across_requests(self):
+        self.user.groups.add(Group.objects.create(name="Delivery crew"))
+        self.assertTrue(is_delivery_crew(self.fresh()))
+        user = self.fresh()
+        with self.assertNumQueries(0):
+            self.assertTrue(is_delivery_crew(user))
+            self.assertFalse(is_manager(user))
+            self.assertFalse(is_customer(user))
+
+    def test_group_changes_invalidate(self):
+        self.assertTrue(is_customer(self.fresh()))
+        managers = Group.objects.create(name="Managers")
+        managers.user_set.add(self.user)
+        self.assertTrue(is_manager(self.fresh()))
+        self.user.groups.remove(managers)
+        self.assertEqual(get_roles(self.fresh()), frozenset())
+        self.user.groups.add(managers)
+        managers.name = "Delivery Crew"
+        managers.save()
+        self.assertEqual(get_roles(self.fresh()), {"delivery_crew"})
+        managers.delete()
+        self.assertTrue(is_customer(self.fresh()))
@@ -0,0 +1,114 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from restaurante.models import Booking, Category, DailySales, DailySlotBookings, MenuItem, Order, OrderItem
+from restaurante.rollups import rebuild_sales
+from tests import LocmemCacheMixin
+
+DAY = date(2026, 3, 10)
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class RollupTest(LocmemCacheMixin, APITestCase):
+    url = "/restaurante/reports/sales"
+
+    def setUp(self):
+        super().setUp()
+        self.customer = User.objects.create_user(username="customer", password="x")
+        self.manager = User.objects.create_user(username="manager", password="x")
+        self.manager.groups.add(Group.objects.create(name="Manager"))
+        category = Category.objects.create(slug="snacks", title="Snacks")
+        self.samosa = MenuItem.objects.create(title="Samosa", price=10, featured=False, category=category)
+        self.lassi = MenuItem.objects.create(title="Lassi", price=25, featured=False, category=category)
+
+    def order(self, delivery_type="pickup", confirmed=True, items=()):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.objects.create(user=self.customer, date=DAY, delivery_type=delivery_type,
+                                         total=sum(qty * item.price for item, qty in items))
+            for item, qty in items:
+                OrderItem.objects.create(order=order, menuitem=item, quantity=qty, price=qty * item.price)
+            if confirmed:
+                order.is_confirmed = True
+                order.save()
+        return order
+
+    def book(self, slot, guests, day=DAY):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Booking.objects.create(reservation_date=day, reservation_time=slot, no_of_guests=guests)
+
+    def test_confirmation_updates_sales_rollup(self):
+        self.order("pickup", items=[(self.samosa, 2)])
+        self.order("delivery", items=[(self.samosa, 1), (self.lassi, 2)])
+        self.order("delivery", confirmed=False, items=[(self.lassi, 9)])
+        day = DailySales.objects.get(date=DAY)
+        self.assertEqual((day.orders, day.revenue), (2, 80))
+        self.assertEqual((day.pickup_orders, day.delivery_orders, day.delivery_revenue), (1, 1, 60))
+
+    def test_moved_or_unconfirmed_order_leaves_its_day(self):
+        order = self.order("pickup", items=[(self.samosa, 2)])
+        with self.captureOnCommitCallbacks(execute=True):
+            order.date = DAY + timedelta(days=1)
+            order.save()
+        self.assertEqual(list(DailySales.objects.values_list("date", "orders")), [(DAY + timedelta(days=1), 1)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.is_confirmed = False
+            order.save()
+        self.assertFalse(DailySales.objects.exists())
+
+    def test_rebuild_updates_rows_in_place(self):
+        self.order("pickup", items=[(self.samosa, 2)])
+        row = DailySales.objects.get(date=DAY)
+        self.order("delivery", items=[(self.lassi, 1)])
+        rebuild_sales(dates=[DAY])  # a second rebuild of the same day, e.g. a concurrent one
+        self.assertEqual(DailySales.objects.get().pk, row.pk)
+        self.assertEqual(DailySales.objects.get().orders, 2)
+
+    def test_booking_changes_update_slot_rollup(self):
+        booking = self.book("19:00", 4)
+        self.book("19:00", 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.reservation_time = "20:00"
+            booking.save()
+        slots = dict(DailySlotBookings.objects.filter(date=DAY).values_list("time_slot", "covers"))
+        self.assertEqual(slots, {"19:00": 2, "20:00": 4})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.delete()
+        self.assertEqual(dict(DailySlotBookings.objects.values_list("time_slot", "covers")), {"19:00": 2})
+
+    def test_report_endpoint(self):
+        self.order("pickup", items=[(self.samosa, 2)])
+        self.order("delivery", items=[(self.lassi, 3)])
+        self.book("19:00", 4)
+
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        self.client.force_authenticate(self.manager)
+        self.client.get(self.url)  # warm the manager's cached roles
+        with self.assertNumQueries(3):  # days, top items, slots — no scans of orders/bookings
+            response = self.client.get(self.url, {"start": "2026-03-01", "end": "2026-03-31"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["totals"]["revenue"], "95.00")
+        self.assertEqual(response.data["totals"]["covers"], 4)
+        self.assertEqual([row["title"] for row in response.data["top_items"]], ["Lassi", "Samosa"])
+        self.assertEqual(self.client.get(self.url, {"start": "yesterday"}).status_code, 400)
+
+        response = self.client.get(self.url, {"start": "2026-03-01", "end": "2026-03-31", "top": -1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["title"] for row in response.data["top_items"]], ["Lassi"])  # clamped to 1
+
+    def test_backfill_rebuilds_from_source(self):
+        self.order("pickup", items=[(self.samosa, 2)])
+        self.book("11:00", 3)
+        DailySales.objects.all().delete()
+        DailySlotBookings.objects.all().delete()
+        call_command("backfill_rollups", stdout=StringIO())
+        self.assertEqual(DailySales.objects.get(date=DAY).revenue, 20)
+        self.assertEqual(DailySlotBookings.objects.get(date=DAY).covers, 3)
@@ -0,0 +1,117 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from restaurante import slot_capacity
+from restaurante.chatviews.agent_tools.order_functions import available_delivery_slots
+from restaurante.models import Category, MenuItem, Order, OrderItem, today
+from restaurante.slot_capacity import seed_slot_loads, slot_loads
+from tests import LocmemCacheMixin
+
+DAY = today() + timedelta(days=2)
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+@patch.object(slot_capacity, "SLOT_MAX_ORDERS", 2)
+class SlotCapacityTest(LocmemCacheMixin, APITestCase):
+    url = "/restaurante/orders/available-time-slots/"
+
+    def setUp(self):
+        super().setUp()
+        self.customer = User.objects.create_user(username="customer", password="x")
+        category = Category.objects.create(slug="snacks", title="Snacks")
+        self.samosa = MenuItem.objects.create(title="Samosa", price=10, featured=False, category=category)
+
+    def order(self, slot="19:30", quantity=1, confirmed=True):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.objects.create(user=self.customer, date=DAY, delivery_time_slot=slot)
+            OrderItem.objects.create(order=order, menuitem=self.samosa, quantity=quantity, price=quantity * 10)
+            if confirmed:
+                order.is_confirmed = True
+                order.save()
+        return order
+
+    def slots(self):
+        response = self.client.get(self.url, {"date": DAY.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        return response.data["time_slots"]
+
+    def test_full_slot_is_hidden_until_an_order_is_cancelled(self):
+        self.order()
+        self.order(confirmed=False)
+        self.assertIn("19:30", self.slots())
+        order = self.order()
+        self.assertNotIn("19:30", self.slots())
+        self.assertIn("20:00", self.slots())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.delete()
+        self.assertIn("19:30", self.slots())
+
+    def test_rescheduling_moves_the_load(self):
+        order = self.order(quantity=3)
+        with self.captureOnCommitCallbacks(execute=True):
+            order.delivery_time_slot = "20:00"
+            order.save()
+            order.save()  # counting again changes nothing
+        loads = slot_loads(DAY)
+        self.assertEqual(loads["19:30"], {"orders": 0, "items": 0})
+        self.assertEqual(loads["20:00"], {"orders": 1, "items": 3})
+
+    def test_availability_is_answered_from_the_counters(self):
+        self.order()
+        self.order()
+        cache.clear()  # counters lost: the first read re-seeds from the DB
+        self.assertNotIn("19:30", self.slots())
+        with self.assertNumQueries(0):
+            self.assertNotIn("19:30", self.slots())
+
+    @patch.object(slot_capacity, "SLOT_MAX_ITEMS", 5)
+    def test_item_limit_and_chatbot_tool(self):
+        self.order(slot="12:00", quantity=5)
+        self.assertEqual(slot_loads(DAY)["12:00"]["orders"], 1)
+        available = available_delivery_slots(DAY.isoformat())["available_slots"]
+        self.assertNotIn("12:00", available)
+        self.assertIn("12:30", available)
+
+    def test_reseed_forgets_orders_it_no_longer_counts(self):
+        order = self.order()
+        Order.objects.filter(pk=order.pk).update(is_confirmed=False)  # not reported to the counters
+        seed_slot_loads(DAY)
+        with self.captureOnCommitCallbacks(execute=True):
+            order.delete()  # its old share went with the re-seed: nothing to take off again
+        self.assertEqual(slot_loads(DAY)["19:30"], {"orders": 0, "items": 0})
+
+    def test_reseed_takes_a_moved_order_off_its_old_day(self):
+        order = self.order()
+        Order.objects.filter(pk=order.pk).update(date=DAY + timedelta(days=1))  # not reported
+        seed_slot_loads(DAY + timedelta(days=1))
+        self.assertEqual(slot_loads(DAY)["19:30"]["orders"], 0)
+        self.assertEqual(slot_loads(DAY + timedelta(days=1))["19:30"]["orders"], 1)
+
+    def test_full_slot_rejected_at_checkout(self):
+        self.order()
+        self.order()
+        self.client.force_authenticate(self.customer)
+        response = self.client.post("/restaurante/orders", {
+            "delivery_type": "pickup", "date": DAY.isoformat(), "delivery_time_slot": "19:30",
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("delivery_time_slot", response.data)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_bad_date_is_rejected(self):
+        self.assertEqual(self.client.get(self.url, {"date": "10/03/2026"}).status_code, 400)
+
+    def test_dates_outside_the_horizon_are_rejected_without_seeding(self):
+        horizon = today() + timedelta(days=slot_capacity.SLOT_RESYNC_DAYS)
+        self.assertEqual(self.client.get(self.url, {"date": horizon.isoformat()}).status_code, 200)
+        with patch.object(slot_capacity, "seed_slot_loads") as seed:
+            for day in (today() - timedelta(days=1), horizon + timedelta(days=1), date(2099, 1, 1)):
+                self.assertEqual(self.client.get(self.url, {"date": day.isoformat()}).status_code, 400)
+                self.assertEqual(available_delivery_slots(day.isoformat())["available_slots"], [])
+        seed.assert_not_called()
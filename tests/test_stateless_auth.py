@@ -0,0 +1,69 @@
+from django.contrib.auth.models import Group, User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from restaurante.models import Category, CustomerReview, MenuItem, Order
+from tests import LocmemCacheMixin
+
+
+class StatelessJwtTest(LocmemCacheMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="chatore", password="secret-pass")
+        category = Category.objects.create(slug="snacks", title="Snacks")
+        MenuItem.objects.create(title="Samosa", price=20, featured=True, category=category)
+        Order.objects.create(user=self.user, is_confirmed=True)
+
+    def login(self):
+        response = self.client.post("/auth/jwt/create/", {"username": "chatore", "password": "secret-pass"})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def get_sql(self, url, access):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, HTTP_AUTHORIZATION=f"Bearer {access}", HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, 200)
+        return response, " ".join(q["sql"] for q in ctx.captured_queries)
+
+    def test_token_carries_role_claims(self):
+        self.user.groups.add(Group.objects.create(name="Delivery crew"))
+        access = AccessToken(self.login()["access"])
+        self.assertEqual(access["username"], "chatore")
+        self.assertEqual(access["roles"], ["delivery_crew"])
+        self.assertFalse(access["is_staff"])
+
+    def test_read_endpoints_never_load_the_user(self):
+        access = self.login()["access"]
+        for url in ["/restaurante/orders", "/restaurante/menu-items/", "/restaurante/customer-reviews/",
+                    "/restaurante/orders/available-time-slots/"]:
+            _, sql = self.get_sql(url, access)
+            self.assertNotIn('FROM "auth_user" WHERE', sql, url)  # the per-request user lookup
+            self.assertNotIn("auth_user_groups", sql, url)
+
+    def test_order_list_filters_by_token_user(self):
+        other = User.objects.create_user(username="other", password="x")
+        Order.objects.create(user=other, is_confirmed=True)
+        response, _ = self.get_sql("/restaurante/orders", self.login()["access"])
+        self.assertEqual([row["user"] for row in response.data["results"]], [self.user.id])
+
+    def test_writes_still_use_the_real_user(self):
+        access = self.login()["access"]
+        response = self.client.post("/restaurante/customer-reviews/", {"feedback": "Chatpata!", "rating": 5},
+                                    HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(CustomerReview.objects.get().user, self.user)
+
+    def test_refresh_picks_up_new_roles(self):
+        tokens = self.login()
+        self.user.groups.add(Group.objects.create(name="Manager"))
+        response = self.client.post("/auth/jwt/refresh/", {"refresh": tokens["refresh"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(AccessToken(response.data["access"])["roles"], ["manager"])
+
+    def test_token_without_role_claims_falls_back_to_db_user(self):
+        access = str(RefreshToken.for_user(self.user).access_token)
+        response, sql = self.get_sql("/restaurante/orders", access)
+        self.assertIn('FROM "auth_user" WHERE', sql)
+        self.assertEqual(len(response.data["results"]), 1)
@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from restaurante.models import Order, StripeEvent
+from restaurante.stripe_webhooks import process_stripe_events, sign_payload
+from tests import LocmemCacheMixin
+
+FIXTURES = Path(__file__).resolve().parents[1] / "restaurante" / "fixtures" / "stripe_events"
+SECRET = "whsec_test"
+
+
+def recorded_event(name):
+    return json.loads((FIXTURES / f"{name}.json").read_text())
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True, STRIPE_WEBHOOK_SECRET=SECRET,
+                   EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class StripeWebhookTest(LocmemCacheMixin, APITestCase):
+    url = "/restaurante/api/stripe/webhook/"
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="customer", password="x", email="c@example.com")
+
+    def make_order(self, intent_id="pi_3PqRecordedIntent01"):
+        # the recorded intents charge intent_amount(total) = 2400 for this total
+        return Order.objects.create(user=self.user, total=2000, payment_method="stripe",
+                                    stripe_payment_intent_id=intent_id)
+
+    def deliver(self, event, signature=None):
+        payload = json.dumps(event)
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.generic("POST", self.url, payload, content_type="application/json",
+                                       HTTP_STRIPE_SIGNATURE=signature or sign_payload(payload, SECRET))
+
+    def test_succeeded_event_marks_order_paid_and_confirms(self):
+        order = self.make_order()
+        response = self.deliver(recorded_event("payment_intent.succeeded"))
+        self.assertEqual(response.status_code, 200)
+        order.refresh_from_db()
+        self.assertEqual((order.payment_status, order.is_confirmed), ("paid", True))
+        self.assertEqual(StripeEvent.objects.get().status, "processed")
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_bad_signature_rejected(self):
+        response = self.deliver(recorded_event("payment_intent.succeeded"), signature="t=1,v1=deadbeef")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(StripeEvent.objects.exists())
+
+    def test_redelivery_is_stored_once(self):
+        self.make_order()
+        event = recorded_event("payment_intent.succeeded")
+        self.deliver(event)
+        self.deliver(event)
+        self.assertEqual(StripeEvent.objects.count(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_event_before_order_is_retried(self):
+        self.deliver(recorded_event("payment_intent.succeeded"))
+        event = StripeEvent.objects.get()
+        self.assertEqual((event.status, event.attempts), ("pending", 1))
+
+        order = self.make_order()
+        StripeEvent.objects.update(next_attempt_at=event.received_at)
+        self.assertEqual(process_stripe_events(), 1)
+        order.refresh_from_db()
+        self.assertEqual(order.payment_status, "paid")
+
+    def test_failed_and_unhandled_events(self):
+        order = self.make_order()
+        self.deliver(recorded_event("payment_intent.payment_failed"))
+        self.deliver(recorded_event("charge.refunded"))
+        statuses = dict(StripeEvent.objects.values_list("type", "status"))
+        self.assertEqual(statuses, {"payment_intent.payment_failed": "processed", "charge.refunded": "ignored"})
+        order.refresh_from_db()
+        self.assertEqual(order.payment_status, "pending")
+
+    def test_amount_mismatch_leaves_order_pending(self):
+        order = self.make_order("pi_3PqRecordedIntent02")  # paid 1200, order expects 2400
+        self.deliver(recorded_event("payment_intent.succeeded.amount_mismatch"))
+        event = StripeEvent.objects.get()
+        self.assertEqual(event.status, "failed")
+        self.assertIn("expects 2400 usd", event.last_error)
+        order.refresh_from_db()
+        self.assertEqual((order.payment_status, order.is_confirmed), ("pending", False))
+        self.assertEqual(len(mail.outbox), 0)
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from restaurante.chatviews import summarizer
+from restaurante.utils import save_chat_turn, get_chat_history, get_chat_summary
+from tests import LocmemCacheMixin
+
+
+def fake_completion(text):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class RollingSummaryTest(LocmemCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.guest = SimpleNamespace(is_authenticated=False)
+
+    def test_history_folds_into_summary_past_threshold(self):
+        with mock.patch.object(summarizer.client.chat.completions, "create",
+                               return_value=fake_completion("- 4 guests on Friday")) as create:
+            for i in range(summarizer.SUMMARY_TRIGGER + 1):
+                save_chat_turn(self.guest, "guest_abc", "user", f"msg {i}")
+
+        create.assert_called_once()
+        self.assertEqual(get_chat_summary(self.guest, "guest_abc"), "- 4 guests on Friday")
+        history = get_chat_history(self.guest, "guest_abc", limit=100)
+        self.assertEqual(len(history), summarizer.CHAT_HISTORY_WINDOW)
+        self.assertEqual(history[-1]["content"], f"msg {summarizer.SUMMARY_TRIGGER}")
+
+    def test_short_history_is_left_alone(self):
+        with mock.patch.object(summarizer.client.chat.completions, "create") as create:
+            for i in range(summarizer.SUMMARY_TRIGGER):
+                save_chat_turn(self.guest, "guest_abc", "user", f"msg {i}")
+
+        create.assert_not_called()
+        self.assertEqual(get_chat_summary(self.guest, "guest_abc"), "")
+
+    def test_turn_saved_while_summarizing_is_kept(self):
+        def reply_meanwhile(**kwargs):
+            save_chat_turn(self.guest, "guest_abc", "user", "arrived mid-summary")
+            return fake_completion("- summary")
+
+        for i in range(summarizer.SUMMARY_TRIGGER):
+            save_chat_turn(self.guest, "guest_abc", "user", f"msg {i}")
+        with mock.patch.object(summarizer.client.chat.completions, "create", side_effect=reply_meanwhile), \
+                mock.patch.object(summarizer, "SUMMARY_TRIGGER", 10 ** 6):
+            save_chat_turn(self.guest, "guest_abc", "user", "last")
+            summarizer.summarize_history("chat_history_guest_guest_abc")
+
+        history = get_chat_history(self.guest, "guest_abc", limit=100)
+        self.assertEqual([m["content"] for m in history[-2:]], ["last", "arrived mid-summary"])
+        self.assertEqual(len(history), summarizer.CHAT_HISTORY_WINDOW + 1)
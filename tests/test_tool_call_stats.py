@@ -0,0 +1,80 @@
+from decimal import Decimal
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from restaurante.chatviews.order_logic import handle_order_logic
+from restaurante.models import ChatHistory
+from restaurante.utils import save_to_db_conversation, save_tool_call_to_db
+from tests import LocmemCacheMixin
+
+
+def completion(content="", tool_calls=(), prompt_tokens=0, completion_tokens=0):
+    message = SimpleNamespace(content=content, tool_calls=list(tool_calls))
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)],
+                           usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens))
+
+
+def tool_call(name, arguments="{}"):
+    return SimpleNamespace(function=SimpleNamespace(name=name, arguments=arguments))
+
+
+class ToolCallMetricsTest(TestCase):
+    def setUp(self):
+        self.guest = SimpleNamespace(is_authenticated=False)
+        usage = SimpleNamespace(prompt_tokens=120, completion_tokens=30)
+        save_tool_call_to_db(self.guest, "guest_abc", "create_booking", {"no_of_guests": 4},
+                             {"message": "✅ Booked", "total": Decimal("12.50")}, latency_ms=40.7)
+        save_tool_call_to_db(self.guest, "guest_abc", "create_booking", {"no_of_guests": 40},
+                             {"message": "❌ Too many guests"}, latency_ms=90)
+        save_tool_call_to_db(self.guest, "guest_abc", "checkout_order", {}, "boom",
+                             latency_ms=15, succeeded=False)
+        save_to_db_conversation(self.guest, "guest_abc", "assistant", "Booking that now", usage=usage)
+
+    def test_calls_are_stored_as_structured_rows(self):
+        ok, soft_fail, hard_fail = ChatHistory.objects.filter(function_name__isnull=False).order_by("id")
+        self.assertEqual((ok.function_name, ok.succeeded, ok.latency_ms), ("create_booking", True, 40))
+        self.assertEqual(ok.function_arguments, {"no_of_guests": 4})
+        self.assertEqual(ok.function_result["total"], "12.50")
+        self.assertIsNone(ok.prompt_tokens)  # usage lives on the assistant row
+        self.assertFalse(soft_fail.succeeded)  # "❌" in the payload counts as a failure
+        self.assertFalse(hard_fail.succeeded)
+
+    def test_stats_aggregate_per_tool(self):
+        out = StringIO()
+        call_command("tool_call_stats", stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        booking, checkout, tokens = lines
+        self.assertTrue(booking.startswith("create_booking"))
+        self.assertIn("calls=2", booking)
+        self.assertIn("fail= 50.0%", booking)
+        self.assertIn("p50=90ms", booking)
+        self.assertIn("fail=100.0%", checkout)
+        self.assertIn("tokens=120+30", tokens)
+
+        out = StringIO()
+        call_command("tool_call_stats", function="checkout_order", stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 1)
+
+
+class ToolCallUsageTest(LocmemCacheMixin, TestCase):
+    def test_reply_with_two_tool_calls_counts_its_tokens_once(self):
+        guest = SimpleNamespace(is_authenticated=False)
+        reply = completion(tool_calls=[tool_call("set_delivery_type", '{"delivery_type": "pickup"}'),
+                                       tool_call("set_payment_method", '{"payment_method": "cod"}')],
+                           prompt_tokens=500, completion_tokens=40)
+        client = mock.Mock()
+        client.chat.completions.create.return_value = completion("Pickup it is.", prompt_tokens=600, completion_tokens=20)
+        tools = {"set_delivery_type": lambda delivery_type: {"delivery_type": delivery_type},
+                 "set_payment_method": lambda payment_method: {"payment_method": payment_method}}
+        with mock.patch("restaurante.chatviews.order_logic.ORDER_TOOL_FUNCTION_MAP", tools):
+            handle_order_logic(reply, guest, "guest_abc", {}, "prompt", [], client, "pickup, cash")
+
+        self.assertFalse(ChatHistory.objects.filter(function_name__isnull=False, prompt_tokens__isnull=False).exists())
+        out = StringIO()
+        call_command("tool_call_stats", stdout=out)
+        self.assertIn("calls=2      tokens=1100+60", out.getvalue().splitlines()[-1])  # reply + follow-up, once each